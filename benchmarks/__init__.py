@@ -0,0 +1 @@
+"""Benchmarks for the Eskom Load Shedding integration."""
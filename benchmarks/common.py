@@ -0,0 +1,60 @@
+"""Synthetic load shedding schedules and setup helpers for benchmarks."""
+from datetime import datetime, timedelta, timezone
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.eskomloadshedding.const import DOMAIN
+from custom_components.eskomloadshedding.debug import DEBUG_SCHEDULE
+from custom_components.eskomloadshedding.schedule import ScheduleIndex
+
+from tests.const import MOCK_CONFIG
+
+SIZES = [10, 100, 1000, 10000, 30000]
+
+
+def _daily_pattern() -> list[tuple[timedelta, timedelta]]:
+    """Return the (start, duration) times of day used by DEBUG_SCHEDULE."""
+    pattern = set()
+    for start, _ in DEBUG_SCHEDULE:
+        start = datetime.fromisoformat(start)
+        pattern.add(
+            (timedelta(hours=start.hour, minutes=start.minute), timedelta(hours=2.5))
+        )
+    return sorted(pattern)
+
+
+def synthetic_schedule(slots: int, start: datetime | None = None) -> ScheduleIndex:
+    """Return a schedule of a number of slots repeating the debug pattern daily."""
+    pattern = _daily_pattern()
+    day = (start or datetime.now(timezone.utc)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    schedule = []
+    while len(schedule) < slots:
+        for offset, duration in pattern:
+            if len(schedule) == slots:
+                break
+            schedule.append((day + offset, day + offset + duration))
+        day += timedelta(days=1)
+    return ScheduleIndex(schedule)
+
+
+async def async_setup_entry_with_schedule(hass, hass_storage, schedule: ScheduleIndex):
+    """Set up an entry for one area restored with a schedule from disk."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, data={}, options=MOCK_CONFIG, entry_id="benchmark"
+    )
+    config_entry.add_to_hass(hass)
+    hass_storage[f"{DOMAIN}.benchmark"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.benchmark",
+        "data": {
+            "stage": 2,
+            "schedules": {"1024989": schedule.as_list()},
+            "areas": MOCK_CONFIG["areas"],
+            "last_updated": datetime.now(timezone.utc).isoformat(),
+        },
+    }
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    return config_entry
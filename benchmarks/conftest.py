@@ -0,0 +1,183 @@
+"""Fixtures for the benchmark suite.
+
+Run with ``pytest benchmarks``. Every benchmark reports latency percentiles
+and allocations to benchmarks/results.json, and the medians that regressed
+past the tolerance against benchmarks/baseline.json are listed at the end of
+the run. The baseline was measured on another machine, so regressions only
+fail the benchmarks with ``--benchmark-compare``, on the machine the baseline
+was stored on. Pass ``--benchmark-save`` to store the results as the new
+baseline.
+"""
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+import json
+from pathlib import Path
+import statistics
+import time
+import tracemalloc
+from typing import Any
+
+import pytest
+
+from tests.conftest import (  # noqa: F401 pylint: disable=unused-import
+    auto_enable_custom_integrations,
+    skip_notifications_fixture,
+    stale_get_data_fixture,
+)
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+BENCHMARK_DIR = Path(__file__).parent
+BASELINE_FILE = BENCHMARK_DIR / "baseline.json"
+RESULTS_FILE = BENCHMARK_DIR / "results.json"
+DEFAULT_ROUNDS = 200
+DEFAULT_TOLERANCE = 1.5
+
+
+def pytest_addoption(parser):
+    """Add benchmark options."""
+    group = parser.getgroup("benchmark")
+    group.addoption(
+        "--benchmark-save",
+        action="store_true",
+        help="Store the results as the new baseline.",
+    )
+    group.addoption(
+        "--benchmark-compare",
+        action="store_true",
+        help="Fail the benchmarks that regressed against the baseline.",
+    )
+    group.addoption(
+        "--benchmark-tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Allowed ratio of the median latency to the baseline.",
+    )
+    group.addoption(
+        "--benchmark-rounds",
+        type=int,
+        default=DEFAULT_ROUNDS,
+        help="Number of timed rounds per benchmark.",
+    )
+
+
+def _load(path: Path) -> dict[str, Any]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+class BenchmarkRecorder:
+    """Time benchmarks and compare them with the baseline."""
+
+    def __init__(self, config: pytest.Config) -> None:
+        """Initialize the recorder."""
+        self.rounds: int = config.getoption("--benchmark-rounds")
+        self.tolerance: float = config.getoption("--benchmark-tolerance")
+        self.save: bool = config.getoption("--benchmark-save")
+        self.compare: bool = config.getoption("--benchmark-compare")
+        self.baseline = _load(BASELINE_FILE)
+        self.results: dict[str, dict[str, float]] = {}
+        self.regressions: list[str] = []
+
+    async def measure(
+        self, name: str, func: Callable[[], Awaitable[Any] | Any]
+    ) -> dict[str, float]:
+        """Measure latency and allocations of a function, awaiting coroutines."""
+
+        async def _call() -> None:
+            if (result := func()) is not None and hasattr(result, "__await__"):
+                await result
+
+        # Warm up memoized paths before timing
+        await _call()
+
+        timings = []
+        for _ in range(self.rounds):
+            start = time.perf_counter()
+            await _call()
+            timings.append((time.perf_counter() - start) * 1e6)
+
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await _call()
+            after, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return self.record(
+            name,
+            timings,
+            retained_kib=round((after - before) / 1024, 2),
+            peak_kib=round((peak - before) / 1024, 2),
+        )
+
+    def record(
+        self, name: str, timings: list[float], **extra: float
+    ) -> dict[str, float]:
+        """Record latency percentiles of timings in microseconds."""
+        percentiles = statistics.quantiles(timings, n=100)
+        result = {
+            "p50_us": round(percentiles[49], 2),
+            "p90_us": round(percentiles[89], 2),
+            "p99_us": round(percentiles[98], 2),
+            **extra,
+        }
+        self.results[name] = result
+        self.check(name)
+        return result
+
+    def check(self, name: str) -> None:
+        """Report, or fail when comparing, a median regressed against the baseline."""
+        if self.save or (baseline := self.baseline.get(name)) is None:
+            return
+        result = self.results[name]
+        limit = baseline["p50_us"] * self.tolerance
+        if result["p50_us"] <= limit:
+            return
+
+        message = (
+            f"{name} regressed: p50 {result['p50_us']}us "
+            f"> {limit:.2f}us ({self.tolerance}x baseline)"
+        )
+        self.regressions.append(message)
+        assert not self.compare, message
+
+    def write(self) -> None:
+        """Write the results, and the baseline when asked to."""
+        if not self.results:
+            return
+        output = json.dumps(self.results, indent=2, sort_keys=True) + "\n"
+        RESULTS_FILE.write_text(output)
+        if self.save:
+            BASELINE_FILE.write_text(output)
+
+
+_RECORDER_KEY = pytest.StashKey[BenchmarkRecorder]()
+
+
+@pytest.fixture(scope="session")
+def benchmark_recorder(pytestconfig):
+    """Collect the results of all benchmarks in the session."""
+    recorder = pytestconfig.stash[_RECORDER_KEY] = BenchmarkRecorder(pytestconfig)
+    yield recorder
+    recorder.write()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """List the regressions that were reported without failing."""
+    recorder = config.stash.get(_RECORDER_KEY, None)
+    if recorder is None or recorder.compare or not recorder.regressions:
+        return
+    terminalreporter.section("benchmark regressions (not compared)")
+    for message in recorder.regressions:
+        terminalreporter.line(message)
+
+
+@pytest.fixture(name="benchmark")
+def benchmark_fixture(benchmark_recorder):
+    """Return the benchmark recorder."""
+    return benchmark_recorder
@@ -0,0 +1,211 @@
+"""Local stand-in for the Eskom load shedding endpoints.
+
+Serves GetStatus, GetScheduleM and FindSuburbs with configurable latency,
+error rate, slow drip responses and a stage that changes over time, so the
+integration's I/O path can be exercised without network access:
+
+    python -m benchmarks.eskom_server --port 8080 --latency 0.2 --error-rate 0.1
+
+Point EskomAPI at it with ``base_url="http://127.0.0.1:8080/LoadShedding"``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+import json
+import random
+import time
+
+from aiohttp import web
+
+from custom_components.eskomloadshedding.const import SAST
+
+PATH_PREFIX = "/LoadShedding"
+SLOT_HOURS = 2
+SLOT_MINUTES = 30
+SCHEDULE_DAYS = 7
+
+
+@dataclass
+class ServerConfig:
+    """Behaviour of the stand-in server."""
+
+    # Seconds added to every response, plus up to jitter seconds at random
+    latency: float = 0.0
+    jitter: float = 0.0
+    # Share of requests answered with an HTTP 500
+    error_rate: float = 0.0
+    # Seconds between the chunks of a slow drip response, 0 to send at once
+    drip_delay: float = 0.0
+    drip_chunk: int = 64
+    # Stages cycled through, each held for stage_period seconds
+    stages: list[int] = field(default_factory=lambda: [0, 2, 4])
+    stage_period: float = 300.0
+    seed: int | None = None
+
+
+class EskomStandIn:
+    """aiohttp application answering like the Eskom endpoints."""
+
+    def __init__(
+        self, config: ServerConfig, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """Initialize the stand-in."""
+        self.config = config
+        self._clock = clock
+        self._started = clock()
+        self._random = random.Random(config.seed)
+        self.requests: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+
+        self.app = web.Application()
+        self.app.router.add_get(f"{PATH_PREFIX}/GetStatus", self._get_status)
+        self.app.router.add_get(
+            f"{PATH_PREFIX}/GetScheduleM/{{suburb}}/{{stage}}/{{province}}/{{total}}",
+            self._get_schedule,
+        )
+        self.app.router.add_get(f"{PATH_PREFIX}/FindSuburbs", self._find_suburbs)
+
+    @property
+    def stage(self) -> int:
+        """Return the stage at the current time."""
+        elapsed = self._clock() - self._started
+        index = int(elapsed // self.config.stage_period) % len(self.config.stages)
+        return self.config.stages[index]
+
+    async def _respond(
+        self, request: web.Request, endpoint: str, body: str, content_type: str
+    ) -> web.StreamResponse:
+        """Apply latency, errors and drip to a response."""
+        self.requests[endpoint] += 1
+        delay = self.config.latency + self._random.random() * self.config.jitter
+        if delay:
+            await asyncio.sleep(delay)
+
+        if self._random.random() < self.config.error_rate:
+            self.errors[endpoint] += 1
+            return web.Response(status=500, text="Internal Server Error")
+
+        if not self.config.drip_delay:
+            return web.Response(text=body, content_type=content_type)
+
+        response = web.StreamResponse(headers={"Content-Type": content_type})
+        await response.prepare(request)
+        data = body.encode()
+        for start in range(0, len(data), self.config.drip_chunk):
+            await response.write(data[start : start + self.config.drip_chunk])
+            await asyncio.sleep(self.config.drip_delay)
+        await response.write_eof()
+        return response
+
+    async def _get_status(self, request: web.Request) -> web.StreamResponse:
+        # Eskom reports the stage plus one, with 1 meaning no load shedding
+        return await self._respond(
+            request, "GetStatus", str(self.stage + 1), "text/plain"
+        )
+
+    async def _get_schedule(self, request: web.Request) -> web.StreamResponse:
+        suburb = int(request.match_info["suburb"])
+        stage = int(request.match_info["stage"])
+        return await self._respond(
+            request, "GetScheduleM", schedule_page(suburb, stage), "text/html"
+        )
+
+    async def _find_suburbs(self, request: web.Request) -> web.StreamResponse:
+        text = request.query.get("searchText", "")
+        max_results = int(request.query.get("maxResults", 10))
+        suburbs = [
+            {
+                "Id": 1000000 + index,
+                "Name": f"{text.title()} {index}",
+                "MunicipalityName": "Stand-in",
+                "ProvinceName": "Gauteng",
+                "Total": max_results,
+            }
+            for index in range(max_results)
+        ]
+        return await self._respond(
+            request, "FindSuburbs", json.dumps(suburbs), "application/json"
+        )
+
+
+def schedule_page(suburb: int, stage: int) -> str:
+    """Return a schedule page with one slot per stage each day.
+
+    Slots start every SLOT_HOURS hours from an offset taken from the suburb,
+    shifted by one slot each day like the Eskom rotation.
+    """
+    today = datetime.now(SAST).date()
+    days = []
+    for day_offset in range(SCHEDULE_DAYS):
+        day = today + timedelta(days=day_offset)
+        slots = []
+        for slot in range(stage):
+            hour = ((suburb + day.day + slot * 3) * SLOT_HOURS) % 24
+            end = (hour * 60 + SLOT_HOURS * 60 + SLOT_MINUTES) % (24 * 60)
+            slots.append(f"<a>{hour:02d}:00 - {end // 60:02d}:{end % 60:02d}</a>")
+        days.append(
+            '<div class="scheduleDay">'
+            f'<div class="dayMonth">{day.strftime("%a, %d %b")}</div>'
+            f'{"".join(slots)}</div>'
+        )
+    return "\n".join(days)
+
+
+async def async_start_server(
+    config: ServerConfig, host: str = "127.0.0.1", port: int = 0
+) -> tuple[EskomStandIn, web.AppRunner, str]:
+    """Start the stand-in and return it with its runner and base URL."""
+    stand_in = EskomStandIn(config)
+    runner = web.AppRunner(stand_in.app)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # pylint: disable=protected-access
+    return stand_in, runner, f"http://{host}:{port}{PATH_PREFIX}"
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the server behaviour options to a parser."""
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--drip-delay", type=float, default=0.0)
+    parser.add_argument("--drip-chunk", type=int, default=64)
+    parser.add_argument("--stages", type=int, nargs="+", default=[0, 2, 4])
+    parser.add_argument("--stage-period", type=float, default=300.0)
+    parser.add_argument("--seed", type=int)
+
+
+def config_from_arguments(args: argparse.Namespace) -> ServerConfig:
+    """Return the server behaviour from parsed options."""
+    return ServerConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        drip_delay=args.drip_delay,
+        drip_chunk=args.drip_chunk,
+        stages=args.stages,
+        stage_period=args.stage_period,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    """Run the stand-in until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    stand_in = EskomStandIn(config_from_arguments(args))
+    web.run_app(stand_in.app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""Run the integration under load against the local stand-in server.
+
+    python -m benchmarks.load --clients 20 --areas 3 --duration 60 \
+        --latency 0.5 --jitter 1 --error-rate 0.05 --stage-period 10
+
+Each client is a config entry of the integration set up in a Home Assistant
+test instance, with its own areas, coordinator, circuit breaker and retry
+budget, and its entities. Every client refreshes its coordinator every
+--interval seconds, so refreshes go through the refresh timeout, the stale
+results path, the store and the entity state writes. The report covers
+refresh latency, stale and failed refreshes, failures by reason, circuit
+states, state writes, executor jobs, requests seen by the server and event
+loop lag.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter
+from functools import partial
+import json
+import statistics
+import tempfile
+import time
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant import loader
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant, callback
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from custom_components.eskomloadshedding import EskomLoadsheddingDataCoordinator
+from custom_components.eskomloadshedding.api import EskomAPI
+from custom_components.eskomloadshedding.const import (
+    ATTR_STALE,
+    CONF_AREAS,
+    CONF_MANUAL,
+    CONF_PROVINCE_ID,
+    CONF_SUBURB_ID,
+    DOMAIN,
+)
+
+from .eskom_server import (
+    add_config_arguments,
+    async_start_server,
+    config_from_arguments,
+)
+
+LAG_PROBE_INTERVAL = 0.05
+
+
+def _percentiles(values: list[float]) -> dict[str, float]:
+    if len(values) < 2:
+        return {"count": len(values)}
+    percentiles = statistics.quantiles(values, n=100)
+    return {
+        "count": len(values),
+        "p50_ms": round(percentiles[49] * 1000, 2),
+        "p90_ms": round(percentiles[89] * 1000, 2),
+        "p99_ms": round(percentiles[98] * 1000, 2),
+        "max_ms": round(max(values) * 1000, 2),
+    }
+
+
+def _client_options(client: int, areas: int) -> dict[str, Any]:
+    """Return the options of a client, refreshed by the harness only."""
+    return {
+        CONF_MANUAL: True,
+        CONF_AREAS: [
+            {
+                CONF_PROVINCE_ID: 3,
+                CONF_SUBURB_ID: 1000000 + client * areas + area,
+                "name": f"Client {client} Area {area}",
+            }
+            for area in range(areas)
+        ],
+    }
+
+
+async def _run_client(
+    coordinator: EskomLoadsheddingDataCoordinator,
+    deadline: float,
+    interval: float,
+    latencies: list[float],
+    outcomes: Counter[str],
+) -> None:
+    """Refresh the coordinator until the deadline, counting the outcomes."""
+    while time.monotonic() < deadline:
+        start = time.monotonic()
+        await coordinator.async_refresh()
+        latencies.append(time.monotonic() - start)
+        if not coordinator.last_update_success:
+            outcomes["failed"] += 1
+        elif coordinator.data[ATTR_STALE]:
+            outcomes["stale"] += 1
+        else:
+            outcomes["fresh"] += 1
+        await asyncio.sleep(interval)
+
+
+async def _probe_loop_lag(deadline: float, lags: list[float]) -> None:
+    """Measure how late the event loop wakes up a sleeping task."""
+    while time.monotonic() < deadline:
+        start = time.monotonic()
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        lags.append(time.monotonic() - start - LAG_PROBE_INTERVAL)
+
+
+def _count_executor_jobs(hass: HomeAssistant, jobs: Counter[str]) -> None:
+    """Count the executor jobs of the instance by target."""
+    add_executor_job = hass.async_add_executor_job
+
+    def _async_add_executor_job(target, *args):
+        name = getattr(target, "__qualname__", type(target).__name__)
+        jobs[name] += 1
+        return add_executor_job(target, *args)
+
+    hass.async_add_executor_job = _async_add_executor_job
+
+
+async def async_run(args: argparse.Namespace, hass: HomeAssistant) -> dict:
+    """Run the load test on a Home Assistant instance and return the report."""
+    stand_in, runner, base_url = await async_start_server(config_from_arguments(args))
+    latencies: list[float] = []
+    lags: list[float] = []
+    outcomes: Counter[str] = Counter()
+    state_writes = 0
+    executor_jobs: Counter[str] = Counter()
+
+    @callback
+    def _async_state_changed(_: Event) -> None:
+        nonlocal state_writes
+        state_writes += 1
+
+    entries = [
+        MockConfigEntry(
+            domain=DOMAIN,
+            data={},
+            options=_client_options(client, args.areas),
+            entry_id=f"load_{client}",
+        )
+        for client in range(args.clients)
+    ]
+    try:
+        with patch(
+            "custom_components.eskomloadshedding.EskomAPI",
+            partial(EskomAPI, base_url=base_url),
+        ):
+            for entry in entries:
+                entry.add_to_hass(hass)
+                await hass.config_entries.async_setup(entry.entry_id)
+            await hass.async_block_till_done()
+            coordinators = [hass.data[DOMAIN][entry.entry_id] for entry in entries]
+
+            _count_executor_jobs(hass, executor_jobs)
+            remove_listener = hass.bus.async_listen(
+                EVENT_STATE_CHANGED, _async_state_changed
+            )
+            deadline = time.monotonic() + args.duration
+            lag_probe = asyncio.create_task(_probe_loop_lag(deadline, lags))
+            await asyncio.gather(
+                *(
+                    _run_client(
+                        coordinator, deadline, args.interval, latencies, outcomes
+                    )
+                    for coordinator in coordinators
+                )
+            )
+            await lag_probe
+            remove_listener()
+
+            failures: Counter[str] = Counter()
+            for coordinator in coordinators:
+                failures.update(coordinator.api.failures)
+            circuit_states = Counter(
+                coordinator.api.breaker.state for coordinator in coordinators
+            )
+            for entry in entries:
+                await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_block_till_done()
+    finally:
+        await runner.cleanup()
+
+    return {
+        "refresh": _percentiles(latencies),
+        "refresh_outcomes": dict(outcomes),
+        "failures": dict(failures),
+        "circuit_states": dict(circuit_states),
+        "state_writes": state_writes,
+        "executor_jobs": dict(executor_jobs),
+        "server_requests": dict(stand_in.requests),
+        "server_errors": dict(stand_in.errors),
+        "loop_lag": _percentiles(lags),
+    }
+
+
+async def _async_main(args: argparse.Namespace) -> dict:
+    """Run the load test on a throwaway Home Assistant instance."""
+    hass = await async_test_home_assistant(asyncio.get_running_loop())
+    # Enable the integration in custom_components
+    hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass.config.config_dir = config_dir
+        try:
+            return await async_run(args, hass)
+        finally:
+            await hass.async_stop(force=True)
+
+
+def main() -> None:
+    """Run the load test and print the report as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--areas", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--interval", type=float, default=1.0)
+    add_config_arguments(parser)
+    print(json.dumps(asyncio.run(_async_main(parser.parse_args())), indent=2))
+
+
+if __name__ == "__main__":
+    main()
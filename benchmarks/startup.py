@@ -0,0 +1,95 @@
+"""Measure the import time of the integration and its provider library.
+
+    python -m benchmarks.startup --rounds 10
+
+Each round imports the integration in a fresh interpreter that has already
+imported the Home Assistant modules it builds on, as Home Assistant has by
+the time it loads an integration, so only the integration's own modules are
+timed. The provider library is timed separately since it is imported from
+the executor during setup. Setup time is measured by
+``pytest benchmarks -k startup``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Modules loaded by Home Assistant before the integration is imported
+HA_MODULES = [
+    "aiohttp",
+    "async_timeout",
+    "voluptuous",
+    "homeassistant.components.binary_sensor",
+    "homeassistant.components.calendar",
+    "homeassistant.components.persistent_notification",
+    "homeassistant.components.sensor",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.aiohttp_client",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.event",
+    "homeassistant.helpers.storage",
+    "homeassistant.helpers.update_coordinator",
+]
+
+# The integration and the platforms Home Assistant imports during setup
+INTEGRATION_MODULES = [
+    "custom_components.eskomloadshedding",
+    "custom_components.eskomloadshedding.sensor",
+    "custom_components.eskomloadshedding.binary_sensor",
+    "custom_components.eskomloadshedding.calendar",
+]
+
+_SCRIPT = """
+import importlib, json, sys, time
+for name in {ha_modules!r}:
+    importlib.import_module(name)
+start = time.perf_counter()
+for name in {modules!r}:
+    importlib.import_module(name)
+integration = time.perf_counter() - start
+loaded_on_import = "load_shedding" in sys.modules
+from custom_components.eskomloadshedding import provider
+start = time.perf_counter()
+provider.load()
+print(json.dumps({{
+    "integration": integration,
+    "provider": time.perf_counter() - start,
+    "provider_loaded_on_import": loaded_on_import,
+}}))
+"""
+
+
+def measure_import() -> dict:
+    """Return the import times in seconds measured in a fresh interpreter."""
+    script = _SCRIPT.format(ha_modules=HA_MODULES, modules=INTEGRATION_MODULES)
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, check=True, text=True
+    )
+    return json.loads(result.stdout)
+
+
+def main() -> None:
+    """Measure the import times and print the report as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    rounds = [measure_import() for _ in range(args.rounds)]
+    report = {
+        name: {
+            "median_ms": round(statistics.median(r[name] for r in rounds) * 1000, 2),
+            "max_ms": round(max(r[name] for r in rounds) * 1000, 2),
+        }
+        for name in ("integration", "provider")
+    }
+    report["provider_loaded_on_import"] = any(
+        r["provider_loaded_on_import"] for r in rounds
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Benchmark the calendar entity."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from .common import SIZES, async_setup_entry_with_schedule, synthetic_schedule
+
+
+@pytest.mark.parametrize("size", SIZES)
+async def test_get_events(hass, hass_storage, stale_get_data, benchmark, size):
+    """Benchmark reading a week of calendar events."""
+    entry = await async_setup_entry_with_schedule(
+        hass, hass_storage, synthetic_schedule(size)
+    )
+    calendar = hass.data["calendar"].get_entity("calendar.eskom_schedule_soweto")
+    start = datetime.now(timezone.utc)
+    end = start + timedelta(days=7)
+
+    await benchmark.measure(
+        f"calendar_get_events[{size}]",
+        lambda: calendar.async_get_events(hass, start, end),
+    )
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+@pytest.mark.parametrize("size", SIZES)
+async def test_handle_coordinator_update(
+    hass, hass_storage, stale_get_data, benchmark, size
+):
+    """Benchmark the calendar handling a coordinator update."""
+    entry = await async_setup_entry_with_schedule(
+        hass, hass_storage, synthetic_schedule(size)
+    )
+    calendar = hass.data["calendar"].get_entity("calendar.eskom_schedule_soweto")
+
+    await benchmark.measure(
+        f"calendar_coordinator_update[{size}]", calendar._handle_coordinator_update
+    )
+    assert await hass.config_entries.async_unload(entry.entry_id)
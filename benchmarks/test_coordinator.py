@@ -0,0 +1,34 @@
+"""Benchmark a full coordinator refresh."""
+from itertools import cycle
+from unittest.mock import patch
+
+from load_shedding.providers.eskom import Stage
+import pytest
+
+from custom_components.eskomloadshedding.api import EskomAPI, EskomLoadsheddingResults
+from custom_components.eskomloadshedding.const import DOMAIN
+
+from .common import SIZES, async_setup_entry_with_schedule, synthetic_schedule
+
+
+@pytest.mark.parametrize("size", SIZES)
+async def test_refresh(hass, hass_storage, stale_get_data, benchmark, size):
+    """Benchmark a refresh that changes the stage and notifies every entity."""
+    schedule = synthetic_schedule(size)
+    entry = await async_setup_entry_with_schedule(hass, hass_storage, schedule)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    results = cycle(
+        [
+            EskomLoadsheddingResults(stage, {"1024989": schedule}).dict()
+            for stage in (Stage.STAGE_2, Stage.STAGE_4)
+        ]
+    )
+    with patch.object(
+        EskomAPI, "async_get_data", side_effect=lambda: next(results)
+    ), patch.object(coordinator._store, "async_delay_save"):
+        await benchmark.measure(
+            f"coordinator_refresh[{size}]", coordinator.async_refresh
+        )
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,37 @@
+"""Benchmark the stage history."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from custom_components.eskomloadshedding.history import StageHistory
+
+POLL_INTERVAL = timedelta(minutes=15)
+DAYS = [30, 365]
+
+
+def _history(days: int) -> StageHistory:
+    """Return a history of polls with the stage changing twice a day."""
+    history = StageHistory()
+    start = datetime.now(timezone.utc) - timedelta(days=days)
+    for index in range(int(timedelta(days=days) / POLL_INTERVAL)):
+        history.record((index // 48) % 7, start + index * POLL_INTERVAL)
+    return history
+
+
+@pytest.mark.parametrize("days", DAYS)
+async def test_compact(benchmark, days):
+    """Benchmark recording and compacting polls."""
+    await benchmark.measure(f"history_compact[{days}]", lambda: _history(days).spans())
+
+
+@pytest.mark.parametrize("days", DAYS)
+async def test_time_at_stage(benchmark, days):
+    """Benchmark the time at or above stage 4 over the last month."""
+    history = _history(days)
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(days=30)
+
+    await benchmark.measure(
+        f"history_time_at_stage[{days}]",
+        lambda: history.time_at_stage(4, start, end),
+    )
@@ -0,0 +1,84 @@
+"""Benchmark schedule filtering."""
+from datetime import datetime, timedelta, timezone
+
+from load_shedding.providers.eskom import Province, Stage, Suburb
+import pytest
+
+from custom_components.eskomloadshedding.api import EskomAPI
+from custom_components.eskomloadshedding.const import SAST
+from custom_components.eskomloadshedding.intervals import IntervalSet
+from custom_components.eskomloadshedding.planner import Task, plan_windows
+from custom_components.eskomloadshedding.timetable import Timetable
+
+from .common import SIZES, synthetic_schedule
+
+TASK_COUNTS = [10, 100, 500]
+
+
+@pytest.mark.parametrize("size", SIZES)
+async def test_slots_in_range(benchmark, size):
+    """Benchmark reading a week of slots from the indexed schedule."""
+    schedule = synthetic_schedule(size)
+    start = datetime.now(timezone.utc)
+    end = start + timedelta(days=7)
+
+    await benchmark.measure(
+        f"slots_in_range[{size}]", lambda: schedule.slots_in_range(start, end)
+    )
+
+
+@pytest.mark.parametrize("size", SIZES)
+async def test_get_schedule(benchmark, size):
+    """Benchmark generating a week of schedule from a cached timetable."""
+    api = EskomAPI(None)
+    month = datetime.now(SAST).strftime("%Y-%m")
+    api.schedule_cache.set(
+        (3, 1024989, Stage.STAGE_2.value, month),
+        Timetable(synthetic_schedule(size), range(1, 32)),
+    )
+
+    await benchmark.measure(
+        f"get_schedule[{size}]",
+        lambda: api.async_get_schedule(Province(3), Suburb(id=1024989), Stage.STAGE_2),
+    )
+
+
+@pytest.mark.parametrize("size", SIZES)
+async def test_interval_set(benchmark, size):
+    """Benchmark merging a schedule and querying its gaps and overlap."""
+    schedule = synthetic_schedule(size)
+    other = IntervalSet(
+        synthetic_schedule(size, datetime.now(timezone.utc) + timedelta(hours=1))
+    )
+    start = datetime.now(timezone.utc)
+    end = start + timedelta(days=7)
+
+    await benchmark.measure(f"interval_set[{size}]", lambda: IntervalSet(schedule))
+    intervals = IntervalSet(schedule)
+    await benchmark.measure(
+        f"interval_gaps[{size}]", lambda: intervals.gaps(start, end)
+    )
+    await benchmark.measure(
+        f"interval_intersection[{size}]", lambda: intervals.intersection(other)
+    )
+
+
+@pytest.mark.parametrize("count", TASK_COUNTS)
+async def test_plan_windows(benchmark, count):
+    """Benchmark planning tasks around a week of outages."""
+    outages = IntervalSet(synthetic_schedule(1000))
+    start = datetime.now(timezone.utc)
+    tasks = [
+        Task(
+            name=f"task_{index}",
+            duration=timedelta(minutes=15 * (1 + index % 8)),
+            earliest_start=start + timedelta(hours=index % 72),
+            deadline=start + timedelta(days=7),
+            priority=index % 3,
+        )
+        for index in range(count)
+    ]
+
+    await benchmark.measure(
+        f"plan_windows[{count}]", lambda: plan_windows(outages, tasks)
+    )
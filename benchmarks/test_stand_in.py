@@ -0,0 +1,77 @@
+"""Exercise the Eskom API client against the local stand-in server."""
+import argparse
+
+from aiohttp import ClientSession
+from load_shedding.providers.eskom import Stage
+
+from custom_components.eskomloadshedding.api import Area, EskomAPI
+
+from .eskom_server import ServerConfig, async_start_server
+from .load import async_run
+
+
+async def test_stage_and_schedules_are_read(socket_enabled):
+    """Test the real request path reads the stage and every schedule."""
+    stand_in, runner, base_url = await async_start_server(ServerConfig(stages=[3]))
+    try:
+        async with ClientSession() as session:
+            api = EskomAPI(session, [Area(3, 1), Area(3, 2)], base_url=base_url)
+            data = await api.async_get_data()
+    finally:
+        await runner.cleanup()
+
+    assert data["stage"] == Stage.STAGE_3.value
+    assert all(len(schedule) for schedule in data["schedules"].values())
+    assert stand_in.requests == {"GetStatus": 1, "GetScheduleM": 2}
+
+
+async def test_load_run_opens_circuit_on_errors(hass, socket_enabled):
+    """Test a short load run against a failing server reports open circuits."""
+    report = await async_run(
+        argparse.Namespace(
+            clients=2,
+            areas=1,
+            duration=0.5,
+            interval=0.05,
+            latency=0.0,
+            jitter=0.0,
+            error_rate=1.0,
+            drip_delay=0.0,
+            drip_chunk=64,
+            stages=[2],
+            stage_period=300.0,
+            seed=1,
+        ),
+        hass,
+    )
+
+    assert report["circuit_states"] == {"open": 2}
+    assert report["failures"]["http_status"] == 6
+    # Nothing was read before, so there are no stale results to serve
+    assert report["refresh_outcomes"] == {"failed": report["refresh"]["count"]}
+    assert report["server_requests"] == {"GetStatus": 6}
+
+
+async def test_load_run_drives_entities(hass, socket_enabled):
+    """Test a load run refreshes the coordinators and writes entity states."""
+    report = await async_run(
+        argparse.Namespace(
+            clients=2,
+            areas=1,
+            duration=0.3,
+            interval=0.05,
+            latency=0.0,
+            jitter=0.0,
+            error_rate=0.0,
+            drip_delay=0.0,
+            drip_chunk=64,
+            stages=[2, 4],
+            stage_period=0.1,
+            seed=1,
+        ),
+        hass,
+    )
+
+    assert report["refresh_outcomes"] == {"fresh": report["refresh"]["count"]}
+    assert report["circuit_states"] == {"closed": 2}
+    assert report["state_writes"] > 0
@@ -0,0 +1,53 @@
+"""Benchmark the import and setup time of the integration."""
+from datetime import datetime, timezone
+import time
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.eskomloadshedding.const import DOMAIN
+
+from .common import synthetic_schedule
+from .startup import measure_import
+
+from tests.const import MOCK_CONFIG
+
+IMPORT_ROUNDS = 5
+
+
+async def test_import(benchmark):
+    """Benchmark importing the integration in a fresh interpreter."""
+    rounds = [measure_import() for _ in range(IMPORT_ROUNDS)]
+    assert not any(r["provider_loaded_on_import"] for r in rounds)
+
+    benchmark.record("import_integration", [r["integration"] * 1e6 for r in rounds])
+    benchmark.record("import_provider", [r["provider"] * 1e6 for r in rounds])
+
+
+async def test_setup(hass, hass_storage, stale_get_data, benchmark):
+    """Benchmark setting up and unloading an entry restored from disk."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, data={}, options=MOCK_CONFIG, entry_id="benchmark"
+    )
+    config_entry.add_to_hass(hass)
+    stored = {
+        "version": 1,
+        "key": f"{DOMAIN}.benchmark",
+        "data": {
+            "stage": 2,
+            "schedules": {"1024989": synthetic_schedule(100).as_list()},
+            "areas": MOCK_CONFIG["areas"],
+            "last_updated": datetime.now(timezone.utc).isoformat(),
+        },
+    }
+
+    timings = []
+    for _ in range(benchmark.rounds // 10):
+        hass_storage[f"{DOMAIN}.benchmark"] = stored
+        start = time.perf_counter()
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+        timings.append((time.perf_counter() - start) * 1e6)
+        assert await hass.config_entries.async_unload(config_entry.entry_id)
+        await hass.async_block_till_done()
+
+    benchmark.record("setup_entry", timings)
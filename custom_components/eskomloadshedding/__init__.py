@@ -2,34 +2,61 @@
 from __future__ import annotations
 
 import asyncio
-from datetime import timedelta
+from collections.abc import Iterable
+from datetime import datetime, timedelta
 import logging
 from typing import Any
 
+import async_timeout
 from homeassistant.components import persistent_notification
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_SCAN_INTERVAL
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.const import CONF_SCAN_INTERVAL, Platform
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from .api import EskomAPI
-
+from . import profiler, provider
+from .api import EskomAPI, EskomLoadsheddingResults, areas_from_options
 from .const import (  # DEFAULT_PROVINCE,; DEFAULT_STAGE,
+    ATTR_CALENDAR_ID,
+    ATTR_LAST_UPDATED,
+    ATTR_SCHEDULES,
+    ATTR_SHEDDING_STAGE,
+    ATTR_STALE,
+    ATTR_STALE_AGE,
+    CONF_AREAS,
     CONF_MANUAL,
-    CONF_PROVINCE_ID,
-    CONF_SUBURB_ID,
+    CONF_MAX_STALE_AGE,
     DEBUG_FLAG,
+    DEFAULT_MANUAL_FLAG,
+    DEFAULT_MAX_STALE_AGE,
     DEFAULT_SCAN_INTERVAL,
     DOMAIN,
-    UNKNOWN_STAGE,
+    FAILURE_REFRESH_TIMEOUT,
+    HISTORY_RETENTION,
+    HISTORY_SAVE_INTERVAL,
+    HISTORY_STORAGE_KEY,
+    NOTIF_MSG_NO_CONFIG,
+    NOTIF_MSG_NO_ESKOM,
+    NOTIFICATION_CONFIG_ID,
+    NOTIFICATION_ID,
     PLATFORMS,
+    REFRESH_TIMEOUT,
     STARTUP_MESSAGE,
-    NOTIFICATION_ID,
-    NOTIFICATION_CONFIG_ID,
-    NOTIF_MSG_NO_ESKOM,
-    NOTIF_MSG_NO_CONFIG,
+    STORAGE_KEY,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
 )
+from .events import ScheduleEvents, lead_times_from_options
+from .history import StageHistory
+from .intervals import IntervalSet
+from .polling import AdaptivePollingScheduler
+from .schedule import ScheduleIndex
+from .services import async_setup_services, async_unload_services
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -40,74 +67,300 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.data.setdefault(DOMAIN, {})
         _LOGGER.info(STARTUP_MESSAGE)
 
+    # Import the provider library off the event loop
+    await provider.async_load(hass)
     client = EskomAPI(
-        entry.options.get(CONF_PROVINCE_ID),
-        entry.options.get(CONF_SUBURB_ID),
+        async_get_clientsession(hass),
+        areas_from_options(entry.options),
         DEBUG_FLAG,
     )
 
     # Create Data Coordinator object and set update interval
-    coordinator = EskomLoadsheddingDataCoordinator(hass, client)
-    await coordinator.async_refresh()
+    coordinator = EskomLoadsheddingDataCoordinator(hass, client, entry)
+    if entry.options.get(CONF_MANUAL, DEFAULT_MANUAL_FLAG):
+        coordinator.set_scan_interval(None)
+    else:
+        coordinator.set_scan_interval(
+            timedelta(
+                minutes=entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+            )
+        )
+    hass.data[DOMAIN][entry.entry_id] = coordinator
+    await coordinator.async_restore_history()
+    coordinator.async_schedule_history_saves()
 
-    coordinator.update_interval = timedelta(
-        minutes=entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
-    )
+    # Warm start from the last good results, otherwise set up the platforms
+    # once the first data arrives so that startup does not wait for Eskom
+    if await coordinator.async_restore():
+        _async_setup_platforms(hass, entry, coordinator)
+    else:
 
-    if not coordinator.last_update_success:
-        raise ConfigEntryNotReady
+        @callback
+        def _async_first_data() -> None:
+            if coordinator.data is None or coordinator.platforms:
+                return
+            remove_listener()
+            _async_setup_platforms(hass, entry, coordinator)
 
-    hass.data[DOMAIN][entry.entry_id] = coordinator
+        remove_listener = coordinator.async_add_listener(_async_first_data)
+    hass.async_create_task(coordinator.async_refresh())
 
-    # Setup Platforms for SENSOR and CALENDAR
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    async_setup_services(hass)
+
+    return True
+
+
+@callback
+def _async_setup_platforms(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    coordinator: EskomLoadsheddingDataCoordinator,
+) -> None:
+    """Set up the platforms enabled in the options."""
     for platform in PLATFORMS:
         if entry.options.get(platform, True):
             coordinator.platforms.append(platform)
-            hass.async_add_job(
+            hass.async_create_task(
                 hass.config_entries.async_forward_entry_setup(entry, platform)
             )
 
-    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
-
-    return True
-
 
 class EskomLoadsheddingDataCoordinator(DataUpdateCoordinator):
     """Class to manage fetching data from the API."""
 
-    def __init__(self, hass: HomeAssistant, client: EskomAPI) -> None:
+    def __init__(
+        self, hass: HomeAssistant, client: EskomAPI, entry: ConfigEntry
+    ) -> None:
         """Initialize the data object."""
         self.hass = hass
         self.platforms = []
         self.api: EskomAPI = client
+        self.polling: AdaptivePollingScheduler | None = None
+        self.max_stale_age = timedelta(
+            minutes=entry.options.get(CONF_MAX_STALE_AGE, DEFAULT_MAX_STALE_AGE)
+        )
+        self._store = Store(hass, STORAGE_VERSION, f"{STORAGE_KEY}.{entry.entry_id}")
+        self._history_store = Store(
+            hass, STORAGE_VERSION, f"{HISTORY_STORAGE_KEY}.{entry.entry_id}"
+        )
+        self.history = StageHistory()
+        self._history_changed = False
+        self._cancel_history_saves: CALLBACK_TYPE | None = None
+        self.events = ScheduleEvents(
+            hass, self.timeline, lead_times_from_options(entry.options)
+        )
+        self._prefetch: asyncio.Task | None = None
+        self._notified: tuple[bool, int] | None = None
+        self._refresh_listeners: list[CALLBACK_TYPE] = []
+        self._timelines: dict[str, tuple[ScheduleIndex, IntervalSet]] = {}
+        self.generation = 0
 
         super().__init__(self.hass, _LOGGER, name=DOMAIN)
 
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify listeners only when the data they show has changed."""
+        self.events.async_data_updated(self.data, self.api.areas)
+        for update_callback in list(self._refresh_listeners):
+            update_callback()
+        notified = (self.last_update_success, _content_hash(self.data))
+        if notified == self._notified:
+            _LOGGER.debug("Data unchanged, skipping state writes")
+            return
+
+        self._notified = notified
+        self.generation += 1
+        super().async_update_listeners()
+
+    @callback
+    def async_add_refresh_listener(
+        self, update_callback: CALLBACK_TYPE
+    ) -> CALLBACK_TYPE:
+        """Listen for every refresh, including those that left the data as is."""
+        self._refresh_listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._refresh_listeners.remove(update_callback)
+
+        return remove_listener
+
+    def timeline(self, area_id: str) -> IntervalSet | None:
+        """Return the timeline of an area, built once per schedule."""
+        if self.data is None:
+            return None
+        if (schedule := self.data[ATTR_SCHEDULES].get(area_id)) is None:
+            return None
+
+        cached = self._timelines.get(area_id)
+        if cached is None or cached[0] is not schedule:
+            cached = self._timelines[area_id] = (schedule, IntervalSet(schedule))
+        return cached[1]
+
+    def set_scan_interval(self, scan_interval: timedelta | None) -> None:
+        """Set the base scan interval, or None to disable polling."""
+        self.update_interval = scan_interval
+        self.polling = (
+            AdaptivePollingScheduler(scan_interval) if scan_interval else None
+        )
+
+    def _schedule_next_poll(self, schedules: Iterable[ScheduleIndex] = ()) -> None:
+        """Adapt the update interval used to schedule the next refresh."""
+        if self.polling is not None:
+            self.update_interval = self.polling.next_interval(
+                dt_util.utcnow(), schedules
+            )
+            _LOGGER.debug("Next refresh in %s", self.update_interval)
+
+    async def async_restore(self) -> bool:
+        """Restore the last good results saved to disk."""
+        stored = await self._store.async_load()
+        if not stored:
+            return False
+
+        # Discard snapshots taken for different areas
+        if stored.get(CONF_AREAS) != [area.as_dict() for area in self.api.areas]:
+            return False
+
+        try:
+            results = EskomLoadsheddingResults.from_json_dict(stored)
+        except (KeyError, ValueError) as ex:
+            _LOGGER.warning("Ignoring invalid stored results: %s", ex)
+            return False
+
+        # Results are served as stale until the first refresh succeeds
+        results.stale = True
+        data = results.dict()
+        if (age := self._stale_age(data)) is None:
+            return False
+        data[ATTR_STALE_AGE] = round(age.total_seconds())
+
+        _LOGGER.debug("Restored results saved to disk")
+        self.api.results = results
+        self.async_set_updated_data(data)
+        return True
+
+    async def async_restore_history(self) -> None:
+        """Restore the stage history saved to disk."""
+        if not (stored := await self._history_store.async_load()):
+            return
+
+        try:
+            self.history = StageHistory(
+                (int(stage), float(start), float(end))
+                for stage, start, end in stored["spans"]
+            )
+        except (KeyError, TypeError, ValueError) as ex:
+            _LOGGER.warning("Ignoring invalid stored stage history: %s", ex)
+
+    async def async_save_history(self) -> None:
+        """Save the stage history now rather than at the next save interval."""
+        await self._history_store.async_save(self._history_to_save())
+
+    @callback
+    def async_schedule_history_saves(self) -> None:
+        """Save the stage history at an interval while stages are polled."""
+        self._cancel_history_saves = async_track_time_interval(
+            self.hass, self._async_save_history_changes, HISTORY_SAVE_INTERVAL
+        )
+
+    def cancel_history_saves(self) -> None:
+        """Stop saving the stage history at an interval."""
+        if self._cancel_history_saves is not None:
+            self._cancel_history_saves()
+            self._cancel_history_saves = None
+
+    @callback
+    def _async_save_history_changes(self, _: datetime) -> None:
+        """Save the stage history if stages were recorded since the last save."""
+        if self._history_changed:
+            self._history_store.async_delay_save(self._history_to_save)
+
+    @callback
+    def _history_to_save(self) -> dict[str, Any]:
+        """Return the compacted stage history to save to disk."""
+        self._history_changed = False
+        self.history.prune(dt_util.utcnow() - HISTORY_RETENTION)
+        return {
+            "spans": [
+                [stage, round(start), round(end)]
+                for stage, start, end in self.history.spans()
+            ]
+        }
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the results to save to disk."""
+        return {
+            **self.api.results.json_dict(),
+            CONF_AREAS: [area.as_dict() for area in self.api.areas],
+        }
+
+    def _stale_age(self, results: dict[str, Any]) -> timedelta | None:
+        """Return the age of stale results, or None if they are too old to use."""
+        last_updated = results[ATTR_LAST_UPDATED]
+        if last_updated is None:
+            return None
+        age = dt_util.utcnow() - last_updated
+        return age if age <= self.max_stale_age else None
+
     async def _async_update_data(self):
         """Update data via library."""
+        with profiler.section("coordinator_refresh"):
+            return await self._async_fetch_results()
+
+    async def _async_fetch_results(self) -> dict[str, Any]:
+        """Fetch the results and handle stale data and notifications."""
         results: dict[str, Any] = {}
 
         try:
-            results = await self.hass.async_add_executor_job(self.api.get_data)
+            # A refresh past its deadline is cancelled along with its requests
+            async with async_timeout.timeout(REFRESH_TIMEOUT):
+                results = await self.api.async_get_data()
+        except asyncio.TimeoutError:
+            _LOGGER.error("Update did not complete within %ss", REFRESH_TIMEOUT)
+            self.api.record_failure(FAILURE_REFRESH_TIMEOUT)
+            # The read is cancelled, so serve the last results as they were
+            results = {**self.api.results.dict(), ATTR_STALE: True}
         except Exception as exception:
             _LOGGER.error("Error while updating")
+            if self.polling is not None:
+                self.polling.record_failure()
+            self._schedule_next_poll()
             raise UpdateFailed() from exception
 
-        # Create notification if Eskom is unavailable
-        if results["stage"] == UNKNOWN_STAGE.value:
-            _LOGGER.error("Unable to reach Eskom")
-            persistent_notification.async_create(
-                self.hass,
-                title="Eskom communication error",
-                message=NOTIF_MSG_NO_ESKOM,
-                notification_id=NOTIFICATION_ID,
+        if results[ATTR_STALE]:
+            # Serve the last known results while revalidating on the next polls
+            if self.polling is not None:
+                self.polling.record_failure()
+            self._schedule_next_poll(results[ATTR_SCHEDULES].values())
+
+            if (age := self._stale_age(results)) is None:
+                # Create notification if Eskom is unavailable
+                _LOGGER.error("Unable to reach Eskom")
+                persistent_notification.async_create(
+                    self.hass,
+                    title="Eskom communication error",
+                    message=NOTIF_MSG_NO_ESKOM,
+                    notification_id=NOTIFICATION_ID,
+                )
+                raise UpdateFailed("No recent data available from Eskom")
+
+            _LOGGER.warning("Unable to reach Eskom, serving data from %s ago", age)
+            results[ATTR_STALE_AGE] = round(age.total_seconds())
+            return results
+
+        persistent_notification.async_dismiss(self.hass, NOTIFICATION_ID)
+        if self.polling is not None:
+            self.polling.record_success(
+                self.data is None or results["stage"] != self.data["stage"]
             )
-        else:
-            persistent_notification.async_dismiss(self.hass, NOTIFICATION_ID)
+        self._schedule_next_poll(results[ATTR_SCHEDULES].values())
 
-        # Create notification if no schedule
-        if results["schedule"] == [] and results["stage"] != UNKNOWN_STAGE.value:
-            _LOGGER.error("Unable to reach Eskom")
+        # Create notification if no area is configured
+        if not self.api.areas:
+            _LOGGER.error("No areas configured")
             persistent_notification.async_create(
                 self.hass,
                 title="Eskom configuration missing",
@@ -117,8 +370,49 @@ class EskomLoadsheddingDataCoordinator(DataUpdateCoordinator):
         else:
             persistent_notification.async_dismiss(self.hass, NOTIFICATION_CONFIG_ID)
 
+        self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+
+        # Polled stages are compacted into the history when it is saved
+        self.history.record(results[ATTR_SHEDDING_STAGE], dt_util.utcnow())
+        self._history_changed = True
+
+        # Cache the schedules of other stages before the next stage change
+        if self._prefetch is None or self._prefetch.done():
+            self._prefetch = self.hass.async_create_task(
+                self.api.async_prefetch_schedules()
+            )
+
         return results
 
+    def cancel_prefetch(self) -> None:
+        """Stop caching schedules in the background."""
+        if self._prefetch is not None:
+            self._prefetch.cancel()
+
+
+def _content_hash(data: dict[str, Any] | None) -> int:
+    """Return a hash of the data shown by entities.
+
+    The last update time is left out, so entities do not show it; it is in
+    the diagnostics instead. The next slot of every area is included so that
+    entities still update once a slot has passed.
+    """
+    if data is None:
+        return hash(None)
+
+    now = dt_util.utcnow()
+    return hash(
+        (
+            data[ATTR_SHEDDING_STAGE],
+            data[ATTR_STALE],
+            data.get(ATTR_STALE_AGE),
+            tuple(
+                (area_id, schedule, schedule.next_slot(now))
+                for area_id, schedule in sorted(data[ATTR_SCHEDULES].items())
+            ),
+        )
+    )
+
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload Eskom Entry from config_entry."""
@@ -137,11 +431,55 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         )
     )
     if unloaded:
+        coordinator.cancel_prefetch()
+        coordinator.events.async_cancel()
+        coordinator.cancel_history_saves()
+        await coordinator.async_shutdown()
+        await coordinator.async_save_history()
         hass.data[DOMAIN].pop(entry.entry_id)
+        if not hass.data[DOMAIN]:
+            async_unload_services(hass)
 
     return unloaded
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the results and stage history saved to disk for a deleted entry."""
+    await Store(hass, STORAGE_VERSION, f"{STORAGE_KEY}.{entry.entry_id}").async_remove()
+    await Store(
+        hass, STORAGE_VERSION, f"{HISTORY_STORAGE_KEY}.{entry.entry_id}"
+    ).async_remove()
+
+
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Migrate an entry saved by an older version."""
+    if entry.version == 1:
+        # The calendar of the single area became one calendar per area
+        if areas := areas_from_options(entry.options):
+            unique_id = f"{ATTR_CALENDAR_ID}_{areas[0].id}"
+
+            @callback
+            def _async_migrate_calendar(
+                entity_entry: er.RegistryEntry,
+            ) -> dict[str, Any] | None:
+                if (
+                    entity_entry.domain == Platform.CALENDAR
+                    and entity_entry.unique_id == ATTR_CALENDAR_ID
+                ):
+                    return {"new_unique_id": unique_id}
+                return None
+
+            await er.async_migrate_entries(
+                hass, entry.entry_id, _async_migrate_calendar
+            )
+
+        entry.version = 2
+        hass.config_entries.async_update_entry(entry)
+        _LOGGER.debug("Migrated entry %s to version 2", entry.entry_id)
+
+    return True
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Integration Reload"""
     await async_unload_entry(hass, entry)
@@ -151,14 +489,13 @@ async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
 async def options_updated_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options update."""
     if entry.options[CONF_MANUAL]:
-        hass.data[DOMAIN][entry.entry_id].update_interval = None
+        hass.data[DOMAIN][entry.entry_id].set_scan_interval(None)
         return
 
-    hass.data[DOMAIN][entry.entry_id].update_interval = timedelta(
-        minutes=entry.options[CONF_SCAN_INTERVAL]
+    hass.data[DOMAIN][entry.entry_id].set_scan_interval(
+        timedelta(minutes=entry.options[CONF_SCAN_INTERVAL])
     )
 
-    hass.data[DOMAIN][entry.entry_id].api.set_province(entry.options[CONF_PROVINCE_ID])
-    hass.data[DOMAIN][entry.entry_id].api.set_suburb(entry.options[CONF_SUBURB_ID])
+    hass.data[DOMAIN][entry.entry_id].api.set_areas(areas_from_options(entry.options))
 
     await hass.data[DOMAIN][entry.entry_id].async_request_refresh()
@@ -1,13 +1,52 @@
 """Integration API"""
-from datetime import datetime, timedelta, timezone
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+import json
 import logging
-
-from load_shedding.load_shedding import ScheduleError, get_schedule
-from load_shedding.providers.eskom import Eskom, ProviderError, Province, Stage, Suburb
-
-from .const import ATTR_SCHEDULE, ATTR_SHEDDING_STAGE, DEBUG_SCHEDULE, DEBUG_STAGE
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import ClientError, ClientSession
+import async_timeout
+from homeassistant.const import CONF_NAME
+
+from . import profiler, provider
+from .breaker import CircuitBreaker
+from .const import (
+    ATTR_LAST_UPDATED,
+    ATTR_SCHEDULES,
+    ATTR_SHEDDING_STAGE,
+    ATTR_STALE,
+    CIRCUIT_CLOSED,
+    CONF_AREAS,
+    CONF_PROVINCE_ID,
+    CONF_SUBURB_ID,
+    FAILURE_CIRCUIT_OPEN,
+    FAILURE_CONNECTION,
+    FAILURE_HTTP_STATUS,
+    FAILURE_PARSE,
+    FAILURE_REJECTED,
+    FAILURE_REQUEST_TIMEOUT,
+    SAST,
+    SCHEDULE_CACHE_SIZE,
+)
+from .metrics import ApiMetrics
+from .schedule import ScheduleCache, ScheduleIndex
+from .timeline import start_of_day
+from .timetable import Timetable
+
+if TYPE_CHECKING:
+    from load_shedding.providers.eskom import Province, Stage, Suburb
 
 TIMEOUT = 10
+MAX_CONCURRENT_REQUESTS = 2
+BASE_URL = "https://loadshedding.eskom.co.za/LoadShedding"
+MAX_SUBURB_RESULTS = 10
+SCHEDULE_DAYS = 7
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -15,149 +54,527 @@ _LOGGER = logging.getLogger(__name__)
 class EskomAPI:
     """Interface class to obtain loadshedding information using the Eskom API."""
 
-    def __init__(self, province: str, suburb: str, debug=False):
+    def __init__(
+        self,
+        session: ClientSession,
+        areas: list[Area] | None = None,
+        debug=False,
+        base_url: str = BASE_URL,
+        metrics: ApiMetrics | None = None,
+    ):
         """Initializes class parameters"""
-        # self.eskom = Eskom()
         self.results = EskomLoadsheddingResults()
 
         self._stage_changed_flag = True
-        self._province = province
-        self._suburb = suburb
+        self._areas: list[Area] = areas or []
+        self._stale_areas: set[str] = set()
         self._debug_flag: bool = debug
+        self._session = session
+        self._base_url = base_url
+        self._request_slots = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        self._schedule_slots = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        self.failures: Counter[str] = Counter()
+        self.breaker = CircuitBreaker()
+        self.schedule_cache = ScheduleCache(SCHEDULE_CACHE_SIZE)
+        self._pending: asyncio.Future | None = None
+        self._waiters = 0
+        self.metrics = metrics or ApiMetrics()
+
+    def record_failure(self, reason: str) -> None:
+        """Count a failed request by reason"""
+        self.failures[reason] += 1
+
+    async def _async_request(
+        self, call: str, path: str, params: dict | None = None
+    ) -> str:
+        """Perform a GET request against the Eskom API on the shared session
+
+        The deadline covers waiting for a request slot, so a hung Eskom
+        endpoint cannot queue up more than MAX_CONCURRENT_REQUESTS requests.
+        Requests are rejected without reaching Eskom while the circuit
+        breaker is open or the retry budget is spent.
+        """
+        if not self.breaker.allow_request():
+            self.record_failure(FAILURE_CIRCUIT_OPEN)
+            ex = provider.ProviderError(f"Eskom circuit is {self.breaker.state}")
+            self.metrics.record_failure(call, ex)
+            raise ex
+
+        url = f"{self._base_url}/{path}"
+        _LOGGER.debug("GET %s", url)
+        try:
+            with self.metrics.network(call):
+                async with async_timeout.timeout(TIMEOUT), self._request_slots:
+                    async with self._session.get(url, params=params) as response:
+                        if response.status != 200:
+                            self._record_request_failure(FAILURE_HTTP_STATUS)
+                            raise provider.ProviderError(
+                                f"Eskom responded with {response.status}"
+                            )
+                        data = await response.text()
+        except asyncio.TimeoutError as ex:
+            self._record_request_failure(FAILURE_REQUEST_TIMEOUT)
+            raise provider.ProviderError(
+                f"Eskom did not respond within {TIMEOUT}s"
+            ) from ex
+        except ClientError as ex:
+            self._record_request_failure(FAILURE_CONNECTION)
+            raise provider.ProviderError("Eskom is unavailable.") from ex
+        finally:
+            self.breaker.release()
+
+        self.breaker.record_success()
+        return data
 
-    def find_suburbs(self, search_text):
+    def _record_request_failure(self, reason: str) -> None:
+        """Count a failed request against the circuit breaker"""
+        self.record_failure(reason)
+        self.breaker.record_failure()
+
+    async def async_find_suburbs(self, search_text: str) -> list[Suburb] | None:
         """Searh for suburb"""
-        try:
-            eskom = Eskom()
-            return eskom.find_suburbs(search_text)
-        except ProviderError as ex:
-            _LOGGER.info("Provider Error %s", ex)
-        except ValueError as ex:
-            raise EskomRequestRejectedException("Request Rejected") from ex
-        except Exception as ex:
-            raise EskomException("Esception calling find_suburbs") from ex
-
-    def set_province(self, province):
-        """Set Province"""
-        self._province = province
-
-    def set_suburb(self, suburb):
-        """Set Suburb"""
-        self._suburb = suburb
-
-    def get_stage(self) -> Stage:
+        with self.metrics.timed("find_suburbs"):
+            try:
+                data = await self._async_request(
+                    "find_suburbs",
+                    "FindSuburbs",
+                    {"searchText": search_text, "maxResults": MAX_SUBURB_RESULTS},
+                )
+                with self.metrics.on_loop():
+                    return json.loads(data, object_hook=lambda d: provider.Suburb(**d))
+            except provider.ProviderError as ex:
+                _LOGGER.info("Provider Error %s", ex)
+            except ValueError as ex:
+                self.record_failure(FAILURE_REJECTED)
+                self.metrics.record_failure("find_suburbs", ex)
+                raise EskomRequestRejectedException("Request Rejected") from ex
+            except Exception as ex:
+                raise EskomException("Esception calling find_suburbs") from ex
+            return None
+
+    @property
+    def areas(self) -> list[Area]:
+        """Return configured areas"""
+        return self._areas
+
+    def set_areas(self, areas: list[Area]) -> None:
+        """Set Areas"""
+        self._areas = areas
+        self._stale_areas.update(area.id for area in areas)
+
+    async def async_get_stage(self) -> Stage:
         """Return load shedding stage"""
         _LOGGER.info("Trigger getStage()")
-        stage: Stage = Stage.UNKNOWN
+        stage: Stage = provider.Stage.UNKNOWN
 
         if self._debug_flag:
+            from .debug import DEBUG_STAGE  # pylint: disable=import-outside-toplevel
+
             stage = DEBUG_STAGE
         else:
-
             try:
-                eskom = Eskom()
-                stage = eskom.get_stage()
-            except ProviderError as ex:
+                with self.metrics.timed("get_stage"):
+                    data = await self._async_request("get_stage", "GetStatus")
+                stage = provider.Eskom.stage_from_status(data.strip())
+                if stage is provider.Stage.UNKNOWN:
+                    self.record_failure(FAILURE_PARSE)
+            except provider.ProviderError as ex:
                 _LOGGER.info("Provider Error %s", ex)
             except Exception as ex:
                 _LOGGER.info("Exception %s", ex)
 
+        # Keep the last known stage if Eskom could not be reached
+        if stage is provider.Stage.UNKNOWN:
+            return stage
+
         # Is new stage same as previous results stage
-        if stage == self.results.stage:
-            self._stage_changed_flag = False
+        self._stage_changed_flag = stage != self.results.stage
+        if self._stage_changed_flag:
+            # Schedules stay stale until they have been read for the new stage
+            self._stale_areas.update(area.id for area in self._areas)
 
         self.results.stage = stage
         return self.results.stage
 
     def clear_schedule(self) -> None:
         """Clear schedule"""
-        self.results.schedule = []
+        self.results.schedules = {}
+
+    async def _async_read_timetable(
+        self,
+        province: Province,
+        suburb: Suburb,
+        stage: Stage,
+        start: datetime,
+        end: datetime,
+        prefetch: bool = False,
+    ) -> Timetable | None:
+        """Return the timetable of a stage covering a range from the cache,
+        reading it on a miss
+
+        Prefetched timetables are not counted as cache hits or misses.
+        """
+        key = (
+            province.value,
+            suburb.id,
+            stage.value,
+            datetime.now(SAST).strftime("%Y-%m"),
+        )
+        lookup = self.schedule_cache.peek if prefetch else self.schedule_cache.get
+        if (timetable := lookup(key, start, end)) is not None:
+            return timetable
 
-    def get_schedule(self, province: Province, suburb: Suburb, stage: Stage) -> tuple:
-        """Return schedule"""
         _LOGGER.info("Get_Schedule: Getting info for suburb: %s", suburb.id)
+        try:
+            data = await self._async_request(
+                "get_schedule",
+                f"GetScheduleM/{suburb.id}/{stage.value}/{province.value}/3252",
+            )
+        except provider.ProviderError as ex:
+            _LOGGER.error(ex.args[0])
+            return None
+        try:
+            with self.metrics.on_loop():
+                schedule, days = parse_schedule_page(data, suburb)
+                timetable = Timetable(
+                    ScheduleIndex.from_iso(schedule), (day.day for day in days)
+                )
+        except (provider.ProviderError, ValueError) as ex:
+            _LOGGER.error(ex.args[0])
+            self.record_failure(FAILURE_PARSE)
+            self.metrics.record_failure("get_schedule", ex)
+            return None
+
+        self.schedule_cache.set(key, timetable)
+        return timetable
+
+    async def async_get_schedule(
+        self, province: Province, suburb: Suburb, stage: Stage
+    ) -> ScheduleIndex | None:
+        """Return schedule, or None if it could not be read
+
+        The schedule is generated from the cached timetable of the area, so
+        Eskom is only asked for the timetable itself.
+        """
+        now = datetime.now(timezone.utc)
+        if self._debug_flag:
+            _LOGGER.info("Get_Schedule: DEBUG SET")
+            from .debug import DEBUG_SCHEDULE  # pylint: disable=import-outside-toplevel
 
-        self.clear_schedule()
+            schedule = ScheduleIndex.from_iso(DEBUG_SCHEDULE)
+            return ScheduleIndex(
+                schedule.slots_in_range(now, now + timedelta(days=SCHEDULE_DAYS))
+            )
 
-        schedule = []
+        now, end = _schedule_range()
+        with self.metrics.timed("get_schedule"):
+            timetable = await self._async_read_timetable(
+                province, suburb, stage, now, end
+            )
+            if timetable is None:
+                return None
+            with self.metrics.on_loop():
+                return timetable.generate(now, end)
+
+    async def async_prefetch_schedules(self) -> None:
+        """Cache the timetables of the stages next to the current one for the
+        configured areas
+
+        Stages usually change one step at a time, so only the stages above
+        and below the current one are read, which keeps the daily re-reads of
+        timetables that no longer cover the schedule range to two per area.
+        Schedules are read one at a time and only while Eskom is healthy, so
+        a stage change can be served from the cache.
+        """
         if self._debug_flag:
-            _LOGGER.info("Get_Schedule: DEBUG SET")
-            schedule = DEBUG_SCHEDULE
-        else:
+            return
+
+        current = max(self.results.stage.value, 0)
+        stages = [
+            stage
+            for stage in provider.Stage
+            if stage.value > 0 and abs(stage.value - current) == 1
+        ]
+        month = datetime.now(SAST).strftime("%Y-%m")
+        start, end = _schedule_range()
+        for area in list(self._areas):
+            for stage in stages:
+                key = (area.province, area.suburb, stage.value, month)
+                if self.schedule_cache.peek(key, start, end) is not None:
+                    continue
+                if self.breaker.state != CIRCUIT_CLOSED or self.breaker.failures:
+                    return
+                async with self._schedule_slots:
+                    await self._async_read_timetable(
+                        provider.Province(area.province),
+                        provider.Suburb(id=area.suburb),
+                        stage,
+                        start,
+                        end,
+                        prefetch=True,
+                    )
+
+    async def _async_update_area(self, area: Area, stage: Stage) -> None:
+        """Read the schedule of an area, keeping the last one on failure"""
+        # Bound concurrent schedule reads outside the per-request deadline
+        async with self._schedule_slots:
+            schedule = await self.async_get_schedule(
+                province=provider.Province(area.province),
+                suburb=provider.Suburb(id=area.suburb),
+                stage=stage,
+            )
+
+        if schedule is None:
+            # Keep the last schedule and read it again on the next update
+            self.results.stale = True
+            return
+
+        self.results.schedules[area.id] = schedule
+        self._stale_areas.discard(area.id)
+
+    async def async_get_data(self) -> dict[str, Any]:
+        """Get data, sharing a read that is already in flight
+
+        Refreshes requested while a read is running wait for that read instead
+        of starting another one, so results are only updated by one read at a
+        time. A waiting caller can be cancelled without cancelling the read
+        for the others, and the read is cancelled with the last one.
+        """
+        with profiler.section("get_data"):
+            if self._pending is None:
+                self._pending = asyncio.ensure_future(self._async_read_data())
+                self._pending.add_done_callback(self._read_done)
+            else:
+                _LOGGER.debug("GetData: Joining the read in flight")
+
+            pending = self._pending
+            self._waiters += 1
             try:
-                provider = Eskom()
-                schedule = get_schedule(
-                    provider, province=province, suburb=suburb, stage=stage
-                )
-            except ScheduleError as ex:
-                _LOGGER.error(ex.args[0])
-            except ProviderError as ex:
-                _LOGGER.error(ex.args[0])
-
-        utc_tz = timezone.utc
-        days = 7
-        for item in schedule:
-            start = datetime.fromisoformat(item[0])
-            end = datetime.fromisoformat(item[1])
-            if start > datetime.now(utc_tz) + timedelta(days=days):
-                continue
-            if end < datetime.now(utc_tz):
-                continue
-            self.results.schedule.append(item)
-
-        return self.results.schedule
-
-    def get_data(self):
-        """get data"""
+                return dict(await asyncio.shield(pending))
+            finally:
+                self._waiters -= 1
+                if not self._waiters and not pending.done():
+                    _LOGGER.debug("GetData: Cancelling the read, no caller waits")
+                    pending.cancel()
+
+    def _read_done(self, pending: asyncio.Future) -> None:
+        """Allow the next call to start a new read"""
+        if self._pending is pending:
+            self._pending = None
+        if not pending.cancelled():
+            # Retrieve the exception so an unawaited failure is not logged
+            pending.exception()
+
+    async def _async_read_data(self) -> dict[str, Any]:
+        """Read the stage and the schedules that need updating"""
 
         # Get Stage
-        stage: Stage = self.get_stage()
-        if stage is not Stage.UNKNOWN:
-            _LOGGER.warning("GetData:Schedule: Skipping.. Stage is UNKNOWN")
+        stage: Stage = await self.async_get_stage()
+        if stage is provider.Stage.UNKNOWN:
+            _LOGGER.warning("GetData:Schedule: Stage is UNKNOWN.. Serving last results")
+            self.results.stale = True
             return self.results.dict()
 
-        # Get Schedule
-        # Use error codes..
-        if self._province and self._suburb:
-            if stage is Stage.NO_LOAD_SHEDDING:
-                _LOGGER.info("GetData:Schedule: Stage is 0... Clearing Schedule")
-                self.clear_schedule()
-            else:
-                _LOGGER.info(
-                    "GetData:Schedule: Has the stage changed? %s ",
-                    self._stage_changed_flag,
-                )
-                if (self._stage_changed_flag) or (len(self.results.schedule) == 0):
-                    _LOGGER.info(
-                        "GetData:Schedule: Schedule: Read and update Schedule "
-                    )
-                    self.get_schedule(
-                        province=Province(self._province),
-                        suburb=Suburb(id=self._suburb),
-                        stage=stage,
-                    )
-                    _LOGGER.info("GetData:Schedule: Schedule: Done.... ")
+        # Get Schedules
+        self.results.stale = False
+        if not self._areas:
+            _LOGGER.warning("GetData:Schedule: Skipping.. No areas configured")
+        elif stage is provider.Stage.NO_LOAD_SHEDDING:
+            _LOGGER.info("GetData:Schedule: Stage is 0... Clearing Schedule")
+            self.clear_schedule()
+            self._stale_areas.clear()
         else:
-            _LOGGER.warning(
-                "GetData:Schedule: Skipping.. Either Province or Suburb aren't missing"
+            _LOGGER.info(
+                "GetData:Schedule: Has the stage changed? %s ",
+                self._stage_changed_flag,
             )
+            areas = [
+                area
+                for area in self._areas
+                if area.id in self._stale_areas
+                or not self.results.schedules.get(area.id)
+            ]
+            if areas:
+                _LOGGER.info(
+                    "GetData:Schedule: Read and update %s schedules", len(areas)
+                )
+                await asyncio.gather(
+                    *(self._async_update_area(area, stage) for area in areas)
+                )
+                _LOGGER.info("GetData:Schedule: Schedule: Done.... ")
+
+        # Drop schedules of areas that are no longer configured
+        area_ids = {area.id for area in self._areas}
+        for area_id in set(self.results.schedules) - area_ids:
+            del self.results.schedules[area_id]
+
+        if not self.results.stale:
+            self.results.last_updated = datetime.now(timezone.utc)
 
         return self.results.dict()
 
 
+def schedule_horizon(read_at: datetime) -> datetime:
+    """Return the end of the last day a schedule page read at a point in time
+    lists"""
+    return start_of_day(read_at) + timedelta(days=SCHEDULE_DAYS)
+
+
+def _schedule_range() -> tuple[datetime, datetime]:
+    """Return the range of the schedule from now, ending with the last day a
+    schedule page read now lists"""
+    now = datetime.now(timezone.utc)
+    return now, schedule_horizon(now)
+
+
+def parse_schedule(data: str, suburb: Suburb) -> list[tuple[str, str]]:
+    """Parse the Eskom schedule page into a list of UTC ISO (start, end) tuples"""
+    return parse_schedule_page(data, suburb)[0]
+
+
+def parse_schedule_page(
+    data: str, suburb: Suburb
+) -> tuple[list[tuple[str, str]], list[date]]:
+    """Parse the Eskom schedule page into UTC ISO (start, end) tuples and the
+    days the page lists"""
+    # Loaded with the provider library, so only imported once it is in use
+    from bs4 import BeautifulSoup  # pylint: disable=import-outside-toplevel
+
+    soup = BeautifulSoup(data, "html.parser")
+    days_soup = soup.find_all("div", attrs={"class": "scheduleDay"})
+
+    if not days_soup:
+        _LOGGER.error("Unable to parse schedule. %s", data)
+        raise provider.ProviderError(f"No data available (Suburb ID: {suburb.id})")
+
+    now = datetime.now(SAST)
+    schedule = []
+    days = []
+    for day in days_soup:
+        date_str = day.find("div", attrs={"class": "dayMonth"}).get_text().strip()
+        day_month = datetime.strptime(date_str, "%a, %d %b")
+        days.append(now.replace(month=day_month.month, day=day_month.day).date())
+
+        for time_tag in day.find_all("a"):
+            start_str, end_str = time_tag.get_text().strip().split(" - ")
+            start = datetime.strptime(start_str, "%H:%M")
+            end = datetime.strptime(end_str, "%H:%M")
+            slot_start = now.replace(
+                month=day_month.month,
+                day=day_month.day,
+                hour=start.hour,
+                minute=start.minute,
+                second=0,
+                microsecond=0,
+            )
+            slot_end = slot_start.replace(hour=end.hour, minute=end.minute)
+            # Slots such as 22:00 - 00:30 end on the next day
+            if slot_end <= slot_start:
+                slot_end += timedelta(days=1)
+            schedule.append(
+                (
+                    slot_start.astimezone(timezone.utc).isoformat(),
+                    slot_end.astimezone(timezone.utc).isoformat(),
+                )
+            )
+
+    return schedule, days
+
+
+@dataclass(frozen=True)
+class Area:
+    """Area to read the load shedding schedule for"""
+
+    province: int
+    suburb: int
+    name: str | None = None
+
+    @property
+    def id(self) -> str:
+        """Return the area identifier"""
+        return str(self.suburb)
+
+    @property
+    def title(self) -> str:
+        """Return a name for the area"""
+        return self.name or self.id
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the area as stored in the config entry options"""
+        return {
+            CONF_PROVINCE_ID: self.province,
+            CONF_SUBURB_ID: self.suburb,
+            CONF_NAME: self.name,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Area:
+        """Return the area stored in the config entry options"""
+        return cls(data[CONF_PROVINCE_ID], data[CONF_SUBURB_ID], data.get(CONF_NAME))
+
+
+def areas_from_options(options: Mapping[str, Any]) -> list[Area]:
+    """Return the areas configured in the config entry options"""
+    if CONF_AREAS in options:
+        return [Area.from_dict(area) for area in options[CONF_AREAS]]
+
+    # Options saved before multiple areas were supported
+    if options.get(CONF_PROVINCE_ID) and options.get(CONF_SUBURB_ID):
+        return [Area(options[CONF_PROVINCE_ID], options[CONF_SUBURB_ID])]
+    return []
+
+
 class EskomLoadsheddingResults:
     """Class for holding the results"""
 
-    def __init__(self, stage=Stage.UNKNOWN, schedule=[]):
+    def __init__(
+        self,
+        stage: Stage | None = None,
+        schedules: dict[str, ScheduleIndex] | None = None,
+        last_updated: datetime | None = None,
+    ):
         """Init Results"""
-        self.stage = stage
-        self.schedule = schedule
+        self.stage = provider.Stage.UNKNOWN if stage is None else stage
+        self.schedules = schedules if schedules is not None else {}
+        self.last_updated = last_updated
+        self.stale = False
 
     def dict(self):
         """Return dictionary of result data"""
-        data = {ATTR_SHEDDING_STAGE: self.stage.value, ATTR_SCHEDULE: self.schedule}
+        data = {
+            ATTR_SHEDDING_STAGE: self.stage.value,
+            ATTR_SCHEDULES: dict(self.schedules),
+            ATTR_LAST_UPDATED: self.last_updated,
+            ATTR_STALE: self.stale,
+        }
         return data
 
+    def json_dict(self):
+        """Return dictionary of result data that can be serialized to JSON"""
+        return {
+            ATTR_SHEDDING_STAGE: self.stage.value,
+            ATTR_SCHEDULES: {
+                area_id: schedule.as_list()
+                for area_id, schedule in self.schedules.items()
+            },
+            ATTR_LAST_UPDATED: self.last_updated.isoformat()
+            if self.last_updated
+            else None,
+        }
+
+    @classmethod
+    def from_json_dict(cls, data: dict) -> EskomLoadsheddingResults:
+        """Rebuild results from a dictionary produced by json_dict()"""
+        last_updated = data.get(ATTR_LAST_UPDATED)
+        return cls(
+            stage=provider.Stage(data[ATTR_SHEDDING_STAGE]),
+            schedules={
+                area_id: ScheduleIndex.from_iso(schedule)
+                for area_id, schedule in data[ATTR_SCHEDULES].items()
+            },
+            last_updated=datetime.fromisoformat(last_updated) if last_updated else None,
+        )
+
 
 class EskomException(Exception):
     """Base exception for this module"""
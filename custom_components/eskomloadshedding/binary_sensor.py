@@ -0,0 +1,101 @@
+"""Binary sensor telling whether load shedding is active in an area."""
+from __future__ import annotations
+
+from datetime import datetime
+
+from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+from .api import Area
+from .const import DOMAIN, ICON
+from .entity import EskomLoadsheddingEntity
+from .intervals import IntervalSet
+
+
+async def async_setup_entry(hass, entry, async_add_devices):
+    """Setup binary sensor platform."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    async_add_devices(
+        [
+            EskomActiveBinarySensor(coordinator, entry, area)
+            for area in coordinator.api.areas
+        ]
+    )
+
+
+class EskomActiveBinarySensor(EskomLoadsheddingEntity, BinarySensorEntity):
+    """On while a load shedding slot is active in an area.
+
+    The state is not polled. A timer is set for the next outage boundary
+    and set again from the merged outages each time it fires, and only
+    replaced when the schedule of the area changes.
+    """
+
+    def __init__(self, coordinator, config_entry, area: Area):
+        super().__init__(coordinator, config_entry)
+        self.area = area
+        self._timeline: IntervalSet | None = None
+        self._unsub_transition: CALLBACK_TYPE | None = None
+        self._attr_is_on = False
+
+    @property
+    def unique_id(self):
+        """Return a unique ID to use for this entity."""
+        return f"{self.config_entry.entry_id}_{self.area.id}_active"
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return f"{DOMAIN}_{self.area.title}_active"
+
+    @property
+    def icon(self):
+        """Return the icon of the sensor."""
+        return ICON
+
+    def _cancel_transition(self) -> None:
+        if self._unsub_transition is not None:
+            self._unsub_transition()
+            self._unsub_transition = None
+
+    @callback
+    def _schedule_transition(self, now: datetime) -> None:
+        """Set the state at a point in time and a timer for the next boundary."""
+        self._cancel_transition()
+        if self._timeline is None:
+            self._attr_is_on = False
+            return
+
+        self._attr_is_on = self._timeline.contains(now)
+        if (slot := self._timeline.current_or_next(now)) is None:
+            return
+        boundary = slot[0] if slot[0] > now else slot[1]
+        self._unsub_transition = async_track_point_in_utc_time(
+            self.hass, self._async_transition, boundary
+        )
+
+    @callback
+    def _async_transition(self, now: datetime) -> None:
+        """Write the state at a slot boundary and wait for the next one."""
+        self._unsub_transition = None
+        self._schedule_transition(now)
+        self.async_write_ha_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Reschedule the timer when the schedule of the area changed."""
+        timeline = self.coordinator.timeline(self.area.id)
+        if timeline is not self._timeline:
+            self._timeline = timeline
+            self._schedule_transition(dt_util.utcnow())
+        self.async_write_ha_state()
+
+    async def async_added_to_hass(self):
+        """Handle entity which will be added."""
+        self.async_on_remove(
+            self.coordinator.async_add_listener(self._handle_coordinator_update)
+        )
+        self.async_on_remove(self._cancel_transition)
+        self._handle_coordinator_update()
@@ -0,0 +1,105 @@
+"""Circuit breaker around Eskom requests."""
+from __future__ import annotations
+
+from collections.abc import Callable
+import time
+
+from .const import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RESET_TIMEOUT,
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    RETRY_BUDGET,
+    RETRY_BUDGET_PERIOD,
+)
+
+
+class CircuitBreaker:
+    """Stop calling Eskom while it keeps failing.
+
+    The circuit opens after BREAKER_FAILURE_THRESHOLD consecutive failures and
+    rejects requests for BREAKER_RESET_TIMEOUT seconds. It then lets a single
+    trial request through (half open), closing again if it succeeds. Every
+    request made after a failure is a retry and spends from a retry budget
+    that refills over RETRY_BUDGET_PERIOD seconds, which bounds how often a
+    long outage is probed.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+        retry_budget: int = RETRY_BUDGET,
+        retry_budget_period: float = RETRY_BUDGET_PERIOD,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the circuit breaker."""
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._retry_budget = retry_budget
+        self._refill_rate = retry_budget / retry_budget_period
+        self._clock = clock
+
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._tokens = float(retry_budget)
+        self._refilled_at = clock()
+
+    @property
+    def state(self) -> str:
+        """Return the circuit state."""
+        if self.failures < self._failure_threshold:
+            return CIRCUIT_CLOSED
+        if self._clock() - self._opened_at < self._reset_timeout:
+            return CIRCUIT_OPEN
+        return CIRCUIT_HALF_OPEN
+
+    @property
+    def retry_tokens(self) -> int:
+        """Return the number of retries left in the budget."""
+        self._refill()
+        return int(self._tokens)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(
+            self._retry_budget,
+            self._tokens + (now - self._refilled_at) * self._refill_rate,
+        )
+        self._refilled_at = now
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be made now."""
+        state = self.state
+        if state == CIRCUIT_OPEN:
+            return False
+        if state == CIRCUIT_HALF_OPEN and self._trial_in_flight:
+            return False
+
+        if self.failures:
+            self._refill()
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+
+        if state == CIRCUIT_HALF_OPEN:
+            self._trial_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        """Record a successful request and close the circuit."""
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a failed request, opening the circuit past the threshold."""
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.failures >= self._failure_threshold:
+            self._opened_at = self._clock()
+
+    def release(self) -> None:
+        """Release a trial request that ended without a result."""
+        self._trial_in_flight = False
@@ -1,7 +1,7 @@
 """Support for Eskom Load Shedding Calendar."""
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from typing import Any
 
 from homeassistant.components.calendar import CalendarEntity, CalendarEvent
@@ -10,25 +10,24 @@ from homeassistant.const import ATTR_ATTRIBUTION
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from load_shedding.providers.eskom import Province
 
-from . import EskomLoadsheddingDataCoordinator
+from . import EskomLoadsheddingDataCoordinator, profiler, provider
+from .api import Area
 from .const import (
+    ATTR_AREA_NAME,
     ATTR_CALENDAR_EVENT_SUMMARY,
     ATTR_CALENDAR_ICON,
     ATTR_CALENDAR_ID,
     ATTR_CALENDAR_NAME,
     ATTR_PROVINCE_ID,
     ATTR_PROVINCE_NAME,
-    ATTR_SCHEDULE,
+    ATTR_STALE_AGE,
     ATTR_SUBURB_ID,
     ATTRIBUTION,
-    CONF_PROVINCE_ID,
-    CONF_SUBURB_ID,
-    DATE_TIME_FORMAT,
     DOMAIN,
-    NOT_CONFIGURED,
 )
+from .intervals import IntervalSet
+from .schedule import Slot
 
 
 async def async_setup_entry(
@@ -36,58 +35,48 @@ async def async_setup_entry(
     entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
-    """Set up Twente Milieu calendar based on a config entry."""
+    """Set up a load shedding calendar per area based on a config entry."""
     eskom_loadshedding_coordinator = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities([EskomLoadsheddingCalendar(eskom_loadshedding_coordinator)])
+    async_add_entities(
+        EskomLoadsheddingCalendar(eskom_loadshedding_coordinator, area)
+        for area in eskom_loadshedding_coordinator.api.areas
+    )
 
 
 class EskomLoadsheddingCalendar(
     CoordinatorEntity[EskomLoadsheddingDataCoordinator], CalendarEntity
 ):
-    """Defines a Twente Milieu calendar."""
+    """Defines a load shedding calendar for an area."""
 
-    _attr_name = ATTR_CALENDAR_NAME
     _attr_icon = ATTR_CALENDAR_ICON
 
     def __init__(
         self,
         coordinator: EskomLoadsheddingDataCoordinator,
-        # entry: ConfigEntry,
+        area: Area,
     ) -> None:
         """Initialize the LoadShedding Calendar."""
         super().__init__(coordinator)
-        self._attr_unique_id = ATTR_CALENDAR_ID
-        self._attrs = {ATTR_ATTRIBUTION: ATTRIBUTION}
+        self.area = area
+        self._attr_name = f"{ATTR_CALENDAR_NAME} {area.title}"
+        self._attr_unique_id = f"{ATTR_CALENDAR_ID}_{area.id}"
+        self._attrs = {
+            ATTR_ATTRIBUTION: ATTRIBUTION,
+            ATTR_AREA_NAME: area.title,
+            ATTR_PROVINCE_NAME: str(provider.Province(area.province)),
+            ATTR_PROVINCE_ID: area.province,
+            ATTR_SUBURB_ID: area.suburb,
+        }
         self._event: CalendarEvent | None = None
+        self._events: dict[Slot, CalendarEvent] = {}
+        self._events_timeline: IntervalSet | None = None
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
-        if self.coordinator.config_entry is not None:
-            if self.coordinator.config_entry.options.get(CONF_PROVINCE_ID) is not None:
-                self._attrs.update(
-                    {
-                        ATTR_PROVINCE_NAME: str(
-                            Province(
-                                self.coordinator.config_entry.options.get(
-                                    CONF_PROVINCE_ID
-                                )
-                            )
-                        )
-                    }
-                )
-            else:
-                self._attrs.update({ATTR_PROVINCE_NAME: NOT_CONFIGURED})
-
-            self._attrs.update(
-                {
-                    ATTR_PROVINCE_ID: self.coordinator.config_entry.options.get(
-                        CONF_PROVINCE_ID, NOT_CONFIGURED
-                    ),
-                    ATTR_SUBURB_ID: self.coordinator.config_entry.options.get(
-                        CONF_SUBURB_ID, NOT_CONFIGURED
-                    ),
-                }
-            )
+        self._attrs.pop(ATTR_STALE_AGE, None)
+        if self.coordinator.data is not None:
+            if (stale_age := self.coordinator.data.get(ATTR_STALE_AGE)) is not None:
+                self._attrs[ATTR_STALE_AGE] = stale_age
 
         return self._attrs
 
@@ -96,55 +85,57 @@ class EskomLoadsheddingCalendar(
         """Return the next upcoming event."""
         return self._event
 
+    def _timeline(self) -> IntervalSet | None:
+        """Return the merged outages, dropping events from older schedules."""
+        timeline = self.coordinator.timeline(self.area.id)
+        if timeline is None:
+            return None
+        if timeline is not self._events_timeline:
+            self._events_timeline = timeline
+            self._events = {}
+        return timeline
+
+    def _calendar_event(self, slot: Slot) -> CalendarEvent:
+        """Return the calendar event for an outage, memoized per schedule."""
+        if (event := self._events.get(slot)) is None:
+            event = self._events[slot] = CalendarEvent(
+                summary=ATTR_CALENDAR_EVENT_SUMMARY,
+                start=slot[0],
+                end=slot[1],
+            )
+        return event
+
     async def async_get_events(
         self, hass: HomeAssistant, start_date: datetime, end_date: datetime
     ) -> list[CalendarEvent]:
         """Return calendar events within a datetime range."""
-        events: list[CalendarEvent] = []
+        with profiler.section("calendar_events"):
+            if (timeline := self._timeline()) is None:
+                return []
 
-        if self.coordinator.data is not None:
-            schedule = self.coordinator.data[ATTR_SCHEDULE]
-            utc_tz = timezone.utc
-            days = 7
-
-            for s in schedule:
-                start = datetime.fromisoformat(s[0])
-                end = datetime.fromisoformat(s[1])
-                if start.date() > datetime.now(utc_tz).date() + timedelta(days=days):
-                    continue
-                if end.date() < datetime.now(utc_tz).date():
-                    continue
-                events.append(
-                    CalendarEvent(
-                        summary=ATTR_CALENDAR_EVENT_SUMMARY,
-                        start=start,
-                        end=end,
-                    )
-                )
-
-        return events
+            return [
+                self._calendar_event(slot)
+                for slot in timeline.slots_in_range(start_date, end_date)
+            ]
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
 
         self._event = None
-        if self.coordinator.data is not None:
-            if len(self.coordinator.data[ATTR_SCHEDULE]) > 0:
-                date_time_start = datetime.strptime(
-                    self.coordinator.data[ATTR_SCHEDULE][0][0], DATE_TIME_FORMAT
-                )
-                date_time_end = datetime.strptime(
-                    self.coordinator.data[ATTR_SCHEDULE][0][1], DATE_TIME_FORMAT
-                )
-                self._event = CalendarEvent(
-                    summary=ATTR_CALENDAR_EVENT_SUMMARY,
-                    start=date_time_start,
-                    end=date_time_end,
-                )
+        if (timeline := self._timeline()) is not None:
+            slot = timeline.current_or_next(datetime.now(timezone.utc))
+            if slot is not None:
+                self._event = self._calendar_event(slot)
 
         super()._handle_coordinator_update()
 
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state, timed while profiling."""
+        with profiler.section("state_write"):
+            super().async_write_ha_state()
+
     async def async_added_to_hass(self) -> None:
         """When entity is added to hass."""
         await super().async_added_to_hass()
@@ -2,41 +2,68 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_SCAN_INTERVAL
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import IntegrationError
-from load_shedding.providers.eskom import Eskom, ProviderError, Province, Stage, Suburb
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
 
-from .api import EskomAPI, EskomException, EskomRequestRejectedException
+from . import provider
+from .api import (
+    MAX_SUBURB_RESULTS,
+    Area,
+    EskomAPI,
+    EskomException,
+    EskomRequestRejectedException,
+    areas_from_options,
+)
 from .const import (
+    CONF_AREAS,
     CONF_MANUAL,
-    CONF_PROVINCE_ID,
-    CONF_SUBURB_ID,
+    CONF_MAX_STALE_AGE,
+    CONF_SLOT_LEAD_TIMES,
     DEFAULT_MANUAL_FLAG,
+    DEFAULT_MAX_STALE_AGE,
     DEFAULT_NAME,
     DEFAULT_PROVINCE_ID,
     DEFAULT_SCAN_INTERVAL,
     DEFAULT_SET_AREA_FLAG,
+    DEFAULT_SLOT_LEAD_TIMES,
     DOMAIN,
-    PROVINCE_LIST,
+    USER_AREAS,
+    USER_FLAG_ADD_AREA,
     USER_FLAG_SET_AREA,
     USER_PROVINCE_NAME,
     USER_SUBURB_NAME,
     USER_SUBURB_SEARCH,
 )
+from .events import lead_times_from_options
+from .suburbs import async_get_suburb_index
+
+if TYPE_CHECKING:
+    from load_shedding.providers.eskom import Province, Suburb
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
 
+def _province_list() -> dict[str, Province]:
+    """Return the provinces by name."""
+    return {
+        str(province): province
+        for province in provider.Province
+        if province is not provider.Province.UNKNOWN
+    }
+
+
 class EskomLoadsheddingFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle Speedtest.net config flow."""
 
-    VERSION = 1
+    VERSION = 2
 
     @staticmethod
     @callback
@@ -74,11 +101,19 @@ class EskomLoadsheddingOptionsFlowHandler(config_entries.OptionsFlow):
             CONF_MANUAL: self.config_entry.options.get(
                 CONF_MANUAL, DEFAULT_MANUAL_FLAG
             ),
-            CONF_PROVINCE_ID: self.config_entry.options.get(
-                CONF_PROVINCE_ID, str(Province(DEFAULT_PROVINCE_ID))
+            CONF_MAX_STALE_AGE: self.config_entry.options.get(
+                CONF_MAX_STALE_AGE, DEFAULT_MAX_STALE_AGE
+            ),
+            CONF_SLOT_LEAD_TIMES: self.config_entry.options.get(
+                CONF_SLOT_LEAD_TIMES, DEFAULT_SLOT_LEAD_TIMES
             ),
-            CONF_SUBURB_ID: self.config_entry.options.get(CONF_SUBURB_ID),
         }
+        self._areas: dict[str, Area] = {
+            area.id: area for area in areas_from_options(self.config_entry.options)
+        }
+        self._province_id = DEFAULT_PROVINCE_ID
+        if self._areas:
+            self._province_id = list(self._areas.values())[-1].province
 
     async def async_step_init(
         self, user_input: dict[str, Any] | None = None
@@ -88,12 +123,21 @@ class EskomLoadsheddingOptionsFlowHandler(config_entries.OptionsFlow):
         errors: dict[str, str] = {}
 
         if user_input is not None:
-            self._config_data[CONF_SCAN_INTERVAL] = user_input[CONF_SCAN_INTERVAL]
-            self._config_data[CONF_MANUAL] = user_input[CONF_MANUAL]
-            if user_input[USER_FLAG_SET_AREA]:
-                return await self.async_step_suburb_search()
+            try:
+                lead_times_from_options(user_input)
+            except ValueError:
+                errors[CONF_SLOT_LEAD_TIMES] = "invalid_lead_times"
             else:
-                return self.async_create_entry(title="", data=self._config_data)
+                self._config_data[CONF_SCAN_INTERVAL] = user_input[CONF_SCAN_INTERVAL]
+                self._config_data[CONF_MANUAL] = user_input[CONF_MANUAL]
+                self._config_data[CONF_MAX_STALE_AGE] = user_input[CONF_MAX_STALE_AGE]
+                self._config_data[CONF_SLOT_LEAD_TIMES] = user_input[
+                    CONF_SLOT_LEAD_TIMES
+                ]
+                if user_input[USER_FLAG_SET_AREA]:
+                    return await self.async_step_areas()
+                else:
+                    return self._async_create_entry()
 
         options = {
             # Scan Interval
@@ -108,6 +152,20 @@ class EskomLoadsheddingOptionsFlowHandler(config_entries.OptionsFlow):
                 CONF_MANUAL,
                 default=self.config_entry.options.get(CONF_MANUAL, DEFAULT_MANUAL_FLAG),
             ): bool,
+            # Serve last known data while Eskom is unavailable
+            vol.Optional(
+                CONF_MAX_STALE_AGE,
+                default=self.config_entry.options.get(
+                    CONF_MAX_STALE_AGE, DEFAULT_MAX_STALE_AGE
+                ),
+            ): int,
+            # Minutes before an outage to fire slot starting events
+            vol.Optional(
+                CONF_SLOT_LEAD_TIMES,
+                default=self.config_entry.options.get(
+                    CONF_SLOT_LEAD_TIMES, DEFAULT_SLOT_LEAD_TIMES
+                ),
+            ): str,
             # Continue
             vol.Optional(USER_FLAG_SET_AREA, default=DEFAULT_SET_AREA_FLAG): bool,
         }
@@ -116,11 +174,45 @@ class EskomLoadsheddingOptionsFlowHandler(config_entries.OptionsFlow):
             step_id="init", data_schema=vol.Schema(options), errors=errors
         )
 
+    def _async_create_entry(self) -> FlowResult:
+        """Save the options with the configured areas."""
+        self._config_data[CONF_AREAS] = [
+            area.as_dict() for area in self._areas.values()
+        ]
+        return self.async_create_entry(title="", data=self._config_data)
+
+    async def async_step_areas(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Choose the areas to keep and whether to add another one."""
+        if user_input is not None:
+            self._areas = {
+                area_id: area
+                for area_id, area in self._areas.items()
+                if area_id in user_input[USER_AREAS]
+            }
+            if user_input[USER_FLAG_ADD_AREA]:
+                return await self.async_step_suburb_search()
+            return self._async_create_entry()
+
+        options = {
+            # Areas to keep
+            vol.Optional(USER_AREAS, default=list(self._areas)): cv.multi_select(
+                {area_id: area.title for area_id, area in self._areas.items()}
+            ),
+            # Add another area
+            vol.Optional(USER_FLAG_ADD_AREA, default=not self._areas): bool,
+        }
+
+        return self.async_show_form(step_id="areas", data_schema=vol.Schema(options))
+
     async def async_step_suburb_search(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Handle suburb search flow."""
         errors: dict[str, str] = {}
+        await provider.async_load(self.hass)
+        province_list = _province_list()
 
         # Set selected province in options dropdown
         default_province: str = ""
@@ -128,27 +220,21 @@ class EskomLoadsheddingOptionsFlowHandler(config_entries.OptionsFlow):
         if user_input is not None:
             default_province = user_input[USER_PROVINCE_NAME]
         else:
-            default_province = str(
-                Province(
-                    self.config_entry.options.get(
-                        (CONF_PROVINCE_ID), DEFAULT_PROVINCE_ID
-                    )
-                )
-            )
+            default_province = str(provider.Province(self._province_id))
 
         options = {
             # Selected Province
             vol.Optional(
                 USER_PROVINCE_NAME,
                 default=default_province,
-            ): vol.In(PROVINCE_LIST.keys()),
+            ): vol.In(province_list.keys()),
             # Search String
             vol.Required(USER_SUBURB_SEARCH): str,
         }
 
         if user_input is not None:
             # Get selected Province ID
-            selected_province = PROVINCE_LIST[user_input[USER_PROVINCE_NAME]]
+            selected_province = province_list[user_input[USER_PROVINCE_NAME]]
             # Get suburb search string
             search_text: str = user_input[USER_SUBURB_SEARCH]
 
@@ -161,14 +247,28 @@ class EskomLoadsheddingOptionsFlowHandler(config_entries.OptionsFlow):
                 )
 
             try:
-                # Clear search result
-                search_result: list[Suburb] | None = None
+                # Answer from the local suburb index, searching Eskom on a miss
+                suburb_index = await async_get_suburb_index(
+                    self.hass, MAX_SUBURB_RESULTS
+                )
+                search_result: list[Suburb] | None = suburb_index.search(
+                    selected_province, search_text
+                )
 
-                api = EskomAPI(province=None, suburb=None, debug=False)
+                if search_result is None:
+                    # Count searches in the running entry's metrics, if loaded
+                    coordinator = self.hass.data.get(DOMAIN, {}).get(
+                        self.config_entry.entry_id
+                    )
+                    api = EskomAPI(
+                        async_get_clientsession(self.hass),
+                        metrics=coordinator.api.metrics if coordinator else None,
+                    )
 
-                search_result = await self.hass.async_add_executor_job(
-                    api.find_suburbs, search_text
-                )
+                    search_result = await api.async_find_suburbs(search_text)
+                    if search_result is not None:
+                        suburb_index.add_results(search_text, search_result)
+                        suburb_index.async_schedule_save()
 
             except EskomRequestRejectedException:
                 errors["base"] = "request_rejected"
@@ -196,11 +296,12 @@ class EskomLoadsheddingOptionsFlowHandler(config_entries.OptionsFlow):
                     errors=errors,
                 )
 
+            self._suburbs_select = {}
             for suburb in search_result:
                 if suburb.province == selected_province:
                     self._suburbs_select[suburb.name] = suburb
 
-            self._config_data[CONF_PROVINCE_ID] = selected_province.value
+            self._province_id = selected_province.value
             return await self.async_step_suburb_select()
 
         return self.async_show_form(
@@ -217,8 +318,9 @@ class EskomLoadsheddingOptionsFlowHandler(config_entries.OptionsFlow):
         if user_input is not None:
 
             selected_suburb = self._suburbs_select[user_input[USER_SUBURB_NAME]]
-            self._config_data[CONF_SUBURB_ID] = selected_suburb.id
-            return self.async_create_entry(title="", data=self._config_data)
+            area = Area(self._province_id, selected_suburb.id, selected_suburb.name)
+            self._areas[area.id] = area
+            return await self.async_step_areas()
 
         options = {
             # Suburb Select (No Default)
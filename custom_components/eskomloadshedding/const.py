@@ -3,11 +3,11 @@ from __future__ import annotations
 
 from collections.abc import Callable
 from dataclasses import dataclass
+from datetime import timedelta, timezone
 from typing import Final
 
 from homeassistant.components.sensor import SensorEntityDescription, SensorStateClass
 from homeassistant.const import Platform
-from load_shedding.providers.eskom import Province, Stage
 
 DOMAIN = "eskomloadshedding"
 VERSION = "1.0.7"
@@ -16,54 +16,6 @@ NAME = "Eskom Loadshedding Interface"
 
 DEBUG_FLAG = False
 
-##Debug data - Consider mog to mock data / api
-DEBUG_STAGE: Final = Stage.STAGE_2
-DEBUG_SCHEDULE: Final = [
-    ("2022-05-23T02:00:00+00:00", "2022-05-23T04:30:00+00:00"),
-    ("2022-05-24T02:00:00+00:00", "2022-05-24T04:30:00+00:00"),
-    ("2022-05-24T10:00:00+00:00", "2022-05-24T12:30:00+00:00"),
-    ("2022-05-25T08:00:00+00:00", "2022-05-25T10:30:00+00:00"),
-    ("2022-05-25T16:00:00+00:00", "2022-05-25T18:30:00+00:00"),
-    ("2022-05-26T16:00:00+00:00", "2022-05-26T18:30:00+00:00"),
-    ("2022-05-27T00:00:00+00:00", "2022-05-27T02:30:00+00:00"),
-    ("2022-05-28T00:00:00+00:00", "2022-05-28T02:30:00+00:00"),
-    ("2022-05-28T08:00:00+00:00", "2022-05-28T10:30:00+00:00"),
-    ("2022-05-29T06:00:00+00:00", "2022-05-29T08:30:00+00:00"),
-    ("2022-05-29T14:00:00+00:00", "2022-05-29T16:30:00+00:00"),
-    ("2022-05-30T14:00:00+00:00", "2022-05-30T16:30:00+00:00"),
-    ("2022-05-30T22:00:00+00:00", "2022-05-31T00:30:00+00:00"),
-    ("2022-06-01T20:00:00+00:00", "2022-05-31T22:30:00+00:00"),
-    ("2022-06-02T04:00:00+00:00", "2022-06-02T06:30:00+00:00"),
-    ("2022-06-03T04:00:00+00:00", "2022-06-03T06:30:00+00:00"),
-    ("2022-06-03T12:00:00+00:00", "2022-06-03T14:30:00+00:00"),
-    ("2022-06-04T12:00:00+00:00", "2022-06-04T14:30:00+00:00"),
-    ("2022-06-04T20:00:00+00:00", "2022-06-03T22:30:00+00:00"),
-    ("2022-06-05T18:00:00+00:00", "2022-06-05T20:30:00+00:00"),
-    ("2022-06-06T02:00:00+00:00", "2022-06-06T04:30:00+00:00"),
-    ("2022-06-07T02:00:00+00:00", "2022-06-07T04:30:00+00:00"),
-    ("2022-06-07T10:00:00+00:00", "2022-06-07T12:30:00+00:00"),
-    ("2022-06-08T10:00:00+00:00", "2022-06-08T12:30:00+00:00"),
-    ("2022-06-08T18:00:00+00:00", "2022-06-08T20:30:00+00:00"),
-    ("2022-06-09T16:00:00+00:00", "2022-06-09T18:30:00+00:00"),
-    ("2022-06-10T00:00:00+00:00", "2022-06-10T02:30:00+00:00"),
-    ("2022-06-11T00:00:00+00:00", "2022-06-11T02:30:00+00:00"),
-    ("2022-06-11T08:00:00+00:00", "2022-06-11T10:30:00+00:00"),
-    ("2022-06-12T08:00:00+00:00", "2022-06-12T10:30:00+00:00"),
-    ("2022-06-12T16:00:00+00:00", "2022-06-12T18:30:00+00:00"),
-    ("2022-06-13T14:00:00+00:00", "2022-06-13T16:30:00+00:00"),
-    ("2022-06-13T22:00:00+00:00", "2022-06-14T00:30:00+00:00"),
-    ("2022-06-14T22:00:00+00:00", "2022-06-15T00:30:00+00:00"),
-    ("2022-06-15T06:00:00+00:00", "2022-06-15T08:30:00+00:00"),
-    ("2022-06-16T06:00:00+00:00", "2022-06-16T08:30:00+00:00"),
-    ("2022-06-16T14:00:00+00:00", "2022-06-16T16:30:00+00:00"),
-    ("2022-06-17T12:00:00+00:00", "2022-06-17T14:30:00+00:00"),
-    ("2022-06-17T20:00:00+00:00", "2022-06-16T22:30:00+00:00"),
-    ("2022-06-18T20:00:00+00:00", "2022-06-17T22:30:00+00:00"),
-    ("2022-06-19T04:00:00+00:00", "2022-06-19T06:30:00+00:00"),
-    ("2022-06-20T04:00:00+00:00", "2022-06-20T06:30:00+00:00"),
-    ("2022-06-20T12:00:00+00:00", "2022-06-20T14:30:00+00:00"),
-]
-
 
 @dataclass
 class EskomLoadsheddingSensorEntityDescription(SensorEntityDescription):
@@ -80,7 +32,7 @@ SENSOR_TYPES: Final[
     state_class=SensorStateClass.MEASUREMENT,
 )
 
-PLATFORMS = [Platform.SENSOR, Platform.CALENDAR]
+PLATFORMS = [Platform.SENSOR, Platform.BINARY_SENSOR, Platform.CALENDAR]
 
 DATE_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S%f%z"
 
@@ -88,18 +40,38 @@ USER_PROVINCE_NAME: Final = "province_name"
 USER_SUBURB_NAME = "suburb_name"
 USER_SUBURB_SEARCH = "suburb_search"
 USER_FLAG_SET_AREA = "set_area_flag"
+USER_FLAG_ADD_AREA = "add_area_flag"
+USER_AREAS = "areas"
 
 CONF_PROVINCE_ID = "province_id"
 CONF_SUBURB_ID = "suburb_id"
+CONF_AREAS: Final = "areas"
 CONF_MANUAL: Final = "manual"
 CONF_SCAN_PERIOD = "scan_interval"
+CONF_MAX_STALE_AGE: Final = "max_stale_age"
+CONF_SLOT_LEAD_TIMES: Final = "slot_lead_times"
 
 ATTR_PROVINCE_NAME: Final = "province_name"
 ATTR_PROVINCE_ID: Final = "province_id"
 ATTR_SUBURB_ID: Final = "suburb_id"
 ATTR_SHEDDING_STAGE: Final = "stage"
-ATTR_SCHEDULE: Final = "schedule"
+ATTR_SCHEDULES: Final = "schedules"
+ATTR_AREA_NAME: Final = "area_name"
 ATTR_SCAN_INTERVAL: Final = "scan_interval"
+ATTR_LAST_UPDATED: Final = "last_updated"
+ATTR_STALE: Final = "stale"
+ATTR_STALE_AGE: Final = "stale_age"
+ATTR_FAILURES: Final = "failures"
+ATTR_CIRCUIT_STATE: Final = "circuit_state"
+ATTR_OLD_STAGE: Final = "old_stage"
+ATTR_NEW_STAGE: Final = "new_stage"
+ATTR_ADDED: Final = "added"
+ATTR_REMOVED: Final = "removed"
+ATTR_LEAD_TIME: Final = "lead_time"
+
+EVENT_STAGE_CHANGED: Final = f"{DOMAIN}_stage_changed"
+EVENT_SCHEDULE_UPDATED: Final = f"{DOMAIN}_schedule_updated"
+EVENT_SLOT_STARTING: Final = f"{DOMAIN}_slot_starting"
 
 ATTR_CALENDAR_ICON = "mdi:lightning-bolt"
 ATTR_CALENDAR_NAME = "Eskom Schedule"
@@ -108,7 +80,17 @@ ATTR_CALENDAR_EVENT_SUMMARY = "Load Shedding"
 
 DEFAULT_NAME = "EskomLoadshedding"
 DEFAULT_SCAN_INTERVAL: Final = 15
+MAX_SCAN_INTERVAL: Final = timedelta(minutes=60)
+MIN_SCAN_INTERVAL: Final = timedelta(minutes=1)
+MAX_FAILURE_BACKOFF: Final = timedelta(minutes=60)
+# Fraction of the failure backoff added at random
+FAILURE_JITTER: Final = 0.25
+SLOT_BOUNDARY_OFFSET: Final = timedelta(minutes=1)
+# Hours (SAST) in which Eskom usually announces stage changes
+ANNOUNCEMENT_HOURS: Final = (11, 21)
 DEFAULT_MANUAL_FLAG: Final = False
+DEFAULT_MAX_STALE_AGE: Final = 240
+DEFAULT_SLOT_LEAD_TIMES: Final = "15, 0"
 DEFAULT_SET_AREA_FLAG: Final = True
 DEFAULT_PROVINCE_ID = 9
 
@@ -117,26 +99,71 @@ ERR_MSG_REQUEST_REJECTED = "Request Rejected"
 ATTRIBUTION: Final = "Data retrieved from Eskom Loadshedding API"
 NOT_CONFIGURED: Final = "PLEASE CONFIGURE INTEGRATION"
 
+REFRESH_TIMEOUT: Final = 30
+
+FAILURE_CIRCUIT_OPEN: Final = "circuit_open"
+FAILURE_CONNECTION: Final = "connection_error"
+FAILURE_HTTP_STATUS: Final = "http_status"
+FAILURE_PARSE: Final = "parse_error"
+FAILURE_REJECTED: Final = "request_rejected"
+FAILURE_REQUEST_TIMEOUT: Final = "request_timeout"
+FAILURE_REFRESH_TIMEOUT: Final = "refresh_timeout"
+
+BREAKER_FAILURE_THRESHOLD: Final = 3
+BREAKER_RESET_TIMEOUT: Final = 300
+RETRY_BUDGET: Final = 10
+RETRY_BUDGET_PERIOD: Final = 3600
+
+CIRCUIT_CLOSED: Final = "closed"
+CIRCUIT_OPEN: Final = "open"
+CIRCUIT_HALF_OPEN: Final = "half_open"
+
+STORAGE_KEY: Final = DOMAIN
+STORAGE_VERSION: Final = 1
+STORAGE_SAVE_DELAY: Final = 10
+HISTORY_STORAGE_KEY: Final = f"{DOMAIN}.history"
+HISTORY_SAVE_INTERVAL: Final = timedelta(minutes=15)
+HISTORY_BUFFER_SIZE: Final = 256
+HISTORY_MAX_GAP: Final = timedelta(hours=3)
+HISTORY_RETENTION: Final = timedelta(days=400)
+SUBURB_INDEX_STORAGE_KEY: Final = f"{DOMAIN}.suburbs"
+SUBURB_INDEX_TTL: Final = 30 * 24 * 3600
+
+SCHEDULE_CACHE_SIZE: Final = 128
+
+DATA_SUBURB_INDEX: Final = f"{DOMAIN}_suburb_index"
+DATA_PROFILE_TASK: Final = f"{DOMAIN}_profile_task"
+
+SERVICE_PROFILE: Final = "profile"
+ATTR_DURATION: Final = "duration"
+DEFAULT_PROFILE_DURATION: Final = 60
+MAX_PROFILE_DURATION: Final = 3600
+PROFILE_STATS_LIMIT: Final = 50
+PROFILE_REPORT_PREFIX: Final = f"{DOMAIN}_profile"
+
+SERVICE_PLAN_WINDOWS: Final = "plan_windows"
+ATTR_TASKS: Final = "tasks"
+ATTR_EARLIEST_START: Final = "earliest_start"
+ATTR_DEADLINE: Final = "deadline"
+ATTR_PRIORITY: Final = "priority"
+ATTR_WINDOWS: Final = "windows"
+ATTR_UNPLANNED: Final = "unplanned"
+MAX_PLAN_TASKS: Final = 1000
+
+SERVICE_STAGE_HOURS: Final = "stage_hours"
+ATTR_MIN_STAGE: Final = "min_stage"
+ATTR_START: Final = "start"
+ATTR_END: Final = "end"
+ATTR_HOURS: Final = "hours"
+ATTR_STAGES: Final = "stages"
+
 NOTIFICATION_ID = "eskom_notification_id"
 NOTIF_MSG_NO_ESKOM = "We are having trouble communicating with Eskom for loadshedding data. \\n [Check configurations](/config/integrations)."
 NOTIFICATION_CONFIG_ID = "eskom_notification_config_id"
 NOTIF_MSG_NO_CONFIG = "Please ensure that the integration is configured. [Check configurations](/config/integrations)."
 
 
-##Constants from load-shedding api
-UNKNOWN_STAGE = Stage.UNKNOWN
-
-PROVINCE_LIST: Final = {
-    str(Province.EASTERN_CAPE): Province.EASTERN_CAPE,
-    str(Province.FREE_STATE): Province.FREE_STATE,
-    str(Province.GAUTENG): Province.GAUTENG,
-    str(Province.KWAZULU_NATAL): Province.KWAZULU_NATAL,
-    str(Province.LIMPOPO): Province.LIMPOPO,
-    str(Province.MPUMALANGA): Province.MPUMALANGA,
-    str(Province.NORTH_WEST): Province.NORTH_WEST,
-    str(Province.NORTERN_CAPE): Province.NORTERN_CAPE,
-    str(Province.WESTERN_CAPE): Province.WESTERN_CAPE,
-}
+SAST: Final = timezone(timedelta(hours=+2), "SAST")
 
 ##Startup Message
 ISSUE_URL = "https://github.com/scongia/ha_eskomloadshedding/issues"
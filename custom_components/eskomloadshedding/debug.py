@@ -0,0 +1,56 @@
+"""Debug data served instead of calling Eskom when DEBUG_FLAG is set.
+
+Only imported in debug mode.
+"""
+from __future__ import annotations
+
+from typing import Final
+
+from load_shedding.providers.eskom import Stage
+
+DEBUG_STAGE: Final = Stage.STAGE_2
+DEBUG_SCHEDULE: Final = [
+    ("2022-05-23T02:00:00+00:00", "2022-05-23T04:30:00+00:00"),
+    ("2022-05-24T02:00:00+00:00", "2022-05-24T04:30:00+00:00"),
+    ("2022-05-24T10:00:00+00:00", "2022-05-24T12:30:00+00:00"),
+    ("2022-05-25T08:00:00+00:00", "2022-05-25T10:30:00+00:00"),
+    ("2022-05-25T16:00:00+00:00", "2022-05-25T18:30:00+00:00"),
+    ("2022-05-26T16:00:00+00:00", "2022-05-26T18:30:00+00:00"),
+    ("2022-05-27T00:00:00+00:00", "2022-05-27T02:30:00+00:00"),
+    ("2022-05-28T00:00:00+00:00", "2022-05-28T02:30:00+00:00"),
+    ("2022-05-28T08:00:00+00:00", "2022-05-28T10:30:00+00:00"),
+    ("2022-05-29T06:00:00+00:00", "2022-05-29T08:30:00+00:00"),
+    ("2022-05-29T14:00:00+00:00", "2022-05-29T16:30:00+00:00"),
+    ("2022-05-30T14:00:00+00:00", "2022-05-30T16:30:00+00:00"),
+    ("2022-05-30T22:00:00+00:00", "2022-05-31T00:30:00+00:00"),
+    ("2022-06-01T20:00:00+00:00", "2022-06-01T22:30:00+00:00"),
+    ("2022-06-02T04:00:00+00:00", "2022-06-02T06:30:00+00:00"),
+    ("2022-06-03T04:00:00+00:00", "2022-06-03T06:30:00+00:00"),
+    ("2022-06-03T12:00:00+00:00", "2022-06-03T14:30:00+00:00"),
+    ("2022-06-04T12:00:00+00:00", "2022-06-04T14:30:00+00:00"),
+    ("2022-06-04T20:00:00+00:00", "2022-06-04T22:30:00+00:00"),
+    ("2022-06-05T18:00:00+00:00", "2022-06-05T20:30:00+00:00"),
+    ("2022-06-06T02:00:00+00:00", "2022-06-06T04:30:00+00:00"),
+    ("2022-06-07T02:00:00+00:00", "2022-06-07T04:30:00+00:00"),
+    ("2022-06-07T10:00:00+00:00", "2022-06-07T12:30:00+00:00"),
+    ("2022-06-08T10:00:00+00:00", "2022-06-08T12:30:00+00:00"),
+    ("2022-06-08T18:00:00+00:00", "2022-06-08T20:30:00+00:00"),
+    ("2022-06-09T16:00:00+00:00", "2022-06-09T18:30:00+00:00"),
+    ("2022-06-10T00:00:00+00:00", "2022-06-10T02:30:00+00:00"),
+    ("2022-06-11T00:00:00+00:00", "2022-06-11T02:30:00+00:00"),
+    ("2022-06-11T08:00:00+00:00", "2022-06-11T10:30:00+00:00"),
+    ("2022-06-12T08:00:00+00:00", "2022-06-12T10:30:00+00:00"),
+    ("2022-06-12T16:00:00+00:00", "2022-06-12T18:30:00+00:00"),
+    ("2022-06-13T14:00:00+00:00", "2022-06-13T16:30:00+00:00"),
+    ("2022-06-13T22:00:00+00:00", "2022-06-14T00:30:00+00:00"),
+    ("2022-06-14T22:00:00+00:00", "2022-06-15T00:30:00+00:00"),
+    ("2022-06-15T06:00:00+00:00", "2022-06-15T08:30:00+00:00"),
+    ("2022-06-16T06:00:00+00:00", "2022-06-16T08:30:00+00:00"),
+    ("2022-06-16T14:00:00+00:00", "2022-06-16T16:30:00+00:00"),
+    ("2022-06-17T12:00:00+00:00", "2022-06-17T14:30:00+00:00"),
+    ("2022-06-17T20:00:00+00:00", "2022-06-17T22:30:00+00:00"),
+    ("2022-06-18T20:00:00+00:00", "2022-06-18T22:30:00+00:00"),
+    ("2022-06-19T04:00:00+00:00", "2022-06-19T06:30:00+00:00"),
+    ("2022-06-20T04:00:00+00:00", "2022-06-20T06:30:00+00:00"),
+    ("2022-06-20T12:00:00+00:00", "2022-06-20T14:30:00+00:00"),
+]
@@ -0,0 +1,66 @@
+"""Diagnostics support for Eskom Load Shedding."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    ATTR_LAST_UPDATED,
+    ATTR_SCHEDULES,
+    ATTR_SHEDDING_STAGE,
+    ATTR_STALE,
+    ATTR_STALE_AGE,
+    DATA_SUBURB_INDEX,
+    DOMAIN,
+)
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    api = coordinator.api
+
+    data = None
+    if coordinator.data is not None:
+        data = {
+            ATTR_SHEDDING_STAGE: coordinator.data.get(ATTR_SHEDDING_STAGE),
+            ATTR_LAST_UPDATED: coordinator.data.get(ATTR_LAST_UPDATED),
+            ATTR_STALE: coordinator.data.get(ATTR_STALE),
+            ATTR_STALE_AGE: coordinator.data.get(ATTR_STALE_AGE),
+            "slots": {
+                area_id: len(schedule)
+                for area_id, schedule in coordinator.data.get(
+                    ATTR_SCHEDULES, {}
+                ).items()
+            },
+        }
+
+    suburb_index = hass.data.get(DATA_SUBURB_INDEX)
+    return {
+        "options": dict(entry.options),
+        "last_update_success": coordinator.last_update_success,
+        "data": data,
+        "metrics": api.metrics.as_dict(),
+        "failures": dict(api.failures),
+        "circuit": {
+            "state": api.breaker.state,
+            "failures": api.breaker.failures,
+            "retry_tokens": api.breaker.retry_tokens,
+        },
+        "schedule_cache": {
+            "entries": len(api.schedule_cache),
+            "hits": api.schedule_cache.hits,
+            "misses": api.schedule_cache.misses,
+        },
+        "stage_history": {
+            "spans": len(coordinator.history),
+            "buffered": coordinator.history.buffered,
+        },
+        "suburb_index": None
+        if suburb_index is None
+        else {"hits": suburb_index.hits, "misses": suburb_index.misses},
+    }
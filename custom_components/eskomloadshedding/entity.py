@@ -1,10 +1,14 @@
 """EskomLoadsheddingEntity class"""
+from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from load_shedding.providers.eskom import Stage
 
+from . import profiler, provider
 from .const import (
+    ATTR_CIRCUIT_STATE,
+    ATTR_FAILURES,
     ATTR_SCAN_INTERVAL,
     ATTR_SHEDDING_STAGE,
+    ATTR_STALE_AGE,
     ATTRIBUTION,
     CONF_SCAN_PERIOD,
     DEFAULT_NAME,
@@ -21,6 +25,8 @@ class EskomLoadsheddingEntity(CoordinatorEntity):
     def __init__(self, coordinator, config_entry):
         super().__init__(coordinator)
         self.config_entry = config_entry
+        self._attrs = {}
+        self._attrs_generation = None
 
     @property
     def should_poll(self):
@@ -40,7 +46,7 @@ class EskomLoadsheddingEntity(CoordinatorEntity):
     @property
     def device_info(self):
         return {
-            "identifiers": {(DOMAIN, self.unique_id)},
+            "identifiers": {(DOMAIN, self.config_entry.entry_id)},
             "name": DEFAULT_NAME,
             "model": VERSION,
             "manufacturer": NAME,
@@ -48,7 +54,21 @@ class EskomLoadsheddingEntity(CoordinatorEntity):
 
     @property
     def extra_state_attributes(self):
-        """Return the state attributes."""
+        """Return the state attributes, built once per coordinator update."""
+        if self._attrs_generation != self.coordinator.generation:
+            self._attrs = self._state_attributes()
+            self._attrs_generation = self.coordinator.generation
+
+        # The breaker changes without the coordinator data changing
+        self._attrs[ATTR_CIRCUIT_STATE] = self.coordinator.api.breaker.state
+        if self.coordinator.api.failures:
+            self._attrs[ATTR_FAILURES] = dict(self.coordinator.api.failures)
+        else:
+            self._attrs.pop(ATTR_FAILURES, None)
+        return self._attrs
+
+    def _state_attributes(self):
+        """Build the state attributes."""
         attrs = {}
         attrs.update(
             {
@@ -69,8 +89,10 @@ class EskomLoadsheddingEntity(CoordinatorEntity):
 
         if self.coordinator.data is not None:
             attrs[ATTR_SHEDDING_STAGE] = str(
-                Stage(self.coordinator.data.get(ATTR_SHEDDING_STAGE))
+                provider.Stage(self.coordinator.data.get(ATTR_SHEDDING_STAGE))
             )
+            if (stale_age := self.coordinator.data.get(ATTR_STALE_AGE)) is not None:
+                attrs[ATTR_STALE_AGE] = stale_age
         return attrs
 
         # @property
@@ -97,6 +119,12 @@ class EskomLoadsheddingEntity(CoordinatorEntity):
             self.coordinator.async_add_listener(self.async_write_ha_state)
         )
 
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state, timed while profiling."""
+        with profiler.section("state_write"):
+            super().async_write_ha_state()
+
     async def async_update(self):
         """Update entity."""
         await self.coordinator.async_request_refresh()
@@ -0,0 +1,175 @@
+"""Events fired on the Home Assistant event bus."""
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+from datetime import datetime, timedelta
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_ADDED,
+    ATTR_AREA_NAME,
+    ATTR_END,
+    ATTR_LEAD_TIME,
+    ATTR_NEW_STAGE,
+    ATTR_OLD_STAGE,
+    ATTR_REMOVED,
+    ATTR_SCHEDULES,
+    ATTR_SHEDDING_STAGE,
+    ATTR_START,
+    ATTR_SUBURB_ID,
+    CONF_SLOT_LEAD_TIMES,
+    DEFAULT_SLOT_LEAD_TIMES,
+    EVENT_SCHEDULE_UPDATED,
+    EVENT_SLOT_STARTING,
+    EVENT_STAGE_CHANGED,
+)
+from .schedule import ScheduleIndex, Slot
+
+if TYPE_CHECKING:
+    from .api import Area
+    from .intervals import IntervalSet
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def lead_times_from_options(options: Mapping[str, Any]) -> list[timedelta]:
+    """Return the slot lead times from comma separated minutes in the options."""
+    value = options.get(CONF_SLOT_LEAD_TIMES, DEFAULT_SLOT_LEAD_TIMES)
+    minutes = {int(part) for part in str(value).split(",") if part.strip()}
+    if any(lead < 0 for lead in minutes):
+        raise ValueError(f"Lead times must not be negative: {value}")
+    return [timedelta(minutes=lead) for lead in sorted(minutes)]
+
+
+def _slot_dict(slot: Slot) -> dict[str, str]:
+    return {
+        ATTR_START: dt_util.as_local(slot[0]).isoformat(),
+        ATTR_END: dt_util.as_local(slot[1]).isoformat(),
+    }
+
+
+class ScheduleEvents:
+    """Fire stage, schedule and slot events as the coordinator data changes.
+
+    Stage and schedule changes are found by comparing each update with the
+    previous one, which is cheap since unchanged schedules are the same
+    objects. Slot starting events are driven by one timer per area and lead
+    time, set on the merged outages of the area and moved to the next outage
+    once fired.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        timeline: Callable[[str], IntervalSet | None],
+        lead_times: list[timedelta],
+    ) -> None:
+        """Initialize the events of a coordinator."""
+        self.hass = hass
+        self._timeline = timeline
+        self.lead_times = lead_times
+        self._stage: int | None = None
+        self._schedules: dict[str, ScheduleIndex] = {}
+        self._timers: dict[tuple[str, timedelta], CALLBACK_TYPE] = {}
+
+    @callback
+    def async_data_updated(
+        self, data: dict[str, Any] | None, areas: list[Area]
+    ) -> None:
+        """Fire the events for changes since the previous data."""
+        if data is None:
+            return
+
+        stage = data[ATTR_SHEDDING_STAGE]
+        if self._stage is not None and stage != self._stage:
+            _LOGGER.debug("Stage changed from %s to %s", self._stage, stage)
+            self.hass.bus.async_fire(
+                EVENT_STAGE_CHANGED,
+                {ATTR_OLD_STAGE: self._stage, ATTR_NEW_STAGE: stage},
+            )
+        self._stage = stage
+
+        schedules: dict[str, ScheduleIndex] = data[ATTR_SCHEDULES]
+        now = dt_util.utcnow()
+        for area in areas:
+            schedule = schedules.get(area.id)
+            previous = self._schedules.get(area.id)
+            if schedule is None or schedule is previous:
+                continue
+            if previous is not None:
+                self._async_fire_schedule_updated(area, previous, schedule, now)
+            self._async_set_timers(area, now)
+        self._schedules = {
+            area.id: schedules[area.id] for area in areas if area.id in schedules
+        }
+
+    def _async_fire_schedule_updated(
+        self,
+        area: Area,
+        previous: ScheduleIndex,
+        schedule: ScheduleIndex,
+        now: datetime,
+    ) -> None:
+        """Fire the slots added and removed, leaving out the slots that ended."""
+        old = {slot for slot in previous if slot[1] > now}
+        new = {slot for slot in schedule if slot[1] > now}
+        if old == new:
+            return
+
+        self.hass.bus.async_fire(
+            EVENT_SCHEDULE_UPDATED,
+            {
+                ATTR_SUBURB_ID: area.id,
+                ATTR_AREA_NAME: area.title,
+                ATTR_ADDED: [_slot_dict(slot) for slot in sorted(new - old)],
+                ATTR_REMOVED: [_slot_dict(slot) for slot in sorted(old - new)],
+            },
+        )
+
+    def _async_set_timers(self, area: Area, now: datetime) -> None:
+        """Set the timers of an area for the next outage after each lead time."""
+        for lead_time in self.lead_times:
+            self._async_set_timer(area, lead_time, now + lead_time)
+
+    def _async_set_timer(
+        self, area: Area, lead_time: timedelta, after: datetime
+    ) -> None:
+        """Set a timer for the first outage starting after a point in time."""
+        key = (area.id, lead_time)
+        if (cancel := self._timers.pop(key, None)) is not None:
+            cancel()
+        if (timeline := self._timeline(area.id)) is None:
+            return
+        if (start := timeline.next_start(after)) is None:
+            return
+
+        @callback
+        def _async_slot_starting(_: datetime) -> None:
+            self._timers.pop(key, None)
+            slot = timeline.current_or_next(start)
+            self.hass.bus.async_fire(
+                EVENT_SLOT_STARTING,
+                {
+                    ATTR_SUBURB_ID: area.id,
+                    ATTR_AREA_NAME: area.title,
+                    **_slot_dict(slot),
+                    ATTR_LEAD_TIME: round(lead_time.total_seconds() / 60),
+                },
+            )
+            self._async_set_timer(area, lead_time, start)
+
+        self._timers[key] = async_track_point_in_utc_time(
+            self.hass, _async_slot_starting, start - lead_time
+        )
+
+    @callback
+    def async_cancel(self) -> None:
+        """Cancel the slot timers."""
+        for cancel in self._timers.values():
+            cancel()
+        self._timers.clear()
@@ -0,0 +1,112 @@
+"""Load shedding stage history."""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+
+from .const import HISTORY_BUFFER_SIZE, HISTORY_MAX_GAP
+
+Span = tuple[int, float, float]
+
+
+class StageHistory:
+    """Stages seen over time, run length encoded into (stage, from, to) spans.
+
+    Polled stages are appended to a bounded buffer and compacted into spans
+    when it fills up, before queries and before saving, so that a month of
+    polls is a handful of spans to store and query. A stage lasts until a
+    different stage is seen, unless no stage was seen for longer than the
+    maximum gap, in which case the time in between is left out.
+    """
+
+    __slots__ = ("_buffer", "_stages", "_starts", "_ends")
+
+    def __init__(self, spans: Iterable[Span] = ()) -> None:
+        """Initialize from (stage, from, to) spans in epoch seconds."""
+        self._buffer: deque[tuple[float, int]] = deque(maxlen=HISTORY_BUFFER_SIZE)
+        self._stages = array("b")
+        self._starts = array("d")
+        self._ends = array("d")
+        for stage, start, end in sorted(spans, key=lambda span: span[1]):
+            self._append(stage, start, end)
+
+    def __len__(self) -> int:
+        return len(self._stages)
+
+    def __repr__(self) -> str:
+        return f"StageHistory({len(self)} spans)"
+
+    @property
+    def buffered(self) -> int:
+        """Return the number of recorded stages not yet compacted."""
+        return len(self._buffer)
+
+    def _append(self, stage: int, start: float, end: float) -> None:
+        self._stages.append(stage)
+        self._starts.append(start)
+        self._ends.append(end)
+
+    def record(self, stage: int, when: datetime) -> None:
+        """Record the stage seen at a point in time."""
+        if len(self._buffer) == self._buffer.maxlen:
+            self.compact()
+        self._buffer.append((when.timestamp(), stage))
+
+    def compact(self) -> None:
+        """Fold the buffered stages into the spans."""
+        gap = HISTORY_MAX_GAP.total_seconds()
+        while self._buffer:
+            when, stage = self._buffer.popleft()
+            if not self._stages or when - self._ends[-1] > gap:
+                self._append(stage, when, when)
+            elif when < self._ends[-1]:
+                continue
+            elif stage == self._stages[-1]:
+                self._ends[-1] = when
+            else:
+                # The previous stage lasted until the change was seen
+                self._ends[-1] = when
+                self._append(stage, when, when)
+
+    def prune(self, before: datetime) -> None:
+        """Drop the spans that ended before a point in time."""
+        self.compact()
+        index = bisect_left(self._ends, before.timestamp())
+        del self._stages[:index], self._starts[:index], self._ends[:index]
+
+    def spans(self) -> list[Span]:
+        """Return the (stage, from, to) spans in epoch seconds."""
+        self.compact()
+        return list(zip(self._stages, self._starts, self._ends))
+
+    def durations(self, start: datetime, end: datetime) -> dict[int, timedelta]:
+        """Return the time spent at each stage within the [start, end) range."""
+        self.compact()
+        start_ts, end_ts = start.timestamp(), end.timestamp()
+        totals: dict[int, float] = {}
+        for index in range(
+            bisect_right(self._ends, start_ts), bisect_left(self._starts, end_ts)
+        ):
+            seconds = min(self._ends[index], end_ts) - max(
+                self._starts[index], start_ts
+            )
+            if seconds > 0:
+                stage = self._stages[index]
+                totals[stage] = totals.get(stage, 0.0) + seconds
+        return {stage: timedelta(seconds=seconds) for stage, seconds in totals.items()}
+
+    def time_at_stage(
+        self, min_stage: int, start: datetime, end: datetime
+    ) -> timedelta:
+        """Return the time spent at or above a stage within the [start, end) range."""
+        return sum(
+            (
+                duration
+                for stage, duration in self.durations(start, end).items()
+                if stage >= min_stage
+            ),
+            timedelta(),
+        )
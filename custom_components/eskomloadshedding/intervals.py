@@ -0,0 +1,164 @@
+"""Interval engine for load shedding schedules."""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timedelta, timezone
+from heapq import merge
+from itertools import accumulate
+import logging
+
+from .schedule import Slot
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _datetime(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+class IntervalSet:
+    """Disjoint, sorted outage intervals with a running total of outage time.
+
+    Slots are validated, sorted and merged when overlapping or adjacent in
+    O(n log n) once, when built. Point lookups and the outage time within a
+    range are then binary searches, and union, intersection and gaps are
+    linear merges of the sorted intervals.
+    """
+
+    __slots__ = ("_starts", "_ends", "_totals", "invalid")
+
+    def __init__(self, slots: Iterable[Slot] = ()) -> None:
+        """Initialize from (start, end) datetime pairs."""
+        pairs = []
+        invalid = 0
+        for start, end in slots:
+            start_ts, end_ts = start.timestamp(), end.timestamp()
+            if end_ts <= start_ts:
+                invalid += 1
+                continue
+            pairs.append((start_ts, end_ts))
+        if invalid:
+            _LOGGER.warning("Ignoring %s slots that end before they start", invalid)
+        self._build(sorted(pairs))
+        self.invalid = invalid
+
+    @classmethod
+    def _from_sorted(cls, pairs: Iterable[tuple[float, float]]) -> IntervalSet:
+        """Build from valid (start, end) epoch pairs sorted by start."""
+        intervals = cls.__new__(cls)
+        intervals._build(pairs)
+        intervals.invalid = 0
+        return intervals
+
+    def _build(self, pairs: Iterable[tuple[float, float]]) -> None:
+        self._starts = array("d")
+        self._ends = array("d")
+        for start, end in pairs:
+            if self._ends and start <= self._ends[-1]:
+                self._ends[-1] = max(self._ends[-1], end)
+            else:
+                self._starts.append(start)
+                self._ends.append(end)
+        self._totals = array(
+            "d",
+            accumulate(
+                (end - start for start, end in zip(self._starts, self._ends)),
+                initial=0,
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __iter__(self) -> Iterator[Slot]:
+        for start, end in zip(self._starts, self._ends):
+            yield _datetime(start), _datetime(end)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, IntervalSet):
+            return NotImplemented
+        return self._starts == other._starts and self._ends == other._ends
+
+    def __repr__(self) -> str:
+        return f"IntervalSet({len(self)} intervals)"
+
+    def contains(self, when: datetime) -> bool:
+        """Return True if a point in time falls within an outage."""
+        index = bisect_right(self._starts, when.timestamp()) - 1
+        return index >= 0 and self._ends[index] > when.timestamp()
+
+    def current_or_next(self, when: datetime) -> Slot | None:
+        """Return the outage active at, or starting next after, a point in time."""
+        index = bisect_right(self._ends, when.timestamp())
+        if index == len(self._starts):
+            return None
+        return _datetime(self._starts[index]), _datetime(self._ends[index])
+
+    def next_start(self, when: datetime) -> datetime | None:
+        """Return the start of the first outage after a point in time."""
+        index = bisect_right(self._starts, when.timestamp())
+        if index == len(self._starts):
+            return None
+        return _datetime(self._starts[index])
+
+    def _range(self, start_ts: float, end_ts: float) -> range:
+        """Return the positions of the intervals overlapping [start, end)."""
+        return range(
+            bisect_right(self._ends, start_ts), bisect_left(self._starts, end_ts)
+        )
+
+    def slots_in_range(self, start: datetime, end: datetime) -> list[Slot]:
+        """Return the outages overlapping the [start, end) range."""
+        return [
+            (_datetime(self._starts[index]), _datetime(self._ends[index]))
+            for index in self._range(start.timestamp(), end.timestamp())
+        ]
+
+    def off_time(self, start: datetime, end: datetime) -> timedelta:
+        """Return the outage time within the [start, end) range."""
+        start_ts, end_ts = start.timestamp(), end.timestamp()
+        positions = self._range(start_ts, end_ts)
+        if not positions:
+            return timedelta()
+
+        first, last = positions.start, positions.stop
+        total = self._totals[last] - self._totals[first]
+        total -= max(0.0, start_ts - self._starts[first])
+        total -= max(0.0, self._ends[last - 1] - end_ts)
+        return timedelta(seconds=total)
+
+    def union(self, other: IntervalSet) -> IntervalSet:
+        """Return the outages of either set."""
+        return IntervalSet._from_sorted(
+            merge(zip(self._starts, self._ends), zip(other._starts, other._ends))
+        )
+
+    def intersection(self, other: IntervalSet) -> IntervalSet:
+        """Return the outages common to both sets."""
+        pairs = []
+        index = other_index = 0
+        while index < len(self._starts) and other_index < len(other._starts):
+            start = max(self._starts[index], other._starts[other_index])
+            end = min(self._ends[index], other._ends[other_index])
+            if start < end:
+                pairs.append((start, end))
+            if self._ends[index] < other._ends[other_index]:
+                index += 1
+            else:
+                other_index += 1
+        return IntervalSet._from_sorted(pairs)
+
+    def gaps(self, start: datetime, end: datetime) -> IntervalSet:
+        """Return the powered windows within the [start, end) range."""
+        start_ts, end_ts = start.timestamp(), end.timestamp()
+        pairs = []
+        cursor = start_ts
+        for index in self._range(start_ts, end_ts):
+            if self._starts[index] > cursor:
+                pairs.append((cursor, self._starts[index]))
+            cursor = max(cursor, self._ends[index])
+        if cursor < end_ts:
+            pairs.append((cursor, end_ts))
+        return IntervalSet._from_sorted(pairs)
@@ -0,0 +1,123 @@
+"""Performance metrics of the Eskom API client."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+import time
+from typing import Any
+
+# Upper bounds of the latency buckets, in milliseconds
+LATENCY_BUCKETS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class LatencyHistogram:
+    """Counts of call latencies in fixed buckets."""
+
+    __slots__ = ("counts", "count", "total")
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Add a call latency."""
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds * 1000)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, percent: float) -> float | None:
+        """Return the bucket bound (ms) below which a percentage of calls fall."""
+        if not self.count:
+            return None
+        rank = self.count * percent / 100
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram in a form that can be serialized to JSON."""
+        buckets = {
+            f"le_{bound}ms": count for bound, count in zip(LATENCY_BUCKETS, self.counts)
+        }
+        buckets["gt_30000ms"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 1) if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "buckets": buckets,
+        }
+
+
+class ApiMetrics:
+    """Latency, outcome and timing metrics per API call.
+
+    Latency covers the whole call, including schedules served from the
+    cache. Network time is the time spent awaiting Eskom, and loop time the
+    time spent parsing and generating schedules on the event loop.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.latency: dict[str, LatencyHistogram] = {}
+        self.successes: Counter[str] = Counter()
+        self.failures: Counter[str] = Counter()
+        self.network_seconds = 0.0
+        self.loop_seconds = 0.0
+
+    @contextmanager
+    def timed(self, call: str) -> Iterator[None]:
+        """Observe the latency of a call."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.latency.setdefault(call, LatencyHistogram()).observe(
+                time.perf_counter() - start
+            )
+
+    @contextmanager
+    def network(self, call: str) -> Iterator[None]:
+        """Time a request and count its outcome by exception type."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as ex:
+            self.record_failure(call, ex)
+            raise
+        else:
+            self.successes[call] += 1
+        finally:
+            self.network_seconds += time.perf_counter() - start
+
+    @contextmanager
+    def on_loop(self) -> Iterator[None]:
+        """Time synchronous work done on the event loop."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.loop_seconds += time.perf_counter() - start
+
+    def record_failure(self, call: str, ex: Exception) -> None:
+        """Count a failed call by exception type."""
+        self.failures[f"{call}.{type(ex).__name__}"] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics in a form that can be serialized to JSON."""
+        return {
+            "latency": {
+                call: histogram.as_dict() for call, histogram in self.latency.items()
+            },
+            "successes": dict(self.successes),
+            "failures": dict(self.failures),
+            "network_seconds": round(self.network_seconds, 3),
+            "loop_seconds": round(self.loop_seconds, 3),
+        }
@@ -0,0 +1,98 @@
+"""Plan appliance runs in the powered windows between outages."""
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from .intervals import IntervalSet, _datetime
+
+
+@dataclass(frozen=True)
+class Task:
+    """An appliance run to fit between outages."""
+
+    name: str
+    duration: timedelta
+    earliest_start: datetime
+    deadline: datetime
+    priority: int = 0
+
+
+@dataclass(frozen=True)
+class PlannedWindow:
+    """The powered window a task was planned in."""
+
+    name: str
+    start: datetime
+    end: datetime
+
+
+def plan_windows(
+    outages: IntervalSet, tasks: Sequence[Task]
+) -> tuple[list[PlannedWindow], list[Task]]:
+    """Plan non-overlapping powered windows for tasks.
+
+    Tasks are placed by priority, then earliest deadline, each at the
+    earliest time it fits within a single powered window between its
+    earliest start and deadline. The free windows are swept from the
+    first one ending after the earliest start, and the window a task is
+    placed in is split around it, so planning N tasks over W windows is
+    O(N * W) at worst. Returns the planned windows by start time and the
+    tasks that did not fit.
+    """
+    if not tasks:
+        return [], []
+
+    free = outages.gaps(
+        min(task.earliest_start for task in tasks),
+        max(task.deadline for task in tasks),
+    )
+    starts = [start.timestamp() for start, _ in free]
+    ends = [end.timestamp() for _, end in free]
+
+    planned: list[PlannedWindow] = []
+    unplanned: list[Task] = []
+    for task in sorted(tasks, key=lambda task: (-task.priority, task.deadline)):
+        earliest = task.earliest_start.timestamp()
+        deadline = task.deadline.timestamp()
+        duration = task.duration.total_seconds()
+
+        index = bisect_right(ends, earliest)
+        while index < len(starts):
+            begin = max(starts[index], earliest)
+            # Later windows only start later
+            if begin + duration > deadline:
+                index = len(starts)
+            elif begin + duration <= ends[index]:
+                break
+            else:
+                index += 1
+        if duration <= 0 or index == len(starts):
+            unplanned.append(task)
+            continue
+
+        finish = begin + duration
+        planned.append(PlannedWindow(task.name, _datetime(begin), _datetime(finish)))
+        _split(starts, ends, index, begin, finish)
+
+    planned.sort(key=lambda window: window.start)
+    return planned, unplanned
+
+
+def _split(
+    starts: list[float], ends: list[float], index: int, begin: float, finish: float
+) -> None:
+    """Remove [begin, finish) from the free window at index."""
+    before = begin > starts[index]
+    after = finish < ends[index]
+    if before and after:
+        starts.insert(index + 1, finish)
+        ends.insert(index, begin)
+    elif before:
+        ends[index] = begin
+    elif after:
+        starts[index] = finish
+    else:
+        del starts[index], ends[index]
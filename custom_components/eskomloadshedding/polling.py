@@ -0,0 +1,72 @@
+"""Adaptive polling for the Eskom Load Shedding coordinator."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+import random
+
+from .const import (
+    ANNOUNCEMENT_HOURS,
+    FAILURE_JITTER,
+    MAX_FAILURE_BACKOFF,
+    MAX_SCAN_INTERVAL,
+    MIN_SCAN_INTERVAL,
+    SAST,
+    SLOT_BOUNDARY_OFFSET,
+)
+from .schedule import ScheduleIndex
+
+
+class AdaptivePollingScheduler:
+    """Work out how long to wait before the next refresh.
+
+    The configured scan interval is used while Eskom usually announces stage
+    changes. Outside those hours the interval doubles for every poll that
+    returned the same stage, up to MAX_SCAN_INTERVAL. Refreshes are pulled in
+    to just after the next slot boundary of the cached schedules. Failures
+    back off exponentially from the scan interval, never polling sooner than
+    it, with a random fraction of the backoff added so that clients spread
+    out.
+    """
+
+    def __init__(self, scan_interval: timedelta) -> None:
+        """Initialize the scheduler."""
+        self.scan_interval = max(scan_interval, MIN_SCAN_INTERVAL)
+        self.stable_polls = 0
+        self.failures = 0
+
+    def record_success(self, stage_changed: bool) -> None:
+        """Record a successful refresh."""
+        self.failures = 0
+        self.stable_polls = 0 if stage_changed else self.stable_polls + 1
+
+    def record_failure(self) -> None:
+        """Record a failed refresh."""
+        self.failures += 1
+
+    def next_interval(
+        self, now: datetime, schedules: Iterable[ScheduleIndex] = ()
+    ) -> timedelta:
+        """Return the delay before the next refresh."""
+        if self.failures:
+            backoff = min(
+                self.scan_interval * 2 ** min(self.failures - 1, 8),
+                max(MAX_FAILURE_BACKOFF, self.scan_interval),
+            )
+            return backoff * (1 + FAILURE_JITTER * random.random())
+
+        start_hour, end_hour = ANNOUNCEMENT_HOURS
+        if start_hour <= now.astimezone(SAST).hour < end_hour:
+            interval = self.scan_interval
+        else:
+            interval = min(
+                self.scan_interval * 2 ** min(self.stable_polls, 8),
+                max(MAX_SCAN_INTERVAL, self.scan_interval),
+            )
+
+        for schedule in schedules:
+            if (slot := schedule.next_slot(now)) is not None:
+                boundary = slot[0] if slot[0] > now else slot[1]
+                interval = min(interval, boundary - now + SLOT_BOUNDARY_OFFSET)
+
+        return interval
@@ -0,0 +1,116 @@
+"""On-demand profiling of the update cycle."""
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime
+import io
+import time
+from typing import TYPE_CHECKING, Final
+
+from .const import DOMAIN, PROFILE_STATS_LIMIT
+
+if TYPE_CHECKING:
+    import cProfile
+
+_active: ProfileSession | None = None
+
+
+@dataclass
+class SectionTimings:
+    """Wall time spent in a profiled section."""
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Add a pass through the section."""
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+
+@dataclass
+class ProfileSession:
+    """A running profile of the event loop with per section timings.
+
+    cProfile is deterministic and follows the event loop thread, so
+    sections that await also include the work of other tasks scheduled in
+    the meantime; the section timings are wall time for the same reason.
+    """
+
+    started: datetime
+    profile: cProfile.Profile
+    sections: dict[str, SectionTimings] = field(default_factory=dict)
+
+    def report(self, duration: float) -> str:
+        """Return the report of the profile."""
+        import pstats  # pylint: disable=import-outside-toplevel
+
+        output = io.StringIO()
+        output.write(
+            f"{DOMAIN} profile started {self.started.isoformat()} "
+            f"for {duration:g}s\n\n"
+        )
+        output.write(f"{'section':<24}{'count':>8}{'total_ms':>12}{'max_ms':>12}\n")
+        for name, timings in sorted(self.sections.items()):
+            output.write(
+                f"{name:<24}{timings.count:>8}"
+                f"{timings.total * 1000:>12.2f}{timings.max * 1000:>12.2f}\n"
+            )
+
+        stats = pstats.Stats(self.profile, stream=output)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE)
+        output.write(f"\n{DOMAIN} functions by cumulative time\n")
+        stats.print_stats(DOMAIN, PROFILE_STATS_LIMIT)
+        output.write("\nAll functions by cumulative time\n")
+        stats.print_stats(PROFILE_STATS_LIMIT)
+        return output.getvalue()
+
+
+def is_profiling() -> bool:
+    """Return True while a profile is running."""
+    return _active is not None
+
+
+def start(started: datetime) -> ProfileSession:
+    """Start profiling the event loop thread."""
+    # Only imported when a profile is requested
+    import cProfile  # pylint: disable=import-outside-toplevel
+
+    global _active  # pylint: disable=global-statement
+    _active = ProfileSession(started, cProfile.Profile())
+    _active.profile.enable()
+    return _active
+
+
+def stop() -> ProfileSession | None:
+    """Stop profiling and return the finished session."""
+    global _active  # pylint: disable=global-statement
+    session, _active = _active, None
+    if session is not None:
+        session.profile.disable()
+    return session
+
+
+_INACTIVE: Final = nullcontext()
+
+
+def section(name: str) -> AbstractContextManager[None]:
+    """Time a section of the update cycle while a profile is running."""
+    if _active is None:
+        return _INACTIVE
+    return _timed_section(_active, name)
+
+
+@contextmanager
+def _timed_section(session: ProfileSession, name: str) -> Iterator[None]:
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        session.sections.setdefault(name, SectionTimings()).observe(
+            time.perf_counter() - start_time
+        )
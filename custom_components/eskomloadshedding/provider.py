@@ -0,0 +1,56 @@
+"""Lazy access to the load_shedding provider library.
+
+load_shedding pulls in requests, urllib3 and BeautifulSoup when imported,
+so it is loaded on first use, from the executor during setup, instead of
+when Home Assistant imports the integration. Its names are read as
+attributes of this module, e.g. ``provider.Stage``.
+"""
+from __future__ import annotations
+
+import importlib
+from types import ModuleType
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant
+
+if TYPE_CHECKING:
+    from load_shedding.providers.eskom import (  # noqa: F401
+        Eskom,
+        ProviderError,
+        Province,
+        Stage,
+        Suburb,
+    )
+
+PROVIDER_MODULE = "load_shedding.providers.eskom"
+_EXPORTS = ("Eskom", "ProviderError", "Province", "Stage", "Suburb")
+
+_module: ModuleType | None = None
+
+
+def load() -> ModuleType:
+    """Import the provider library, blocking."""
+    global _module  # pylint: disable=global-statement
+    if _module is None:
+        module = importlib.import_module(PROVIDER_MODULE)
+        globals().update({name: getattr(module, name) for name in _EXPORTS})
+        _module = module
+    return _module
+
+
+def is_loaded() -> bool:
+    """Return True once the provider library has been imported."""
+    return _module is not None
+
+
+async def async_load(hass: HomeAssistant) -> None:
+    """Import the provider library in the executor."""
+    if _module is None:
+        await hass.async_add_executor_job(load)
+
+
+def __getattr__(name: str) -> Any:
+    """Import the provider library on first use of one of its names."""
+    if name in _EXPORTS:
+        return getattr(load(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,155 @@
+"""Indexed load shedding schedule."""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from itertools import accumulate
+import logging
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .timetable import Timetable
+
+Slot = tuple[datetime, datetime]
+CacheKey = tuple[int, int, int, str]
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ScheduleIndex:
+    """Load shedding slots parsed once and sorted by start time.
+
+    Start and end times are kept as epoch arrays so that lookups are binary
+    searches. The running maximum of the end times keeps range queries exact
+    even when slots overlap.
+    """
+
+    __slots__ = ("_slots", "_starts", "_ends", "_max_ends")
+
+    def __init__(self, slots: Iterable[Slot] = ()) -> None:
+        """Initialize the index from (start, end) datetime pairs."""
+        slots = list(slots)
+        self._slots: list[Slot] = sorted(slot for slot in slots if slot[1] > slot[0])
+        if invalid := len(slots) - len(self._slots):
+            _LOGGER.warning("Ignoring %s slots that end before they start", invalid)
+        self._starts = array("d", (start.timestamp() for start, _ in self._slots))
+        self._ends = array("d", (end.timestamp() for _, end in self._slots))
+        self._max_ends = array("d", accumulate(self._ends, max))
+
+    @classmethod
+    def from_iso(cls, schedule: Iterable[tuple[str, str]]) -> ScheduleIndex:
+        """Build the index from (start, end) ISO formatted string pairs."""
+        return cls(
+            (datetime.fromisoformat(start), datetime.fromisoformat(end))
+            for start, end in schedule
+        )
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __iter__(self) -> Iterator[Slot]:
+        return iter(self._slots)
+
+    def __getitem__(self, index: int) -> Slot:
+        return self._slots[index]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ScheduleIndex):
+            return NotImplemented
+        return self._starts == other._starts and self._ends == other._ends
+
+    def __hash__(self) -> int:
+        return hash((self._starts.tobytes(), self._ends.tobytes()))
+
+    def __repr__(self) -> str:
+        return f"ScheduleIndex({len(self)} slots)"
+
+    def _first_ending_after(self, when: float) -> int:
+        """Return the position of the first slot that ends after an epoch time."""
+        index = bisect_right(self._max_ends, when)
+        while index < len(self._ends) and self._ends[index] <= when:
+            index += 1
+        return index
+
+    def next_slot(self, when: datetime) -> Slot | None:
+        """Return the slot active at, or starting next after, a point in time."""
+        index = self._first_ending_after(when.timestamp())
+        if index == len(self._slots):
+            return None
+        return self._slots[index]
+
+    def is_active(self, when: datetime) -> bool:
+        """Return True if load shedding is scheduled at a point in time."""
+        timestamp = when.timestamp()
+        index = bisect_right(self._starts, timestamp) - 1
+        return index >= 0 and self._max_ends[index] > timestamp
+
+    def slots_in_range(self, start: datetime, end: datetime) -> list[Slot]:
+        """Return the slots overlapping the [start, end) range."""
+        start_ts = start.timestamp()
+        first = bisect_right(self._max_ends, start_ts)
+        last = bisect_left(self._starts, end.timestamp())
+        return [
+            self._slots[index]
+            for index in range(first, last)
+            if self._ends[index] > start_ts
+        ]
+
+    def as_list(self) -> list[tuple[str, str]]:
+        """Return the slots as (start, end) ISO formatted string pairs."""
+        return [(start.isoformat(), end.isoformat()) for start, end in self._slots]
+
+
+class ScheduleCache:
+    """Timetables of every stage read per suburb, kept for the month.
+
+    A suburb's timetable for a stage does not change within a month, so the
+    schedule for a new stage can be served without asking Eskom again.
+    Entries are keyed by (province, suburb, stage, month), and a timetable
+    that does not cover the days asked for is a miss. Entries for other
+    months are dropped when a new one is added, and the least recently used
+    entry is evicted past max_entries.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        """Initialize an empty cache."""
+        self._max_entries = max_entries
+        self._entries: OrderedDict[CacheKey, Timetable] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: CacheKey) -> bool:
+        return key in self._entries
+
+    def peek(self, key: CacheKey, start: datetime, end: datetime) -> Timetable | None:
+        """Return the cached timetable covering a range without counting it."""
+        timetable = self._entries.get(key)
+        if timetable is None or not timetable.covers(start, end):
+            return None
+        return timetable
+
+    def get(self, key: CacheKey, start: datetime, end: datetime) -> Timetable | None:
+        """Return the cached timetable covering a range, or None on a miss."""
+        if (timetable := self.peek(key, start, end)) is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return timetable
+
+    def set(self, key: CacheKey, timetable: Timetable) -> None:
+        """Cache a timetable, evicting other months and the oldest entries."""
+        month = key[3]
+        for old_key in [k for k in self._entries if k[3] != month]:
+            del self._entries[old_key]
+
+        self._entries[key] = timetable
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
@@ -1,17 +1,57 @@
-"""Support for Speedtest.net internet speed testing sensor."""
+"""Support for Eskom Load Shedding sensors."""
 from __future__ import annotations
 
-from homeassistant.components.sensor import SensorEntity
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import math
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+)
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTime
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
 
 # from . import EskomLoadsheddingDataCoordinator
-from .const import ATTR_SHEDDING_STAGE, DEFAULT_NAME, DOMAIN, ICON
+from . import provider
+from .api import Area, EskomAPI
+from .const import (
+    ATTR_AREA_NAME,
+    ATTR_PROVINCE_ID,
+    ATTR_PROVINCE_NAME,
+    ATTR_SHEDDING_STAGE,
+    ATTR_SUBURB_ID,
+    DEFAULT_NAME,
+    DOMAIN,
+    ICON,
+)
 from .entity import EskomLoadsheddingEntity
+from .intervals import IntervalSet
+from .timeline import start_of_day, start_of_week
 
 
 async def async_setup_entry(hass, entry, async_add_devices):
     """Setup sensor platform."""
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    async_add_devices([EskomStageSensor(coordinator, entry)])
+    async_add_devices(
+        [
+            EskomStageSensor(coordinator, entry),
+            *(
+                EskomTimelineSensor(coordinator, entry, area, description)
+                for area in coordinator.api.areas
+                for description in TIMELINE_SENSOR_TYPES
+            ),
+            *(
+                EskomDiagnosticSensor(coordinator, entry, description)
+                for description in DIAGNOSTIC_SENSOR_TYPES
+            ),
+        ]
+    )
 
 
 class EskomStageSensor(EskomLoadsheddingEntity, SensorEntity):
@@ -32,3 +72,308 @@ class EskomStageSensor(EskomLoadsheddingEntity, SensorEntity):
         """Return native value for entity."""
         state = self.coordinator.data.get(ATTR_SHEDDING_STAGE)
         return state
+
+
+def _next_start(timeline: IntervalSet, now: datetime):
+    start = timeline.next_start(now)
+    return start, start
+
+
+def _next_end(timeline: IntervalSet, now: datetime):
+    if (slot := timeline.current_or_next(now)) is None:
+        return None, None
+    return slot[1], slot[1]
+
+
+def _minutes_until(timeline: IntervalSet, now: datetime):
+    if (slot := timeline.current_or_next(now)) is None:
+        return None, None
+    if slot[0] <= now:
+        return 0, slot[1]
+    minutes = math.ceil((slot[0] - now) / timedelta(minutes=1))
+    return minutes, slot[0] - timedelta(minutes=minutes - 1)
+
+
+def _minutes_today(timeline: IntervalSet, now: datetime):
+    end = start_of_day(now) + timedelta(days=1)
+    return (
+        round(timeline.off_time(end - timedelta(days=1), end).total_seconds() / 60),
+        end,
+    )
+
+
+def _minutes_this_week(timeline: IntervalSet, now: datetime):
+    end = start_of_week(now) + timedelta(weeks=1)
+    return (
+        round(timeline.off_time(end - timedelta(weeks=1), end).total_seconds() / 60),
+        end,
+    )
+
+
+@dataclass
+class EskomTimelineSensorEntityDescription(SensorEntityDescription):
+    """Class describing sensors read from the timeline of an area."""
+
+    # Return the value at a point in time and when it next changes
+    value: Callable[[IntervalSet, datetime], tuple[Any, datetime | None]] = _next_start
+
+
+TIMELINE_SENSOR_TYPES: tuple[EskomTimelineSensorEntityDescription, ...] = (
+    EskomTimelineSensorEntityDescription(
+        key="next_start",
+        name="Next Start",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value=_next_start,
+    ),
+    EskomTimelineSensorEntityDescription(
+        key="next_end",
+        name="Next End",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value=_next_end,
+    ),
+    EskomTimelineSensorEntityDescription(
+        key="minutes_until",
+        name="Minutes Until",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        value=_minutes_until,
+    ),
+    EskomTimelineSensorEntityDescription(
+        key="minutes_today",
+        name="Minutes Today",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        value=_minutes_today,
+    ),
+    EskomTimelineSensorEntityDescription(
+        key="minutes_this_week",
+        name="Minutes This Week",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        value=_minutes_this_week,
+    ),
+)
+
+
+class EskomTimelineSensor(EskomLoadsheddingEntity, SensorEntity):
+    """Value read from the precomputed timeline of an area.
+
+    The value is computed when the schedule changes and again by a timer set
+    for the point in time it next changes, without polling in between.
+    """
+
+    entity_description: EskomTimelineSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator,
+        config_entry,
+        area: Area,
+        description: EskomTimelineSensorEntityDescription,
+    ):
+        super().__init__(coordinator, config_entry)
+        self.area = area
+        self.entity_description = description
+        self._timeline: IntervalSet | None = None
+        self._unsub_change: CALLBACK_TYPE | None = None
+
+    @property
+    def unique_id(self):
+        """Return a unique ID to use for this entity."""
+        return (
+            f"{self.config_entry.entry_id}_{self.area.id}_{self.entity_description.key}"
+        )
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return f"{DOMAIN}_{self.area.title}_{self.entity_description.key}"
+
+    @property
+    def icon(self):
+        """Return the icon of the sensor."""
+        return ICON
+
+    def _cancel_change(self) -> None:
+        if self._unsub_change is not None:
+            self._unsub_change()
+            self._unsub_change = None
+
+    @callback
+    def _update_value(self, now: datetime) -> None:
+        """Set the value at a point in time and a timer for its next change."""
+        self._cancel_change()
+        if self._timeline is None:
+            self._attr_native_value = None
+            return
+
+        self._attr_native_value, change = self.entity_description.value(
+            self._timeline, now
+        )
+        if change is not None:
+            self._unsub_change = async_track_point_in_utc_time(
+                self.hass, self._async_change, change
+            )
+
+    @callback
+    def _async_change(self, now: datetime) -> None:
+        """Write the value when it changes."""
+        self._unsub_change = None
+        self._update_value(now)
+        self.async_write_ha_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Recompute the value when the timeline of the area changed."""
+        timeline = self.coordinator.timeline(self.area.id)
+        if timeline is not self._timeline:
+            self._timeline = timeline
+            self._update_value(dt_util.utcnow())
+        self.async_write_ha_state()
+
+    async def async_added_to_hass(self):
+        """Handle entity which will be added."""
+        self.async_on_remove(
+            self.coordinator.async_add_listener(self._handle_coordinator_update)
+        )
+        self.async_on_remove(self._cancel_change)
+        self._handle_coordinator_update()
+
+    def _state_attributes(self):
+        """Build the state attributes."""
+        attrs = super()._state_attributes()
+        attrs.update(
+            {
+                ATTR_AREA_NAME: self.area.title,
+                ATTR_PROVINCE_NAME: str(provider.Province(self.area.province)),
+                ATTR_PROVINCE_ID: self.area.province,
+                ATTR_SUBURB_ID: self.area.suburb,
+            }
+        )
+        return attrs
+
+
+def _latency_p95(call: str) -> Callable[[EskomAPI], Any]:
+    def _value(api: EskomAPI):
+        if (histogram := api.metrics.latency.get(call)) is None:
+            return None
+        return histogram.percentile(95)
+
+    return _value
+
+
+def _failures(api: EskomAPI):
+    return sum(api.metrics.failures.values())
+
+
+def _cache_hit_ratio(api: EskomAPI):
+    cache = api.schedule_cache
+    if not (lookups := cache.hits + cache.misses):
+        return None
+    return round(cache.hits / lookups * 100, 1)
+
+
+def _loop_seconds(api: EskomAPI):
+    return round(api.metrics.loop_seconds, 3)
+
+
+@dataclass
+class EskomDiagnosticSensorEntityDescription(SensorEntityDescription):
+    """Class describing sensors read from the API metrics."""
+
+    value: Callable[[EskomAPI], Any] = _failures
+
+
+DIAGNOSTIC_SENSOR_TYPES: tuple[EskomDiagnosticSensorEntityDescription, ...] = (
+    *(
+        EskomDiagnosticSensorEntityDescription(
+            key=f"{call}_latency_p95",
+            name=f"{call} Latency p95",
+            native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+            value=_latency_p95(call),
+        )
+        for call in ("get_stage", "get_schedule", "find_suburbs")
+    ),
+    EskomDiagnosticSensorEntityDescription(
+        key="request_failures",
+        name="Request Failures",
+        value=_failures,
+    ),
+    EskomDiagnosticSensorEntityDescription(
+        key="schedule_cache_hit_ratio",
+        name="Schedule Cache Hit Ratio",
+        native_unit_of_measurement=PERCENTAGE,
+        value=_cache_hit_ratio,
+    ),
+    EskomDiagnosticSensorEntityDescription(
+        key="loop_seconds",
+        name="Loop Seconds",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        value=_loop_seconds,
+    ),
+)
+
+
+class EskomDiagnosticSensor(EskomLoadsheddingEntity, SensorEntity):
+    """Metric of the Eskom API client.
+
+    Metrics change without the coordinator data changing, so these sensors
+    are updated after every refresh rather than when the data changed. They
+    are disabled by default and only hold the value, since the histograms and
+    counters behind it would record a new state on every refresh; those are
+    in the diagnostics download instead.
+    """
+
+    entity_description: EskomDiagnosticSensorEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        coordinator,
+        config_entry,
+        description: EskomDiagnosticSensorEntityDescription,
+    ):
+        super().__init__(coordinator, config_entry)
+        self.entity_description = description
+        self._read_metric()
+
+    @property
+    def available(self):
+        """Metrics are available even when the last update failed."""
+        return True
+
+    @property
+    def unique_id(self):
+        """Return a unique ID to use for this entity."""
+        return f"{self.config_entry.entry_id}_{self.entity_description.key}"
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return f"{DOMAIN}_{self.entity_description.key}"
+
+    @property
+    def extra_state_attributes(self):
+        """Return no attributes, the details are in the diagnostics."""
+        return None
+
+    def _read_metric(self) -> None:
+        self._attr_native_value = self.entity_description.value(self.coordinator.api)
+
+    @callback
+    def _handle_refresh(self) -> None:
+        """Read the metrics after a refresh."""
+        self._read_metric()
+        self.async_write_ha_state()
+
+    async def async_added_to_hass(self):
+        """Handle entity which will be added."""
+        self.async_on_remove(
+            self.coordinator.async_add_refresh_listener(self._handle_refresh)
+        )
+
+    async def async_update(self):
+        """Read the metrics without refreshing the coordinator."""
+        self._read_metric()
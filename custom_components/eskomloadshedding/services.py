@@ -0,0 +1,263 @@
+"""Services of the Eskom Load Shedding integration."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+import logging
+from pathlib import Path
+
+from homeassistant.components import persistent_notification
+from homeassistant.const import ATTR_NAME
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
+import voluptuous as vol
+
+from . import profiler
+from .api import schedule_horizon
+from .const import (
+    ATTR_DEADLINE,
+    ATTR_DURATION,
+    ATTR_EARLIEST_START,
+    ATTR_END,
+    ATTR_HOURS,
+    ATTR_MIN_STAGE,
+    ATTR_PRIORITY,
+    ATTR_STAGES,
+    ATTR_START,
+    ATTR_SUBURB_ID,
+    ATTR_TASKS,
+    ATTR_UNPLANNED,
+    ATTR_WINDOWS,
+    DATA_PROFILE_TASK,
+    DEFAULT_PROFILE_DURATION,
+    DOMAIN,
+    MAX_PLAN_TASKS,
+    MAX_PROFILE_DURATION,
+    PROFILE_REPORT_PREFIX,
+    SERVICE_PLAN_WINDOWS,
+    SERVICE_PROFILE,
+    SERVICE_STAGE_HOURS,
+)
+from .intervals import IntervalSet
+from .planner import Task, plan_windows
+from .timeline import start_of_month
+
+_LOGGER = logging.getLogger(__name__)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=DEFAULT_PROFILE_DURATION): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=MAX_PROFILE_DURATION)
+        ),
+    }
+)
+
+
+TASK_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_NAME): cv.string,
+        vol.Required(ATTR_DURATION): vol.All(cv.time_period, cv.positive_timedelta),
+        vol.Optional(ATTR_EARLIEST_START): cv.datetime,
+        vol.Optional(ATTR_DEADLINE): cv.datetime,
+        vol.Optional(ATTR_PRIORITY, default=0): vol.Coerce(int),
+    }
+)
+
+PLAN_WINDOWS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_TASKS): vol.All(
+            cv.ensure_list, vol.Length(min=1, max=MAX_PLAN_TASKS), [TASK_SCHEMA]
+        ),
+        vol.Optional(ATTR_SUBURB_ID): cv.string,
+    }
+)
+
+STAGE_HOURS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_MIN_STAGE, default=1): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=8)
+        ),
+        vol.Optional(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+    }
+)
+
+
+def _write_report(path: str, session: profiler.ProfileSession, duration: float):
+    Path(path).write_text(session.report(duration))
+
+
+@callback
+def _async_profile(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Start profiling the update cycle for a duration in the background."""
+    if profiler.is_profiling():
+        raise HomeAssistantError("A profile is already running")
+
+    duration: float = call.data[ATTR_DURATION]
+    session = profiler.start(dt_util.utcnow())
+    hass.data[DATA_PROFILE_TASK] = hass.async_create_background_task(
+        _async_finish_profile(hass, session, duration), f"{DOMAIN} profile"
+    )
+    _LOGGER.info("Profiling the update cycle for %gs", duration)
+
+
+async def _async_finish_profile(
+    hass: HomeAssistant, session: profiler.ProfileSession, duration: float
+) -> None:
+    """Stop the profile after the duration and write the report."""
+    try:
+        await asyncio.sleep(duration)
+    finally:
+        profiler.stop()
+        hass.data.pop(DATA_PROFILE_TASK, None)
+
+    path = hass.config.path(
+        f"{PROFILE_REPORT_PREFIX}_{session.started:%Y%m%d_%H%M%S}.txt"
+    )
+    await hass.async_add_executor_job(_write_report, path, session, duration)
+    _LOGGER.info("Profile written to %s", path)
+    persistent_notification.async_create(
+        hass,
+        title="Eskom profile complete",
+        message=f"The profile report was written to {path}",
+    )
+
+
+def _outages(
+    hass: HomeAssistant, suburb_id: str | None
+) -> tuple[IntervalSet, datetime]:
+    """Return the outages of an area, or of all areas when not given, and the
+    end of the schedules they were read from."""
+    now = dt_util.utcnow()
+    timelines = []
+    horizon: datetime | None = None
+    for coordinator in hass.data.get(DOMAIN, {}).values():
+        for area in coordinator.api.areas:
+            if suburb_id not in (None, area.id):
+                continue
+            if (timeline := coordinator.timeline(area.id)) is None:
+                continue
+            timelines.append(timeline)
+            end = schedule_horizon(coordinator.api.results.last_updated or now)
+            horizon = end if horizon is None else min(horizon, end)
+    if not timelines or horizon is None:
+        raise HomeAssistantError(
+            f"No schedule available for suburb {suburb_id}"
+            if suburb_id is not None
+            else "No schedule available"
+        )
+
+    outages = timelines[0]
+    for timeline in timelines[1:]:
+        outages = outages.union(timeline)
+    return outages, horizon
+
+
+def _plan_windows(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Plan the tasks in the powered windows of the cached schedule."""
+    outages, horizon = _outages(hass, call.data.get(ATTR_SUBURB_ID))
+    now = dt_util.utcnow()
+    tasks = []
+    for task in call.data[ATTR_TASKS]:
+        # Outages past the end of the schedule are not known yet
+        deadline = dt_util.as_utc(task.get(ATTR_DEADLINE, horizon))
+        tasks.append(
+            Task(
+                name=task[ATTR_NAME],
+                duration=task[ATTR_DURATION],
+                earliest_start=dt_util.as_utc(task.get(ATTR_EARLIEST_START, now)),
+                deadline=min(deadline, horizon),
+                priority=task[ATTR_PRIORITY],
+            )
+        )
+
+    planned, unplanned = plan_windows(outages, tasks)
+    return {
+        ATTR_WINDOWS: [
+            {
+                ATTR_NAME: window.name,
+                ATTR_START: dt_util.as_local(window.start).isoformat(),
+                ATTR_END: dt_util.as_local(window.end).isoformat(),
+            }
+            for window in planned
+        ],
+        ATTR_UNPLANNED: [task.name for task in unplanned],
+    }
+
+
+def _stage_hours(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Return the hours spent at each stage, by default for this month."""
+    if not (coordinators := list(hass.data.get(DOMAIN, {}).values())):
+        raise HomeAssistantError("No stage history available")
+
+    # Every entry records the same national stage
+    history = coordinators[0].history
+    end = dt_util.as_utc(call.data.get(ATTR_END, dt_util.utcnow()))
+    start = dt_util.as_utc(call.data.get(ATTR_START, start_of_month(end)))
+    min_stage: int = call.data[ATTR_MIN_STAGE]
+    hours = history.time_at_stage(min_stage, start, end).total_seconds() / 3600
+    return {
+        ATTR_START: dt_util.as_local(start).isoformat(),
+        ATTR_END: dt_util.as_local(end).isoformat(),
+        ATTR_MIN_STAGE: min_stage,
+        ATTR_HOURS: round(hours, 2),
+        ATTR_STAGES: {
+            str(stage): round(duration.total_seconds() / 3600, 2)
+            for stage, duration in sorted(history.durations(start, end).items())
+        },
+    }
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services once for all entries."""
+    if hass.services.has_service(DOMAIN, SERVICE_PROFILE):
+        return
+
+    async def _async_handle_profile(call: ServiceCall) -> None:
+        _async_profile(hass, call)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, _async_handle_profile, schema=PROFILE_SCHEMA
+    )
+
+    async def _async_handle_plan_windows(call: ServiceCall) -> ServiceResponse:
+        return _plan_windows(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PLAN_WINDOWS,
+        _async_handle_plan_windows,
+        schema=PLAN_WINDOWS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def _async_handle_stage_hours(call: ServiceCall) -> ServiceResponse:
+        return _stage_hours(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_STAGE_HOURS,
+        _async_handle_stage_hours,
+        schema=STAGE_HOURS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+def async_unload_services(hass: HomeAssistant) -> None:
+    """Remove the services once the last entry is unloaded."""
+    # Stop a running profile rather than leave it enabled on the event loop
+    if (task := hass.data.pop(DATA_PROFILE_TASK, None)) is not None:
+        task.cancel()
+    profiler.stop()
+
+    hass.services.async_remove(DOMAIN, SERVICE_PROFILE)
+    hass.services.async_remove(DOMAIN, SERVICE_PLAN_WINDOWS)
+    hass.services.async_remove(DOMAIN, SERVICE_STAGE_HOURS)
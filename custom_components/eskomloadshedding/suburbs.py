@@ -0,0 +1,154 @@
+"""Local index of suburbs found through the Eskom API."""
+from __future__ import annotations
+
+from collections.abc import Callable
+import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from . import provider
+from .const import (
+    DATA_SUBURB_INDEX,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+    SUBURB_INDEX_STORAGE_KEY,
+    SUBURB_INDEX_TTL,
+)
+
+if TYPE_CHECKING:
+    from load_shedding.providers.eskom import Province, Suburb
+
+NGRAM = 3
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _ngrams(text: str) -> set[str]:
+    return {text[i : i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+class SuburbIndex:
+    """Trigram index of suburbs per province, filled from Eskom search results.
+
+    Eskom returns at most a fixed number of suburbs per search. A search is
+    answered locally when the same text was searched before, or when a
+    shorter text contained in it returned fewer than the maximum number of
+    results, since every suburb matching the longer text is then known.
+    Entries expire after SUBURB_INDEX_TTL seconds.
+    """
+
+    def __init__(
+        self,
+        max_results: int,
+        store: Store | None = None,
+        ttl: float = SUBURB_INDEX_TTL,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize an empty index."""
+        self._max_results = max_results
+        self._store = store
+        self._ttl = ttl
+        self._clock = clock
+        self._suburbs: dict[int, dict[str, Any]] = {}
+        self._searches: dict[str, dict[str, Any]] = {}
+        self._provinces: dict[int, dict[str, set[int]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _expired(self, entry: dict[str, Any]) -> bool:
+        return self._clock() - entry["updated"] > self._ttl
+
+    def _is_known(self, text: str) -> bool:
+        """Return True if all suburbs matching a search text are indexed."""
+        for start in range(len(text)):
+            for end in range(start + NGRAM, len(text) + 1):
+                search = self._searches.get(text[start:end])
+                if search is None or self._expired(search):
+                    continue
+                if search["complete"] or end - start == len(text):
+                    return True
+        return False
+
+    def _add_suburb(self, record: dict[str, Any]) -> None:
+        self._suburbs[record["Id"]] = record
+        province = provider.Suburb(**record).province
+        ngrams = self._provinces.setdefault(province.value, {})
+        for ngram in _ngrams(_normalize(record["Name"])):
+            ngrams.setdefault(ngram, set()).add(record["Id"])
+
+    def search(self, province: Province, text: str) -> list[Suburb] | None:
+        """Return the indexed suburbs matching a search, or None on a miss."""
+        text = _normalize(text)
+        if len(text) < NGRAM or not self._is_known(text):
+            self.misses += 1
+            return None
+        self.hits += 1
+
+        ngrams = self._provinces.get(province.value, {})
+        candidates = set.intersection(
+            *(ngrams.get(ngram, set()) for ngram in _ngrams(text))
+        )
+        return [
+            provider.Suburb(**self._suburbs[suburb_id])
+            for suburb_id in sorted(candidates)
+            if text in _normalize(self._suburbs[suburb_id]["Name"])
+        ]
+
+    def add_results(self, text: str, suburbs: list[Suburb]) -> None:
+        """Index the suburbs returned by an Eskom search."""
+        now = self._clock()
+        self._searches[_normalize(text)] = {
+            "updated": now,
+            "complete": len(suburbs) < self._max_results,
+        }
+        for suburb in suburbs:
+            self._add_suburb(
+                {
+                    "Id": suburb.id,
+                    "Name": suburb.name,
+                    "MunicipalityName": suburb.municipality.name,
+                    "ProvinceName": str(suburb.province),
+                    "updated": now,
+                }
+            )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the index in a form that can be serialized to JSON."""
+        return {
+            "searches": self._searches,
+            "suburbs": list(self._suburbs.values()),
+        }
+
+    def load(self, data: dict[str, Any]) -> None:
+        """Load unexpired entries saved with as_dict()."""
+        self._searches = {
+            text: search
+            for text, search in data.get("searches", {}).items()
+            if not self._expired(search)
+        }
+        for record in data.get("suburbs", []):
+            if not self._expired(record):
+                self._add_suburb(record)
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Schedule the index to be saved to disk."""
+        if self._store is not None:
+            self._store.async_delay_save(self.as_dict, STORAGE_SAVE_DELAY)
+
+
+async def async_get_suburb_index(hass: HomeAssistant, max_results: int) -> SuburbIndex:
+    """Return the shared suburb index, loading it from disk on first use."""
+    if (index := hass.data.get(DATA_SUBURB_INDEX)) is not None:
+        return index
+
+    store = Store(hass, STORAGE_VERSION, SUBURB_INDEX_STORAGE_KEY)
+    index = SuburbIndex(max_results, store)
+    if stored := await store.async_load():
+        index.load(stored)
+    # Another search may have loaded the index while the file was being read
+    return hass.data.setdefault(DATA_SUBURB_INDEX, index)
@@ -0,0 +1,22 @@
+"""Calendar boundaries of load shedding timelines."""
+from __future__ import annotations
+
+from datetime import datetime, time, timedelta
+
+from .const import SAST
+
+
+def start_of_day(when: datetime) -> datetime:
+    """Return midnight (SAST) of the day of a point in time."""
+    return datetime.combine(when.astimezone(SAST).date(), time(), SAST)
+
+
+def start_of_week(when: datetime) -> datetime:
+    """Return midnight (SAST) of the Monday of the week of a point in time."""
+    day = start_of_day(when)
+    return day - timedelta(days=day.weekday())
+
+
+def start_of_month(when: datetime) -> datetime:
+    """Return midnight (SAST) of the first day of the month of a point in time."""
+    return start_of_day(when).replace(day=1)
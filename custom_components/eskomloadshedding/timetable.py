@@ -0,0 +1,101 @@
+"""Offline load shedding schedules from a cached area timetable."""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable
+from datetime import date, datetime, time, timedelta, timezone
+
+from .const import SAST
+from .schedule import ScheduleIndex, Slot
+
+SECONDS_PER_DAY = 24 * 3600
+
+
+class Timetable:
+    """Day of month grid of load shedding slots for an area and stage.
+
+    Eskom timetables repeat by day of month, so the slots read for one day
+    number apply to that day in any month. Slots are kept per day as second
+    offsets from midnight (SAST) and durations, and schedules for a date
+    range are generated by adding them to the epoch of each midnight. The
+    page a timetable is read from only lists some days, so the days it
+    covered are kept to tell a day without load shedding from one that was
+    not read.
+    """
+
+    __slots__ = ("_offsets", "_durations", "_covered")
+
+    def __init__(
+        self, slots: Iterable[Slot] = (), days: Iterable[int] | None = None
+    ) -> None:
+        """Initialize the timetable from the slots and days read for the area.
+
+        The days default to the days of the month with slots.
+        """
+        self._offsets: dict[int, array] = {}
+        self._durations: dict[int, array] = {}
+        for start, end in sorted(slots):
+            local = start.astimezone(SAST)
+            midnight = datetime.combine(local.date(), time(), SAST)
+            self._offsets.setdefault(local.day, array("d")).append(
+                (local - midnight).total_seconds()
+            )
+            self._durations.setdefault(local.day, array("d")).append(
+                (end - start).total_seconds()
+            )
+        self._covered = frozenset(self._offsets if days is None else days)
+
+    def __len__(self) -> int:
+        return sum(len(offsets) for offsets in self._offsets.values())
+
+    def __repr__(self) -> str:
+        return f"Timetable({len(self._offsets)} days, {len(self)} slots)"
+
+    @property
+    def days(self) -> set[int]:
+        """Return the days of the month with load shedding."""
+        return set(self._offsets)
+
+    @property
+    def covered_days(self) -> frozenset[int]:
+        """Return the days of the month the timetable was read for."""
+        return self._covered
+
+    def covers(self, start: datetime, end: datetime) -> bool:
+        """Return True if every day of the [start, end) range was read."""
+        day: date = start.astimezone(SAST).date()
+        last_day: date = (end - timedelta(microseconds=1)).astimezone(SAST).date()
+        while day <= last_day:
+            if day.day not in self._covered:
+                return False
+            day += timedelta(days=1)
+        return True
+
+    def generate(self, start: datetime, end: datetime) -> ScheduleIndex:
+        """Return the slots overlapping the [start, end) range."""
+        start_ts = start.timestamp()
+        end_ts = end.timestamp()
+
+        # Slots of the previous day may run past midnight
+        day: date = start.astimezone(SAST).date() - timedelta(days=1)
+        last_day: date = end.astimezone(SAST).date()
+        midnight = datetime.combine(day, time(), SAST).timestamp()
+
+        slots: list[Slot] = []
+        while day <= last_day:
+            if (offsets := self._offsets.get(day.day)) is not None:
+                durations = self._durations[day.day]
+                for offset, duration in zip(offsets, durations):
+                    slot_start = midnight + offset
+                    slot_end = slot_start + duration
+                    if slot_end > start_ts and slot_start < end_ts:
+                        slots.append(
+                            (
+                                datetime.fromtimestamp(slot_start, timezone.utc),
+                                datetime.fromtimestamp(slot_end, timezone.utc),
+                            )
+                        )
+            day += timedelta(days=1)
+            midnight += SECONDS_PER_DAY
+
+        return ScheduleIndex(slots)
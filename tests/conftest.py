@@ -16,8 +16,11 @@
 # pytest includes fixtures OOB which you can use as defined on this page)
 from unittest.mock import patch
 
+from load_shedding.providers.eskom import Stage
 import pytest
 
+from custom_components.eskomloadshedding.api import EskomAPI, EskomLoadsheddingResults
+
 pytest_plugins = "pytest_homeassistant_custom_component"
 
 
@@ -41,13 +44,18 @@ def skip_notifications_fixture():
         yield
 
 
-# This fixture, when used, will result in calls to async_get_data to return None. To have the call
-# return a value, we would add the `return_value=<VALUE_TO_RETURN>` parameter to the patch call.
+# This fixture, when used, will result in calls to async_get_data to return results with no
+# load shedding and an empty schedule.
 @pytest.fixture(name="bypass_get_data")
 def bypass_get_data_fixture():
     """Skip calls to get data from API."""
-    with patch("custom_components.eskomloadshedding.EskomAPI.get_data"):
-        yield
+    with patch(
+        "custom_components.eskomloadshedding.EskomAPI.async_get_data",
+        return_value=EskomLoadsheddingResults(Stage.NO_LOAD_SHEDDING).dict(),
+    ) as get_data, patch(
+        "custom_components.eskomloadshedding.EskomAPI.async_prefetch_schedules"
+    ):
+        yield get_data
 
 
 # In this fixture, we are forcing calls to async_get_data to raise an Exception. This is useful
@@ -56,7 +64,22 @@ def bypass_get_data_fixture():
 def error_get_data_fixture():
     """Simulate error when retrieving data from API."""
     with patch(
-        "custom_componentss.eskomloadshedding.EskomAPI.get_data",
+        "custom_components.eskomloadshedding.EskomAPI.async_get_data",
         side_effect=Exception,
     ):
         yield
+
+
+# This fixture serves the results restored from disk as stale, as if Eskom was unavailable.
+@pytest.fixture(name="stale_get_data")
+def stale_get_data_fixture():
+    """Serve the restored results instead of calling the API."""
+
+    async def _async_stale_data(api):
+        api.results.stale = True
+        return api.results.dict()
+
+    with patch.object(
+        EskomAPI, "async_get_data", autospec=True, side_effect=_async_stale_data
+    ):
+        yield
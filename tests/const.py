@@ -2,6 +2,5 @@
 MOCK_CONFIG = {
     "scan_interval": 15,
     "manual": False,
-    "province_id": 3,
-    "suburb_id": 1024989,
+    "areas": [{"province_id": 3, "suburb_id": 1024989, "name": "Soweto"}],
 }
@@ -0,0 +1,265 @@
+"""Test Eskom API client."""
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from load_shedding.providers.eskom import Province, Stage, Suburb
+
+from custom_components.eskomloadshedding.api import (
+    BASE_URL,
+    Area,
+    EskomAPI,
+    areas_from_options,
+    parse_schedule,
+)
+from custom_components.eskomloadshedding.const import SAST
+
+SCHEDULE_PAGE = """
+<div class="scheduleDay">
+  <div class="dayMonth">Mon, 20 Jun</div>
+  <a>04:00 - 06:30</a>
+  <a>12:00 - 14:30</a>
+</div>
+"""
+
+
+def _schedule_page(first_day: int = 0, days: int = 7) -> str:
+    """Return a schedule page listing days from today, with slots on the first."""
+    today = datetime.now(SAST)
+    page = ""
+    for day in range(first_day, first_day + days):
+        day_month = (today + timedelta(days=day)).strftime("%a, %d %b")
+        slots = "<a>04:00 - 06:30</a>" if day == first_day else ""
+        page += (
+            f'<div class="scheduleDay"><div class="dayMonth">{day_month}</div>'
+            f"{slots}</div>"
+        )
+    return page
+
+
+async def test_get_stage(hass, aioclient_mock):
+    """Test the stage is read from the shared client session."""
+    aioclient_mock.get(f"{BASE_URL}/GetStatus", text="3")
+    api = EskomAPI(async_get_clientsession(hass), [Area(3, 1024989)])
+
+    assert await api.async_get_stage() == Stage.STAGE_2
+    assert aioclient_mock.call_count == 1
+
+
+async def test_get_stage_unavailable(hass, aioclient_mock):
+    """Test an HTTP error is reported as an unknown stage."""
+    aioclient_mock.get(f"{BASE_URL}/GetStatus", status=500)
+    api = EskomAPI(async_get_clientsession(hass), [Area(3, 1024989)])
+
+    assert await api.async_get_stage() == Stage.UNKNOWN
+
+
+async def test_get_schedule_request(hass, aioclient_mock):
+    """Test the schedule page is requested and parsed."""
+    aioclient_mock.get(f"{BASE_URL}/GetScheduleM/1024989/2/3/3252", text=SCHEDULE_PAGE)
+    api = EskomAPI(async_get_clientsession(hass), [Area(3, 1024989)])
+
+    await api.async_get_schedule(Province(3), Suburb(id=1024989), Stage.STAGE_2)
+    assert aioclient_mock.call_count == 1
+
+
+async def test_get_data_serves_last_stage(hass, aioclient_mock):
+    """Test the last known results are served when Eskom is unavailable."""
+    aioclient_mock.get(f"{BASE_URL}/GetStatus", text="1")
+    api = EskomAPI(async_get_clientsession(hass), [Area(3, 1024989)])
+    data = await api.async_get_data()
+    assert data["stage"] == Stage.NO_LOAD_SHEDDING.value
+    assert not data["stale"]
+
+    aioclient_mock.clear_requests()
+    aioclient_mock.get(f"{BASE_URL}/GetStatus", status=500)
+    stale = await api.async_get_data()
+    assert stale["stage"] == Stage.NO_LOAD_SHEDDING.value
+    assert stale["stale"]
+    assert stale["last_updated"] == data["last_updated"]
+
+
+async def test_failures_counted_by_reason(hass, aioclient_mock):
+    """Test timeouts and HTTP errors are counted as distinct failures."""
+    api = EskomAPI(async_get_clientsession(hass), [Area(3, 1024989)])
+
+    aioclient_mock.get(f"{BASE_URL}/GetStatus", exc=asyncio.TimeoutError())
+    assert await api.async_get_stage() == Stage.UNKNOWN
+    aioclient_mock.clear_requests()
+    aioclient_mock.get(f"{BASE_URL}/GetStatus", status=503)
+    assert await api.async_get_stage() == Stage.UNKNOWN
+
+    assert api.failures == {"request_timeout": 1, "http_status": 1}
+
+
+async def test_circuit_open_skips_requests(hass, aioclient_mock):
+    """Test requests are not sent while the circuit is open."""
+    aioclient_mock.get(f"{BASE_URL}/GetStatus", status=503)
+    api = EskomAPI(async_get_clientsession(hass), [Area(3, 1024989)])
+
+    for _ in range(5):
+        await api.async_get_stage()
+
+    assert aioclient_mock.call_count == 3
+    assert api.breaker.state == "open"
+    assert api.failures["circuit_open"] == 2
+
+
+async def test_get_data_fetches_each_area(hass, aioclient_mock):
+    """Test one stage request is shared by the schedule requests of all areas."""
+    tomorrow = datetime.now(SAST) + timedelta(days=1)
+    page = SCHEDULE_PAGE.replace("Mon, 20 Jun", tomorrow.strftime("%a, %d %b"))
+    aioclient_mock.get(f"{BASE_URL}/GetStatus", text="3")
+    aioclient_mock.get(f"{BASE_URL}/GetScheduleM/1024989/2/3/3252", text=page)
+    aioclient_mock.get(f"{BASE_URL}/GetScheduleM/1024990/2/3/3252", text=page)
+    api = EskomAPI(async_get_clientsession(hass), [Area(3, 1024989), Area(3, 1024990)])
+
+    data = await api.async_get_data()
+    assert set(data["schedules"]) == {"1024989", "1024990"}
+    assert aioclient_mock.call_count == 3
+
+    # Schedules are only fetched again when the stage changes
+    await api.async_get_data()
+    assert aioclient_mock.call_count == 4
+
+    api.set_areas([Area(3, 1024990)])
+    data = await api.async_get_data()
+    assert set(data["schedules"]) == {"1024990"}
+
+
+def test_areas_from_legacy_options():
+    """Test options saved for a single area are still read."""
+    assert areas_from_options({"province_id": 3, "suburb_id": 1024989}) == [
+        Area(3, 1024989)
+    ]
+    assert areas_from_options(
+        {"areas": [{"province_id": 3, "suburb_id": 1024989, "name": "Soweto"}]}
+    ) == [Area(3, 1024989, "Soweto")]
+    assert not areas_from_options({})
+
+
+def _mock_eskom(aioclient_mock, status: str) -> None:
+    """Answer the status and the schedule of every stage as of now."""
+    aioclient_mock.get(f"{BASE_URL}/GetStatus", text=status)
+    for stage in range(1, 9):
+        aioclient_mock.get(
+            f"{BASE_URL}/GetScheduleM/1024989/{stage}/3/3252",
+            text=_schedule_page(),
+        )
+
+
+def _schedule_reads(aioclient_mock) -> int:
+    return sum("GetScheduleM" in str(call[1]) for call in aioclient_mock.mock_calls)
+
+
+async def test_stage_change_served_from_cache(hass, aioclient_mock):
+    """Test schedules prefetched next to the current stage are not read again."""
+    _mock_eskom(aioclient_mock, "5")
+    api = EskomAPI(async_get_clientsession(hass), [Area(3, 1024989)])
+    await api.async_get_data()
+
+    await api.async_prefetch_schedules()
+    assert _schedule_reads(aioclient_mock) == 3
+    assert len(api.schedule_cache) == 3
+    assert (api.schedule_cache.hits, api.schedule_cache.misses) == (0, 1)
+
+    aioclient_mock.clear_requests()
+    _mock_eskom(aioclient_mock, "6")
+    await api.async_get_data()
+
+    assert aioclient_mock.call_count == 1
+    assert (api.schedule_cache.hits, api.schedule_cache.misses) == (1, 1)
+
+
+async def test_prefetch_requests_while_stable(hass, aioclient_mock, freezer):
+    """Test a stable stage reads each prefetched schedule once a day."""
+    freezer.move_to("2023-06-09T22:30:00+00:00")
+    api = EskomAPI(async_get_clientsession(hass), [Area(3, 1024989)])
+
+    # Poll hourly for three days, serving pages listing the days from now
+    reads = 0
+    for _ in range(72):
+        aioclient_mock.clear_requests()
+        _mock_eskom(aioclient_mock, "3")
+        await api.async_get_data()
+        await api.async_prefetch_schedules()
+        reads += _schedule_reads(aioclient_mock)
+        freezer.tick(timedelta(hours=1))
+
+    # The current stage once, and the stages above and below it once a day
+    assert reads == 1 + 2 * 3
+
+
+async def test_concurrent_reads_are_shared(hass, aioclient_mock):
+    """Test concurrent reads share a single request."""
+    aioclient_mock.get(f"{BASE_URL}/GetStatus", text="1")
+    api = EskomAPI(async_get_clientsession(hass))
+
+    results = await asyncio.gather(*(api.async_get_data() for _ in range(5)))
+    assert aioclient_mock.call_count == 1
+    assert all(data == results[0] for data in results)
+    assert results[0] is not results[1]
+
+    await api.async_get_data()
+    assert aioclient_mock.call_count == 2
+
+
+async def test_read_cancelled_with_last_caller(hass):
+    """Test the shared read is only cancelled once no caller waits for it."""
+    api = EskomAPI(async_get_clientsession(hass))
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def _async_slow_stage():
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with patch.object(api, "async_get_stage", _async_slow_stage):
+        first = asyncio.ensure_future(api.async_get_data())
+        second = asyncio.ensure_future(api.async_get_data())
+        await started.wait()
+
+        first.cancel()
+        await asyncio.sleep(0)
+        assert not cancelled.is_set()
+
+        second.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        await asyncio.sleep(0)
+        assert api._pending is None
+
+
+def test_parse_schedule_past_midnight():
+    """Test a slot running past midnight ends on the next day."""
+    page = SCHEDULE_PAGE.replace("<a>12:00 - 14:30</a>", "<a>22:00 - 00:30</a>")
+    schedule = parse_schedule(page, Suburb(id=1024989))
+
+    start, end = (datetime.fromisoformat(time) for time in schedule[1])
+    assert end - start == timedelta(hours=2, minutes=30)
+
+
+async def test_uncovered_days_are_read_again(hass, aioclient_mock):
+    """Test a cached timetable not covering the days asked for is read again."""
+    aioclient_mock.get(
+        f"{BASE_URL}/GetScheduleM/1024989/2/3/3252", text=_schedule_page(-7)
+    )
+    api = EskomAPI(async_get_clientsession(hass), [Area(3, 1024989)])
+
+    await api.async_get_schedule(Province(3), Suburb(id=1024989), Stage.STAGE_2)
+    await api.async_get_schedule(Province(3), Suburb(id=1024989), Stage.STAGE_2)
+    assert aioclient_mock.call_count == 2
+    assert api.schedule_cache.misses == 2
+
+    aioclient_mock.clear_requests()
+    aioclient_mock.get(
+        f"{BASE_URL}/GetScheduleM/1024989/2/3/3252", text=_schedule_page()
+    )
+    await api.async_get_schedule(Province(3), Suburb(id=1024989), Stage.STAGE_2)
+    await api.async_get_schedule(Province(3), Suburb(id=1024989), Stage.STAGE_2)
+    assert aioclient_mock.call_count == 1
+    assert api.schedule_cache.hits == 1
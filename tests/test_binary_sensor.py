@@ -0,0 +1,48 @@
+"""Test Eskom Load Shedding binary sensor."""
+from datetime import timedelta
+
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.eskomloadshedding.const import DOMAIN
+
+from .const import MOCK_CONFIG
+
+
+async def test_state_follows_slot_boundaries(hass, hass_storage, stale_get_data):
+    """Test the sensor turns on and off at the slot boundaries."""
+    now = dt_util.utcnow()
+    start = now + timedelta(minutes=10)
+    end = start + timedelta(hours=2)
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, data={}, options=MOCK_CONFIG, entry_id="test"
+    )
+    config_entry.add_to_hass(hass)
+    hass_storage[f"{DOMAIN}.test"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.test",
+        "data": {
+            "stage": 2,
+            "schedules": {"1024989": [[start.isoformat(), end.isoformat()]]},
+            "areas": MOCK_CONFIG["areas"],
+            "last_updated": now.isoformat(),
+        },
+    }
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_id = "binary_sensor.eskomloadshedding_soweto_active"
+    assert hass.states.get(entity_id).state == "off"
+
+    async_fire_time_changed(hass, start + timedelta(seconds=1))
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).state == "on"
+
+    async_fire_time_changed(hass, end + timedelta(seconds=1))
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).state == "off"
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
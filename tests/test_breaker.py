@@ -0,0 +1,62 @@
+"""Test circuit breaker."""
+from custom_components.eskomloadshedding.breaker import CircuitBreaker
+
+
+class FakeClock:
+    """Monotonic clock moved by hand."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_opens_after_threshold_and_recovers():
+    """Test the circuit opens, lets one trial through and closes again."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60, clock=clock)
+
+    for _ in range(2):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow_request()
+
+    clock.now = 60
+    assert breaker.state == "half_open"
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow_request()
+
+
+def test_failed_trial_reopens():
+    """Test a failed half open trial opens the circuit again."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60, clock=clock)
+    breaker.record_failure()
+
+    clock.now = 60
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_retry_budget():
+    """Test retries stop once the budget is spent and resume as it refills."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        failure_threshold=10, retry_budget=2, retry_budget_period=100, clock=clock
+    )
+    breaker.record_failure()
+
+    assert breaker.allow_request()
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    clock.now = 50
+    assert breaker.retry_tokens == 1
+    assert breaker.allow_request()
@@ -0,0 +1,45 @@
+"""Test Eskom Load Shedding calendar."""
+from datetime import datetime
+
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.eskomloadshedding.const import DOMAIN
+
+from .const import MOCK_CONFIG
+
+SCHEDULE = [
+    ["2022-06-02T04:00:00+00:00", "2022-06-02T06:30:00+00:00"],
+    ["2022-06-03T04:00:00+00:00", "2022-06-03T06:30:00+00:00"],
+    ["2022-06-03T12:00:00+00:00", "2022-06-03T14:30:00+00:00"],
+]
+
+
+async def test_get_events_in_range(hass, hass_storage, error_on_get_data):
+    """Test events honour the requested range and are reused."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, data={}, options=MOCK_CONFIG, entry_id="test"
+    )
+    config_entry.add_to_hass(hass)
+    hass_storage[f"{DOMAIN}.test"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.test",
+        "data": {
+            "stage": 2,
+            "schedules": {"1024989": SCHEDULE},
+            "areas": MOCK_CONFIG["areas"],
+            "last_updated": dt_util.utcnow().isoformat(),
+        },
+    }
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    calendar = hass.data["calendar"].get_entity("calendar.eskom_schedule_soweto")
+    start = datetime.fromisoformat("2022-06-03T00:00:00+00:00")
+    end = datetime.fromisoformat("2022-06-03T12:00:00+00:00")
+
+    events = await calendar.async_get_events(hass, start, end)
+    assert [event.start.isoformat() for event in events] == [SCHEDULE[1][0]]
+    assert (await calendar.async_get_events(hass, start, end))[0] is events[0]
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
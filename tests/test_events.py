@@ -0,0 +1,150 @@
+"""Test Eskom Load Shedding events."""
+from datetime import timedelta
+from unittest.mock import patch
+
+from homeassistant.util import dt as dt_util
+from load_shedding.providers.eskom import Stage
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+    async_fire_time_changed,
+)
+
+from custom_components.eskomloadshedding.api import EskomLoadsheddingResults
+from custom_components.eskomloadshedding.const import (
+    DOMAIN,
+    EVENT_SCHEDULE_UPDATED,
+    EVENT_SLOT_STARTING,
+    EVENT_STAGE_CHANGED,
+)
+from custom_components.eskomloadshedding.events import lead_times_from_options
+from custom_components.eskomloadshedding.schedule import ScheduleIndex
+
+from .const import MOCK_CONFIG
+
+
+def _slot(start: timedelta, end: timedelta) -> list[str]:
+    now = dt_util.utcnow().replace(microsecond=0)
+    return [(now + start).isoformat(), (now + end).isoformat()]
+
+
+async def _async_setup(hass, hass_storage, schedule, options=MOCK_CONFIG):
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, data={}, options=options, entry_id="test"
+    )
+    config_entry.add_to_hass(hass)
+    hass_storage[f"{DOMAIN}.test"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.test",
+        "data": {
+            "stage": 2,
+            "schedules": {"1024989": schedule},
+            "areas": MOCK_CONFIG["areas"],
+            "last_updated": dt_util.utcnow().isoformat(),
+        },
+    }
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    return config_entry
+
+
+def test_lead_times_from_options():
+    """Test lead times are parsed from comma separated minutes."""
+    assert lead_times_from_options({}) == [timedelta(), timedelta(minutes=15)]
+    assert lead_times_from_options({"slot_lead_times": "30,5, 30"}) == [
+        timedelta(minutes=5),
+        timedelta(minutes=30),
+    ]
+    assert lead_times_from_options({"slot_lead_times": ""}) == []
+    for value in ("-5", "soon"):
+        with pytest.raises(ValueError):
+            lead_times_from_options({"slot_lead_times": value})
+
+
+async def test_stage_changed(hass, hass_storage, bypass_get_data):
+    """Test the stage change since the restored results is fired."""
+    stage_changed = async_capture_events(hass, EVENT_STAGE_CHANGED)
+    config_entry = await _async_setup(
+        hass, hass_storage, [_slot(timedelta(hours=1), timedelta(hours=3))]
+    )
+
+    assert [event.data for event in stage_changed] == [{"old_stage": 2, "new_stage": 0}]
+
+    await hass.data[DOMAIN]["test"].async_refresh()
+    await hass.async_block_till_done()
+    assert len(stage_changed) == 1
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_schedule_updated(hass, hass_storage):
+    """Test the slots added and removed by a new schedule are fired."""
+    kept = _slot(timedelta(hours=1), timedelta(hours=3))
+    removed = _slot(timedelta(hours=9), timedelta(hours=11))
+    added = _slot(timedelta(hours=17), timedelta(hours=19))
+    ended = _slot(timedelta(hours=-5), timedelta(hours=-3))
+    schedule_updated = async_capture_events(hass, EVENT_SCHEDULE_UPDATED)
+
+    results = EskomLoadsheddingResults(
+        Stage.STAGE_2,
+        {"1024989": ScheduleIndex.from_iso([kept, added])},
+        dt_util.utcnow(),
+    )
+    with patch(
+        "custom_components.eskomloadshedding.EskomAPI.async_get_data",
+        return_value=results.dict(),
+    ), patch("custom_components.eskomloadshedding.EskomAPI.async_prefetch_schedules"):
+        config_entry = await _async_setup(hass, hass_storage, [ended, kept, removed])
+
+    assert len(schedule_updated) == 1
+    assert schedule_updated[0].data == {
+        "suburb_id": "1024989",
+        "area_name": "Soweto",
+        "added": [
+            {
+                "start": dt_util.as_local(dt_util.parse_datetime(added[0])).isoformat(),
+                "end": dt_util.as_local(dt_util.parse_datetime(added[1])).isoformat(),
+            }
+        ],
+        "removed": [
+            {
+                "start": dt_util.as_local(
+                    dt_util.parse_datetime(removed[0])
+                ).isoformat(),
+                "end": dt_util.as_local(dt_util.parse_datetime(removed[1])).isoformat(),
+            }
+        ],
+    }
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_slot_starting(hass, hass_storage, error_on_get_data):
+    """Test slot starting events are fired at each lead time."""
+    first = _slot(timedelta(hours=1), timedelta(hours=3))
+    second = _slot(timedelta(hours=2), timedelta(hours=4))
+    third = _slot(timedelta(hours=6), timedelta(hours=7))
+    slot_starting = async_capture_events(hass, EVENT_SLOT_STARTING)
+    config_entry = await _async_setup(hass, hass_storage, [first, second, third])
+    start = dt_util.parse_datetime(first[0])
+
+    async_fire_time_changed(hass, start - timedelta(minutes=15))
+    await hass.async_block_till_done()
+    assert [event.data["lead_time"] for event in slot_starting] == [15]
+    assert (
+        slot_starting[0].data["end"]
+        == dt_util.as_local(dt_util.parse_datetime(second[1])).isoformat()
+    )
+
+    async_fire_time_changed(hass, start)
+    await hass.async_block_till_done()
+    assert [event.data["lead_time"] for event in slot_starting] == [15, 0]
+
+    # The merged outage does not start again when the overlapping slot does
+    async_fire_time_changed(hass, dt_util.parse_datetime(second[0]))
+    await hass.async_block_till_done()
+    assert len(slot_starting) == 2
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    async_fire_time_changed(hass, dt_util.parse_datetime(third[0]))
+    await hass.async_block_till_done()
+    assert len(slot_starting) == 2
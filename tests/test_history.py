@@ -0,0 +1,107 @@
+"""Test the load shedding stage history."""
+from datetime import datetime, timedelta
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.eskomloadshedding.const import DOMAIN
+from custom_components.eskomloadshedding.history import StageHistory
+
+from .const import MOCK_CONFIG
+
+START = datetime.fromisoformat("2022-06-01T00:00:00+00:00")
+
+
+def _polled(history: StageHistory, stages: list[int], every=timedelta(minutes=15)):
+    for index, stage in enumerate(stages):
+        history.record(stage, START + index * every)
+
+
+def test_polls_are_compacted_into_spans():
+    """Test repeated stages become a single span lasting until the change."""
+    history = StageHistory()
+    _polled(history, [2, 2, 2, 4, 4, 2])
+
+    assert history.buffered == 6
+    assert history.spans() == [
+        (2, START.timestamp(), (START + timedelta(minutes=45)).timestamp()),
+        (
+            4,
+            (START + timedelta(minutes=45)).timestamp(),
+            (START + timedelta(minutes=75)).timestamp(),
+        ),
+        (
+            2,
+            (START + timedelta(minutes=75)).timestamp(),
+            (START + timedelta(minutes=75)).timestamp(),
+        ),
+    ]
+    assert not history.buffered
+
+
+def test_gaps_are_left_out():
+    """Test time without polls longer than the maximum gap is not counted."""
+    history = StageHistory()
+    _polled(history, [4, 4, 4], every=timedelta(hours=1))
+    history.record(4, START + timedelta(hours=10))
+    history.record(4, START + timedelta(hours=11))
+
+    assert len(history.spans()) == 2
+    assert history.time_at_stage(4, START, START + timedelta(days=1)) == timedelta(
+        hours=3
+    )
+
+
+def test_time_at_stage():
+    """Test the time at or above a stage is clipped to the range."""
+    history = StageHistory(
+        [
+            (2, START.timestamp(), (START + timedelta(hours=10)).timestamp()),
+            (
+                5,
+                (START + timedelta(hours=10)).timestamp(),
+                (START + timedelta(hours=14)).timestamp(),
+            ),
+            (
+                4,
+                (START + timedelta(hours=14)).timestamp(),
+                (START + timedelta(hours=20)).timestamp(),
+            ),
+        ]
+    )
+    start = START + timedelta(hours=8)
+    end = START + timedelta(hours=16)
+
+    assert history.durations(start, end) == {
+        2: timedelta(hours=2),
+        5: timedelta(hours=4),
+        4: timedelta(hours=2),
+    }
+    assert history.time_at_stage(4, start, end) == timedelta(hours=6)
+    assert history.time_at_stage(6, start, end) == timedelta()
+
+    history.prune(START + timedelta(hours=12))
+    assert [stage for stage, _, _ in history.spans()] == [5, 4]
+
+
+async def test_history_is_saved_and_restored(hass, hass_storage, bypass_get_data):
+    """Test the stage history survives reloading the entry."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, data={}, options=MOCK_CONFIG, entry_id="test"
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    await hass.data[DOMAIN]["test"].async_refresh()
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    spans = hass_storage[f"{DOMAIN}.history.test"]["data"]["spans"]
+    assert len(spans) == 1
+    assert spans[0][0] == 0
+
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert len(hass.data[DOMAIN]["test"].history) == 1
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.config_entries.async_remove(config_entry.entry_id)
+    assert f"{DOMAIN}.history.test" not in hass_storage
@@ -1,5 +1,16 @@
 """Test component setup."""
-from pytest_homeassistant_custom_component.common import MockConfigEntry
+from datetime import timedelta
+import subprocess
+import sys
+from unittest.mock import patch
+
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+from load_shedding.providers.eskom import Stage
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
 
 from custom_components.eskomloadshedding import (
     EskomLoadsheddingDataCoordinator,
@@ -7,6 +18,7 @@ from custom_components.eskomloadshedding import (
     async_setup_entry,
     async_unload_entry,
 )
+from custom_components.eskomloadshedding.api import EskomAPI, EskomLoadsheddingResults
 from custom_components.eskomloadshedding.const import DOMAIN
 
 from .const import MOCK_CONFIG
@@ -36,3 +48,182 @@ async def test_setup_unload_and_reload_entry(hass, bypass_get_data):
     # Unload the entry and verify that the data has been removed
     assert await async_unload_entry(hass, config_entry)
     assert config_entry.entry_id not in hass.data[DOMAIN]
+
+
+async def test_setup_entry_restores_results(hass, hass_storage, error_on_get_data):
+    """Test entry setup comes up from the stored results when Eskom fails."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, data={}, options=MOCK_CONFIG, entry_id="test"
+    )
+    config_entry.add_to_hass(hass)
+    hass_storage[f"{DOMAIN}.test"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.test",
+        "data": {
+            "stage": 2,
+            "schedules": {
+                "1024989": [["2022-06-20T12:00:00+00:00", "2022-06-20T14:30:00+00:00"]]
+            },
+            "areas": MOCK_CONFIG["areas"],
+            "last_updated": dt_util.utcnow().isoformat(),
+        },
+    }
+
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    assert coordinator.data["stage"] == 2
+    assert coordinator.data["stale"]
+    assert coordinator.data["schedules"]["1024989"].as_list() == [
+        ("2022-06-20T12:00:00+00:00", "2022-06-20T14:30:00+00:00")
+    ]
+
+    await hass.async_block_till_done()
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_setup_entry_ignores_expired_results(
+    hass, hass_storage, error_on_get_data
+):
+    """Test stored results older than the maximum stale age are not served."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, data={}, options=MOCK_CONFIG, entry_id="test"
+    )
+    config_entry.add_to_hass(hass)
+    hass_storage[f"{DOMAIN}.test"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.test",
+        "data": {
+            "stage": 2,
+            "schedules": {},
+            "areas": MOCK_CONFIG["areas"],
+            "last_updated": "2022-06-20T12:00:00+00:00",
+        },
+    }
+
+    # Setup completes without data, leaving the platforms until data arrives
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    assert not coordinator.last_update_success
+    assert not coordinator.platforms
+    assert hass.states.get("sensor.eskomloadshedding_stage") is None
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_setup_entry_platforms_wait_for_first_data(hass, error_on_get_data):
+    """Test the platforms are set up once the first refresh succeeds."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, data={}, options=MOCK_CONFIG, entry_id="test"
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    assert not coordinator.platforms
+
+    with patch.object(
+        EskomAPI,
+        "async_get_data",
+        return_value=EskomLoadsheddingResults(Stage.NO_LOAD_SHEDDING).dict(),
+    ), patch.object(EskomAPI, "async_prefetch_schedules"):
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+    assert coordinator.platforms
+    assert hass.states.get("sensor.eskomloadshedding_stage").state == "0"
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+def test_import_is_lazy():
+    """Test importing the integration leaves the provider library unloaded."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, custom_components.eskomloadshedding.sensor, "
+            "custom_components.eskomloadshedding.calendar, "
+            "custom_components.eskomloadshedding.config_flow; "
+            "print('load_shedding' in sys.modules)",
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    assert result.stdout.strip() == "False"
+
+
+async def test_unchanged_data_skips_listeners(hass, bypass_get_data):
+    """Test listeners are only notified when the data changes."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, data={}, options=MOCK_CONFIG, entry_id="test"
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    generation = coordinator.generation
+    await coordinator.async_refresh()
+    assert coordinator.generation == generation
+
+    coordinator.api.results.stage = Stage.STAGE_2
+    bypass_get_data.return_value = coordinator.api.results.dict()
+    await coordinator.async_refresh()
+    assert coordinator.generation == generation + 1
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_history_saved_at_interval(hass, hass_storage, bypass_get_data):
+    """Test the stage history is saved periodically while stages are polled."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, data={}, options=MOCK_CONFIG, entry_id="test"
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    key = f"{DOMAIN}.history.test"
+    assert key not in hass_storage
+
+    # Polls do not put the save off
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    for minutes in range(5, 20, 5):
+        await coordinator.async_refresh()
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(minutes=minutes))
+        await hass.async_block_till_done()
+    assert [span[0] for span in hass_storage[key]["data"]["spans"]] == [0]
+
+    # Nothing is written when no stage was recorded since the last save
+    hass_storage.pop(key)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(minutes=30))
+    await hass.async_block_till_done()
+    assert key not in hass_storage
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_migrate_entry_keeps_calendar(hass, error_on_get_data):
+    """Test the calendar of a single area entry keeps its registry entry."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={},
+        options={"province_id": 3, "suburb_id": 1024989},
+        entry_id="test",
+    )
+    config_entry.add_to_hass(hass)
+    registry = er.async_get(hass)
+    calendar = registry.async_get_or_create(
+        "calendar", DOMAIN, "eskom_calendar", config_entry=config_entry
+    )
+
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert config_entry.version == 2
+    assert (
+        registry.async_get_entity_id("calendar", DOMAIN, "eskom_calendar_1024989")
+        == calendar.entity_id
+    )
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
@@ -0,0 +1,105 @@
+"""Test the schedule interval engine."""
+from datetime import datetime, timedelta
+
+from custom_components.eskomloadshedding.intervals import IntervalSet
+from custom_components.eskomloadshedding.schedule import ScheduleIndex
+
+SCHEDULE = ScheduleIndex.from_iso(
+    [
+        ("2022-06-02T04:00:00+02:00", "2022-06-02T06:30:00+02:00"),
+        ("2022-06-02T06:00:00+02:00", "2022-06-02T08:00:00+02:00"),
+        ("2022-06-02T22:00:00+02:00", "2022-06-03T00:30:00+02:00"),
+    ]
+)
+
+
+def _dt(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+
+def _intervals(*slots: tuple[str, str]) -> IntervalSet:
+    return IntervalSet((_dt(start), _dt(end)) for start, end in slots)
+
+
+def test_overlapping_slots_are_merged():
+    """Test overlapping slots become a single outage."""
+    timeline = IntervalSet(SCHEDULE)
+
+    assert len(timeline) == 2
+    assert timeline.current_or_next(_dt("2022-06-02T07:00:00+02:00")) == (
+        _dt("2022-06-02T04:00:00+02:00"),
+        _dt("2022-06-02T08:00:00+02:00"),
+    )
+    assert timeline.contains(_dt("2022-06-02T07:00:00+02:00"))
+    assert not timeline.contains(_dt("2022-06-02T08:00:00+02:00"))
+    assert timeline.next_start(_dt("2022-06-02T07:00:00+02:00")) == _dt(
+        "2022-06-02T22:00:00+02:00"
+    )
+    assert timeline.next_start(_dt("2022-06-03T00:00:00+02:00")) is None
+
+
+def test_invalid_and_adjacent_slots():
+    """Test slots ending before they start are dropped and adjacent ones merged."""
+    intervals = _intervals(
+        ("2022-06-01T20:00:00+00:00", "2022-05-31T22:30:00+00:00"),
+        ("2022-06-02T10:00:00+00:00", "2022-06-02T12:00:00+00:00"),
+        ("2022-06-02T08:00:00+00:00", "2022-06-02T10:00:00+00:00"),
+    )
+
+    assert intervals.invalid == 1
+    assert list(intervals) == [
+        (_dt("2022-06-02T08:00:00+00:00"), _dt("2022-06-02T12:00:00+00:00"))
+    ]
+
+
+def test_off_time():
+    """Test outage time is clipped to the range."""
+    timeline = IntervalSet(SCHEDULE)
+
+    assert timeline.off_time(
+        _dt("2022-06-02T00:00:00+02:00"), _dt("2022-06-03T00:00:00+02:00")
+    ) == timedelta(hours=6)
+    assert timeline.off_time(
+        _dt("2022-06-02T07:00:00+02:00"), _dt("2022-06-02T23:00:00+02:00")
+    ) == timedelta(hours=2)
+    assert not timeline.off_time(
+        _dt("2022-06-02T08:00:00+02:00"), _dt("2022-06-02T22:00:00+02:00")
+    )
+
+
+def test_union_and_intersection():
+    """Test outages of two areas are combined and intersected."""
+    first = _intervals(
+        ("2022-06-02T04:00:00+00:00", "2022-06-02T06:00:00+00:00"),
+        ("2022-06-02T12:00:00+00:00", "2022-06-02T14:00:00+00:00"),
+    )
+    second = _intervals(
+        ("2022-06-02T05:00:00+00:00", "2022-06-02T07:00:00+00:00"),
+        ("2022-06-02T14:00:00+00:00", "2022-06-02T15:00:00+00:00"),
+    )
+
+    assert list(first.union(second)) == [
+        (_dt("2022-06-02T04:00:00+00:00"), _dt("2022-06-02T07:00:00+00:00")),
+        (_dt("2022-06-02T12:00:00+00:00"), _dt("2022-06-02T15:00:00+00:00")),
+    ]
+    assert list(first.intersection(second)) == [
+        (_dt("2022-06-02T05:00:00+00:00"), _dt("2022-06-02T06:00:00+00:00"))
+    ]
+    assert first.intersection(IntervalSet()) == IntervalSet()
+
+
+def test_gaps():
+    """Test the powered windows are the complement within the range."""
+    timeline = IntervalSet(SCHEDULE)
+
+    assert list(
+        timeline.gaps(
+            _dt("2022-06-02T05:00:00+02:00"), _dt("2022-06-03T02:00:00+02:00")
+        )
+    ) == [
+        (_dt("2022-06-02T08:00:00+02:00"), _dt("2022-06-02T22:00:00+02:00")),
+        (_dt("2022-06-03T00:30:00+02:00"), _dt("2022-06-03T02:00:00+02:00")),
+    ]
+
+    day = (_dt("2022-06-02T00:00:00+02:00"), _dt("2022-06-03T00:00:00+02:00"))
+    assert list(IntervalSet().gaps(*day)) == [day]
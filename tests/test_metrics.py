@@ -0,0 +1,78 @@
+"""Test API metrics and diagnostics."""
+import asyncio
+
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.eskomloadshedding.api import BASE_URL, Area, EskomAPI
+from custom_components.eskomloadshedding.const import DOMAIN
+from custom_components.eskomloadshedding.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.eskomloadshedding.metrics import ApiMetrics, LatencyHistogram
+
+from .const import MOCK_CONFIG
+
+
+def test_latency_histogram():
+    """Test percentiles are read from the bucket bounds."""
+    histogram = LatencyHistogram()
+    assert histogram.percentile(95) is None
+
+    for _ in range(19):
+        histogram.observe(0.01)
+    histogram.observe(0.3)
+
+    assert histogram.percentile(50) == 25
+    assert histogram.percentile(95) == 25
+    assert histogram.percentile(100) == 500
+    assert histogram.as_dict()["buckets"]["le_500ms"] == 1
+
+
+async def test_api_metrics(hass, aioclient_mock):
+    """Test calls are timed and failures counted by exception type."""
+    aioclient_mock.get(f"{BASE_URL}/GetStatus", text="3")
+    api = EskomAPI(async_get_clientsession(hass), [Area(3, 1024989)])
+    await api.async_get_stage()
+
+    aioclient_mock.clear_requests()
+    aioclient_mock.get(f"{BASE_URL}/GetStatus", status=500)
+    await api.async_get_stage()
+
+    assert api.metrics.latency["get_stage"].count == 2
+    assert api.metrics.successes == {"get_stage": 1}
+    assert api.metrics.failures == {"get_stage.ProviderError": 1}
+
+
+def test_cancelled_request_is_not_a_failure():
+    """Test a cancelled request is counted neither as a failure nor a success."""
+    metrics = ApiMetrics()
+    with pytest.raises(asyncio.CancelledError), metrics.network("get_stage"):
+        raise asyncio.CancelledError
+
+    assert not metrics.failures
+    assert not metrics.successes
+
+
+async def test_diagnostics(hass, bypass_get_data):
+    """Test the diagnostics report the metrics of the entry."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, data={}, options=MOCK_CONFIG, entry_id="test"
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, config_entry)
+    assert diagnostics["options"] == MOCK_CONFIG
+    assert diagnostics["data"]["stage"] == 0
+    assert diagnostics["circuit"]["state"] == "closed"
+    assert diagnostics["metrics"]["failures"] == {}
+
+    # The metric sensors are disabled by default
+    entity = er.async_get(hass).async_get("sensor.eskomloadshedding_request_failures")
+    assert entity.disabled_by is er.RegistryEntryDisabler.INTEGRATION
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
@@ -0,0 +1,86 @@
+"""Test planning appliance runs between outages."""
+from datetime import datetime, timedelta
+
+from custom_components.eskomloadshedding.intervals import IntervalSet
+from custom_components.eskomloadshedding.planner import Task, plan_windows
+
+
+def _dt(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+
+OUTAGES = IntervalSet(
+    [
+        (_dt("2022-06-02T04:00:00+00:00"), _dt("2022-06-02T06:00:00+00:00")),
+        (_dt("2022-06-02T12:00:00+00:00"), _dt("2022-06-02T14:00:00+00:00")),
+    ]
+)
+DAY_START = _dt("2022-06-02T00:00:00+00:00")
+DAY_END = _dt("2022-06-03T00:00:00+00:00")
+
+
+def _task(name: str, hours: float, priority: int = 0, **kwargs) -> Task:
+    return Task(
+        name=name,
+        duration=timedelta(hours=hours),
+        earliest_start=kwargs.get("earliest_start", DAY_START),
+        deadline=kwargs.get("deadline", DAY_END),
+        priority=priority,
+    )
+
+
+def _windows(planned) -> list[tuple[str, str, str]]:
+    return [
+        (window.name, window.start.isoformat(), window.end.isoformat())
+        for window in planned
+    ]
+
+
+def test_tasks_fit_between_outages():
+    """Test tasks do not overlap outages or each other."""
+    planned, unplanned = plan_windows(
+        OUTAGES, [_task("geyser", 3), _task("pump", 5), _task("ev", 2)]
+    )
+
+    assert not unplanned
+    assert _windows(planned) == [
+        ("geyser", "2022-06-02T00:00:00+00:00", "2022-06-02T03:00:00+00:00"),
+        ("pump", "2022-06-02T06:00:00+00:00", "2022-06-02T11:00:00+00:00"),
+        ("ev", "2022-06-02T14:00:00+00:00", "2022-06-02T16:00:00+00:00"),
+    ]
+
+
+def test_priority_and_deadline():
+    """Test higher priorities, then earlier deadlines, are planned first."""
+    planned, unplanned = plan_windows(
+        OUTAGES,
+        [
+            _task("pump", 4),
+            _task("ev", 4, priority=1, earliest_start=_dt("2022-06-02T01:00:00+00:00")),
+            _task("geyser", 2, deadline=_dt("2022-06-02T12:00:00+00:00")),
+            _task("dishwasher", 1, deadline=_dt("2022-06-02T05:00:00+00:00")),
+        ],
+    )
+
+    assert not unplanned
+    assert _windows(planned) == [
+        ("dishwasher", "2022-06-02T00:00:00+00:00", "2022-06-02T01:00:00+00:00"),
+        ("geyser", "2022-06-02T01:00:00+00:00", "2022-06-02T03:00:00+00:00"),
+        ("ev", "2022-06-02T06:00:00+00:00", "2022-06-02T10:00:00+00:00"),
+        ("pump", "2022-06-02T14:00:00+00:00", "2022-06-02T18:00:00+00:00"),
+    ]
+
+
+def test_unplanned_tasks():
+    """Test tasks that do not fit a powered window before the deadline."""
+    kettle = _task(
+        "kettle",
+        2,
+        earliest_start=_dt("2022-06-02T03:00:00+00:00"),
+        deadline=_dt("2022-06-02T07:00:00+00:00"),
+    )
+    planned, unplanned = plan_windows(OUTAGES, [kettle, _task("pump", 11)])
+
+    assert not planned
+    assert unplanned == [kettle, _task("pump", 11)]
+    assert plan_windows(OUTAGES, []) == ([], [])
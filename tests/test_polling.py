@@ -0,0 +1,78 @@
+"""Test adaptive polling."""
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from custom_components.eskomloadshedding.const import (
+    FAILURE_JITTER,
+    MAX_FAILURE_BACKOFF,
+    MAX_SCAN_INTERVAL,
+)
+from custom_components.eskomloadshedding.polling import AdaptivePollingScheduler
+from custom_components.eskomloadshedding.schedule import ScheduleIndex
+
+SCAN_INTERVAL = timedelta(minutes=15)
+# 14:00 and 02:00 SAST
+ANNOUNCEMENT_TIME = datetime.fromisoformat("2022-06-02T12:00:00+00:00")
+QUIET_TIME = datetime.fromisoformat("2022-06-02T00:00:00+00:00")
+
+
+def test_backs_off_when_stable():
+    """Test the interval grows outside announcement hours while stable."""
+    polling = AdaptivePollingScheduler(SCAN_INTERVAL)
+    assert polling.next_interval(QUIET_TIME) == SCAN_INTERVAL
+
+    polling.record_success(stage_changed=False)
+    assert polling.next_interval(QUIET_TIME) == 2 * SCAN_INTERVAL
+    assert polling.next_interval(ANNOUNCEMENT_TIME) == SCAN_INTERVAL
+
+    for _ in range(5):
+        polling.record_success(stage_changed=False)
+    assert polling.next_interval(QUIET_TIME) == MAX_SCAN_INTERVAL
+
+    polling.record_success(stage_changed=True)
+    assert polling.next_interval(QUIET_TIME) == SCAN_INTERVAL
+
+
+def test_aligns_to_slot_boundary():
+    """Test the refresh is pulled in to just after the next slot boundary."""
+    polling = AdaptivePollingScheduler(SCAN_INTERVAL)
+    schedule = ScheduleIndex.from_iso(
+        [("2022-06-02T00:05:00+00:00", "2022-06-02T02:30:00+00:00")]
+    )
+
+    assert polling.next_interval(QUIET_TIME, [schedule]) == timedelta(minutes=6)
+
+
+def test_failure_backoff():
+    """Test failures back off exponentially from the scan interval."""
+    polling = AdaptivePollingScheduler(SCAN_INTERVAL)
+    polling.record_failure()
+    with patch("random.random", return_value=0.0):
+        assert polling.next_interval(ANNOUNCEMENT_TIME) == SCAN_INTERVAL
+
+    polling.record_failure()
+    with patch("random.random", return_value=0.0):
+        assert polling.next_interval(ANNOUNCEMENT_TIME) == 2 * SCAN_INTERVAL
+    with patch("random.random", return_value=1.0):
+        assert polling.next_interval(ANNOUNCEMENT_TIME) == 2 * SCAN_INTERVAL * (
+            1 + FAILURE_JITTER
+        )
+
+    for _ in range(20):
+        polling.record_failure()
+    with patch("random.random", return_value=0.0):
+        assert polling.next_interval(ANNOUNCEMENT_TIME) == MAX_FAILURE_BACKOFF
+
+
+def test_failure_never_polls_sooner():
+    """Test a failure never polls sooner than the scan interval."""
+    for scan_interval in (timedelta(minutes=1), SCAN_INTERVAL, timedelta(hours=2)):
+        polling = AdaptivePollingScheduler(scan_interval)
+        for _ in range(12):
+            polling.record_failure()
+            for jitter in (0.0, 0.5, 1.0):
+                with patch("random.random", return_value=jitter):
+                    assert polling.next_interval(ANNOUNCEMENT_TIME) >= scan_interval
+
+    polling.record_success(stage_changed=False)
+    assert polling.failures == 0
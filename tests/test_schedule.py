@@ -0,0 +1,97 @@
+"""Test indexed load shedding schedule."""
+from datetime import datetime
+
+from custom_components.eskomloadshedding.schedule import ScheduleCache, ScheduleIndex
+from custom_components.eskomloadshedding.timetable import Timetable
+
+SCHEDULE = [
+    ("2022-06-03T12:00:00+00:00", "2022-06-03T14:30:00+00:00"),
+    ("2022-06-02T04:00:00+00:00", "2022-06-02T06:30:00+00:00"),
+    ("2022-06-03T04:00:00+00:00", "2022-06-03T06:30:00+00:00"),
+]
+
+
+def _dt(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+
+def test_index_is_sorted():
+    """Test slots are sorted by start time."""
+    index = ScheduleIndex.from_iso(SCHEDULE)
+
+    assert len(index) == 3
+    assert index.as_list() == sorted(SCHEDULE)
+    assert index == ScheduleIndex.from_iso(sorted(SCHEDULE))
+
+
+def test_next_slot():
+    """Test the active or next upcoming slot is returned."""
+    index = ScheduleIndex.from_iso(SCHEDULE)
+
+    assert index.next_slot(_dt("2022-06-01T00:00:00+00:00")) == index[0]
+    assert index.next_slot(_dt("2022-06-02T05:00:00+00:00")) == index[0]
+    assert index.next_slot(_dt("2022-06-02T06:30:00+00:00")) == index[1]
+    assert index.next_slot(_dt("2022-06-04T00:00:00+00:00")) is None
+    assert ScheduleIndex().next_slot(_dt("2022-06-04T00:00:00+00:00")) is None
+
+
+def test_is_active():
+    """Test slot boundaries are start inclusive and end exclusive."""
+    index = ScheduleIndex.from_iso(SCHEDULE)
+
+    assert index.is_active(_dt("2022-06-02T04:00:00+00:00"))
+    assert index.is_active(_dt("2022-06-03T13:00:00+00:00"))
+    assert not index.is_active(_dt("2022-06-02T06:30:00+00:00"))
+    assert not index.is_active(_dt("2022-06-01T00:00:00+00:00"))
+
+
+def test_slots_in_range():
+    """Test only slots overlapping the range are returned."""
+    index = ScheduleIndex.from_iso(SCHEDULE)
+
+    assert index.slots_in_range(
+        _dt("2022-06-02T05:00:00+00:00"), _dt("2022-06-03T04:00:00+00:00")
+    ) == [index[0]]
+    assert index.slots_in_range(
+        _dt("2022-06-02T06:30:00+00:00"), _dt("2022-06-04T00:00:00+00:00")
+    ) == [index[1], index[2]]
+    assert not index.slots_in_range(
+        _dt("2022-06-04T00:00:00+00:00"), _dt("2022-06-05T00:00:00+00:00")
+    )
+
+
+def test_cache_eviction():
+    """Test other months and least recently used entries are evicted."""
+    cache = ScheduleCache(max_entries=2)
+    timetable = Timetable(ScheduleIndex.from_iso(SCHEDULE))
+    start = _dt("2022-06-02T00:00:00+02:00")
+    end = _dt("2022-06-04T00:00:00+02:00")
+
+    cache.set((3, 1, 2, "2022-06"), timetable)
+    cache.set((3, 1, 4, "2022-06"), timetable)
+    assert cache.get((3, 1, 2, "2022-06"), start, end) is timetable
+    cache.set((3, 1, 6, "2022-06"), timetable)
+    assert (3, 1, 2, "2022-06") in cache
+    assert (3, 1, 4, "2022-06") not in cache
+
+    cache.set((3, 1, 2, "2022-07"), timetable)
+    assert len(cache) == 1
+    assert cache.get((3, 1, 6, "2022-06"), start, end) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_miss_on_uncovered_days():
+    """Test a timetable not covering the range asked for is a miss."""
+    cache = ScheduleCache(max_entries=2)
+    timetable = Timetable(ScheduleIndex.from_iso(SCHEDULE))
+    cache.set((3, 1, 2, "2022-06"), timetable)
+
+    assert (
+        cache.get(
+            (3, 1, 2, "2022-06"),
+            _dt("2022-06-03T00:00:00+02:00"),
+            _dt("2022-06-05T00:00:00+02:00"),
+        )
+        is None
+    )
+    assert (cache.hits, cache.misses) == (0, 1)
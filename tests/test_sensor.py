@@ -0,0 +1,123 @@
+"""Test Eskom Load Shedding sensors."""
+from datetime import timedelta
+
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.eskomloadshedding.const import DOMAIN
+
+from .const import MOCK_CONFIG
+
+
+async def test_minutes_until_counts_down(hass, hass_storage, stale_get_data):
+    """Test the countdown is advanced by timers."""
+    now = dt_util.utcnow()
+    start = now + timedelta(minutes=10)
+    end = start + timedelta(hours=2)
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, data={}, options=MOCK_CONFIG, entry_id="test"
+    )
+    config_entry.add_to_hass(hass)
+    hass_storage[f"{DOMAIN}.test"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.test",
+        "data": {
+            "stage": 2,
+            "schedules": {"1024989": [[start.isoformat(), end.isoformat()]]},
+            "areas": MOCK_CONFIG["areas"],
+            "last_updated": now.isoformat(),
+        },
+    }
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_id = "sensor.eskomloadshedding_soweto_minutes_until"
+    assert hass.states.get(entity_id).state == "10"
+    assert hass.states.get("sensor.eskomloadshedding_soweto_next_end").state == (
+        end.replace(microsecond=0).isoformat()
+    )
+
+    for minutes in range(9, -1, -1):
+        async_fire_time_changed(
+            hass, start - timedelta(minutes=minutes) + timedelta(seconds=1)
+        )
+        await hass.async_block_till_done()
+        assert hass.states.get(entity_id).state == str(minutes)
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_attributes_follow_failures(hass, hass_storage, stale_get_data):
+    """Test failures show up on writes without new coordinator data."""
+    now = dt_util.utcnow()
+    start = now + timedelta(minutes=10)
+    end = start + timedelta(hours=2)
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, data={}, options=MOCK_CONFIG, entry_id="test"
+    )
+    config_entry.add_to_hass(hass)
+    hass_storage[f"{DOMAIN}.test"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.test",
+        "data": {
+            "stage": 2,
+            "schedules": {"1024989": [[start.isoformat(), end.isoformat()]]},
+            "areas": MOCK_CONFIG["areas"],
+            "last_updated": now.isoformat(),
+        },
+    }
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_id = "sensor.eskomloadshedding_soweto_minutes_until"
+    assert "failures" not in hass.states.get(entity_id).attributes
+    # Only written when the data changes, so it would show a stale time
+    assert "last_updated" not in hass.states.get(entity_id).attributes
+
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator.api.record_failure("timeout")
+    async_fire_time_changed(hass, start - timedelta(minutes=5))
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).attributes["failures"] == {"timeout": 1}
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_diagnostics_follow_refreshes(hass, bypass_get_data):
+    """Test metrics are read after refreshes that leave the data unchanged."""
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, data={}, options=MOCK_CONFIG, entry_id="test"
+    )
+    config_entry.add_to_hass(hass)
+    # Diagnostic sensors are disabled by default
+    entity_id = (
+        er.async_get(hass)
+        .async_get_or_create(
+            "sensor",
+            DOMAIN,
+            "test_request_failures",
+            suggested_object_id="eskomloadshedding_request_failures",
+            config_entry=config_entry,
+        )
+        .entity_id
+    )
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert hass.states.get(entity_id).state == "0"
+    assert hass.states.get(entity_id).attributes.keys() <= {
+        "friendly_name",
+        "icon",
+    }
+    assert hass.states.get("sensor.eskomloadshedding_loop_seconds") is None
+
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator.api.metrics.failures["get_stage.ProviderError"] += 1
+    await coordinator.async_refresh()
+    assert hass.states.get(entity_id).state == "1"
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
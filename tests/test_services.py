@@ -0,0 +1,198 @@
+"""Test Eskom Load Shedding services."""
+from datetime import timedelta
+
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.eskomloadshedding import profiler
+from custom_components.eskomloadshedding.const import (
+    DATA_PROFILE_TASK,
+    DOMAIN,
+    PROFILE_REPORT_PREFIX,
+    SERVICE_PLAN_WINDOWS,
+    SERVICE_PROFILE,
+    SERVICE_STAGE_HOURS,
+)
+
+from .const import MOCK_CONFIG
+
+
+async def test_profile(hass, bypass_get_data, tmp_path):
+    """Test the update cycle is profiled and the report written."""
+    hass.config.config_dir = str(tmp_path)
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, data={}, options=MOCK_CONFIG, entry_id="test"
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    await hass.services.async_call(
+        DOMAIN, SERVICE_PROFILE, {"duration": 1}, blocking=True
+    )
+    assert profiler.is_profiling()
+    await hass.data[DOMAIN]["test"].async_refresh()
+    await hass.data[DATA_PROFILE_TASK]
+    assert not profiler.is_profiling()
+
+    reports = list(tmp_path.glob(f"{PROFILE_REPORT_PREFIX}_*"))
+    assert len(reports) == 1
+    report = reports[0].read_text()
+    assert "coordinator_refresh" in report
+    assert "eskomloadshedding functions by cumulative time" in report
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    assert not hass.services.has_service(DOMAIN, SERVICE_PROFILE)
+
+
+async def test_profile_stopped_on_unload(hass, bypass_get_data, tmp_path):
+    """Test unloading the integration stops a running profile."""
+    hass.config.config_dir = str(tmp_path)
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, data={}, options=MOCK_CONFIG, entry_id="test"
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    await hass.services.async_call(
+        DOMAIN, SERVICE_PROFILE, {"duration": 3600}, blocking=True
+    )
+    assert profiler.is_profiling()
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert not profiler.is_profiling()
+    assert DATA_PROFILE_TASK not in hass.data
+    assert not list(tmp_path.glob(f"{PROFILE_REPORT_PREFIX}_*"))
+
+
+async def test_plan_windows(hass, hass_storage, error_on_get_data):
+    """Test runs are planned around the outages of the cached schedule."""
+    day = (dt_util.utcnow() + timedelta(days=1)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, data={}, options=MOCK_CONFIG, entry_id="test"
+    )
+    config_entry.add_to_hass(hass)
+    hass_storage[f"{DOMAIN}.test"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.test",
+        "data": {
+            "stage": 2,
+            "schedules": {
+                "1024989": [
+                    [
+                        (day + timedelta(hours=4)).isoformat(),
+                        (day + timedelta(hours=6, minutes=30)).isoformat(),
+                    ]
+                ]
+            },
+            "areas": MOCK_CONFIG["areas"],
+            "last_updated": dt_util.utcnow().isoformat(),
+        },
+    }
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    earliest_start = (day + timedelta(hours=3)).isoformat()
+    deadline = (day + timedelta(hours=12)).isoformat()
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_PLAN_WINDOWS,
+        {
+            "tasks": [
+                {
+                    "name": "pump",
+                    "duration": "02:00:00",
+                    "earliest_start": earliest_start,
+                    "deadline": deadline,
+                },
+                {
+                    "name": "geyser",
+                    "duration": {"hours": 8},
+                    "earliest_start": earliest_start,
+                    "deadline": deadline,
+                },
+                # Starts after the last day of the cached schedule
+                {
+                    "name": "charger",
+                    "duration": "01:00:00",
+                    "earliest_start": (day + timedelta(days=7)).isoformat(),
+                },
+            ]
+        },
+        blocking=True,
+        return_response=True,
+    )
+    assert response == {
+        "windows": [
+            {
+                "name": "pump",
+                "start": dt_util.as_local(
+                    day + timedelta(hours=6, minutes=30)
+                ).isoformat(),
+                "end": dt_util.as_local(
+                    day + timedelta(hours=8, minutes=30)
+                ).isoformat(),
+            }
+        ],
+        "unplanned": ["geyser", "charger"],
+    }
+
+    with pytest.raises(HomeAssistantError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_PLAN_WINDOWS,
+            {"tasks": [{"name": "pump", "duration": 60}], "suburb_id": "1"},
+            blocking=True,
+            return_response=True,
+        )
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    assert not hass.services.has_service(DOMAIN, SERVICE_PLAN_WINDOWS)
+
+
+async def test_stage_hours(hass, hass_storage, error_on_get_data):
+    """Test the hours at each stage are read from the stage history."""
+    now = dt_util.utcnow()
+    hass_storage[f"{DOMAIN}.history.test"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.history.test",
+        "data": {
+            "spans": [
+                [6, (now - timedelta(hours=5)).timestamp(), now.timestamp() - 3600],
+                [
+                    2,
+                    (now - timedelta(days=1000)).timestamp(),
+                    now.timestamp() - 5 * 3600,
+                ],
+            ]
+        },
+    }
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, data={}, options=MOCK_CONFIG, entry_id="test"
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_STAGE_HOURS,
+        {
+            "min_stage": 4,
+            "start": (now - timedelta(hours=10)).isoformat(),
+            "end": now.isoformat(),
+        },
+        blocking=True,
+        return_response=True,
+    )
+    assert response["hours"] == 4
+    assert response["stages"] == {"2": 5, "6": 4}
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    assert not hass.services.has_service(DOMAIN, SERVICE_STAGE_HOURS)
@@ -0,0 +1,58 @@
+"""Test local suburb index."""
+from load_shedding.providers.eskom import Province, Suburb
+
+from custom_components.eskomloadshedding.suburbs import SuburbIndex
+
+SUBURBS = [
+    Suburb(
+        Id=1,
+        Name="Sandton",
+        MunicipalityName="City of Johannesburg",
+        ProvinceName="Gauteng",
+    ),
+    Suburb(
+        Id=2,
+        Name="Sandhurst",
+        MunicipalityName="City of Johannesburg",
+        ProvinceName="Gauteng",
+    ),
+    Suburb(
+        Id=3,
+        Name="Sandbaai",
+        MunicipalityName="Overstrand",
+        ProvinceName="Western Cape",
+    ),
+]
+
+
+def test_search_is_answered_after_complete_results():
+    """Test a search is answered locally once its results are known."""
+    index = SuburbIndex(max_results=10)
+    assert index.search(Province.GAUTENG, "sand") is None
+
+    index.add_results("Sand", SUBURBS)
+
+    assert [s.id for s in index.search(Province.GAUTENG, "sand")] == [1, 2]
+    assert [s.id for s in index.search(Province.GAUTENG, "Sandt")] == [1]
+    assert [s.id for s in index.search(Province.WESTERN_CAPE, "sandb")] == [3]
+
+
+def test_truncated_results_only_answer_same_search():
+    """Test searches narrowing truncated results still go to Eskom."""
+    index = SuburbIndex(max_results=3)
+    index.add_results("sand", SUBURBS)
+
+    assert index.search(Province.GAUTENG, "sand") is not None
+    assert index.search(Province.GAUTENG, "sandt") is None
+
+
+def test_entries_expire():
+    """Test expired entries are not loaded."""
+    now = 1000.0
+    index = SuburbIndex(max_results=10, ttl=100, clock=lambda: now)
+    index.add_results("sand", SUBURBS)
+
+    now = 1200.0
+    loaded = SuburbIndex(max_results=10, ttl=100, clock=lambda: now)
+    loaded.load(index.as_dict())
+    assert loaded.search(Province.GAUTENG, "sand") is None
@@ -0,0 +1,15 @@
+"""Test load shedding timeline."""
+from datetime import datetime
+
+from custom_components.eskomloadshedding.timeline import start_of_week
+
+
+def _dt(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+
+def test_start_of_week():
+    """Test weeks start on Monday at midnight in South Africa."""
+    assert start_of_week(_dt("2022-06-02T23:30:00+00:00")) == _dt(
+        "2022-05-30T00:00:00+02:00"
+    )
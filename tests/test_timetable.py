@@ -0,0 +1,76 @@
+"""Test offline schedule generation."""
+from datetime import datetime, timedelta
+
+from custom_components.eskomloadshedding.schedule import ScheduleIndex
+from custom_components.eskomloadshedding.timetable import Timetable
+
+SCHEDULE = ScheduleIndex.from_iso(
+    [
+        ("2022-06-02T04:00:00+02:00", "2022-06-02T06:30:00+02:00"),
+        ("2022-06-02T22:00:00+02:00", "2022-06-03T00:30:00+02:00"),
+        ("2022-06-03T12:00:00+02:00", "2022-06-03T14:30:00+02:00"),
+    ]
+)
+
+
+def _dt(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+
+def test_generate_reads_back_slots():
+    """Test the slots the timetable was built from are generated again."""
+    timetable = Timetable(SCHEDULE)
+
+    assert timetable.days == {2, 3}
+    assert (
+        timetable.generate(
+            _dt("2022-06-01T00:00:00+02:00"), _dt("2022-06-04T00:00:00+02:00")
+        )
+        == SCHEDULE
+    )
+
+
+def test_generate_other_month():
+    """Test slots repeat on the same day of another month."""
+    timetable = Timetable(SCHEDULE)
+
+    schedule = timetable.generate(
+        _dt("2022-07-03T00:00:00+02:00"), _dt("2022-07-03T13:00:00+02:00")
+    )
+    assert schedule.as_list() == [
+        ("2022-07-02T20:00:00+00:00", "2022-07-02T22:30:00+00:00"),
+        ("2022-07-03T10:00:00+00:00", "2022-07-03T12:30:00+00:00"),
+    ]
+
+
+def test_covers_only_days_read():
+    """Test days past those the timetable was read for are not covered."""
+    start = _dt("2026-10-01T00:00:00+02:00")
+    week = ScheduleIndex(
+        [
+            (start + timedelta(days=day, hours=4), start + timedelta(days=day, hours=6))
+            for day in range(7)
+        ]
+    )
+    timetable = Timetable(week, range(1, 8))
+
+    assert timetable.covers(start, start + timedelta(days=7))
+    assert timetable.covers(
+        _dt("2026-11-03T10:00:00+02:00"), _dt("2026-11-05T00:00:00+02:00")
+    )
+    later = _dt("2026-10-10T00:00:00+02:00")
+    assert not timetable.covers(later, later + timedelta(days=7))
+    assert not timetable.covers(start, start + timedelta(days=7, minutes=1))
+
+
+def test_covers_days_without_slots():
+    """Test days read without load shedding are covered."""
+    timetable = Timetable(SCHEDULE, range(1, 8))
+
+    assert timetable.covered_days == frozenset(range(1, 8))
+    assert timetable.covers(
+        _dt("2022-06-05T00:00:00+02:00"), _dt("2022-06-08T00:00:00+02:00")
+    )
+    assert not Timetable(SCHEDULE).covers(
+        _dt("2022-06-05T00:00:00+02:00"), _dt("2022-06-06T00:00:00+02:00")
+    )